@@ -9,27 +9,70 @@
 """
 # pylint: disable=too-few-public-methods
 from __future__ import absolute_import, division, unicode_literals
+from abc import ABCMeta, abstractmethod
 from collections import OrderedDict
-from future.utils import iteritems, itervalues, listvalues
+from future.utils import iteritems, itervalues, with_metaclass
 
 import resources.lib.common as common
 
-from .paths import resolve_refs
+from .paths import resolve_refs, JsonGraphIndex
 
 
-class LoLoMo(object):
+class DataType(object):
+    """
+    Base class of the data types, the data types are views over the path response data:
+    the attributes obtained from the data are created only when accessed (the lazy slots are None until then),
+    and only the slots with a value (e.g. not the lazy views never accessed) are saved when the object is pickled
+    """
+    __slots__ = ('data',)
+
+    def __init__(self, path_response):
+        self.data = path_response
+
+    def __getstate__(self):
+        state = {}
+        for name in _get_slots(type(self)):
+            value = getattr(self, name, None)
+            if value is not None:
+                state[name] = value
+        return state
+
+    def __setstate__(self, state):
+        for name in _get_slots(type(self)):
+            setattr(self, name, state.get(name))
+
+    @property
+    def perpetual_range_selector(self):
+        return self.data.get('_perpetual_range_selector')
+
+
+class LoLoMo(DataType):
     """List of list of movies (LoLoMo)"""
+    __slots__ = ('id', '_lists', '_jgraph_index')
+
     def __init__(self, path_response, lolomoid=None):
-        self.data = path_response
-        common.debug('LoLoMo data: {}', self.data)
+        super(LoLoMo, self).__init__(path_response)
+        common.debug('LoLoMo data: {}', common.LogDump(self.data))
         _filterout_contexts(self.data, ['billboard', 'showAsARow'])
         self.id = (lolomoid
                    if lolomoid
                    else next(iter(self.data['lolomos'])))
-        self.lists = OrderedDict(
-            (key, VideoList(self.data, key))
-            for key, _
-            in resolve_refs(self.data['lolomos'][self.id], self.data))
+        self._lists = None
+        self._jgraph_index = None
+
+    def __getstate__(self):
+        # The video lists and the index are obtained from the data, so they are not saved
+        state = super(LoLoMo, self).__getstate__()
+        state.pop('_lists', None)
+        state.pop('_jgraph_index', None)
+        return state
+
+    @property
+    def jgraph_index(self):
+        """The index of the references of the LoLoMo data, shared by its video lists"""
+        if self._jgraph_index is None:
+            self._jgraph_index = JsonGraphIndex(self.data)
+        return self._jgraph_index
 
     def __getitem__(self, key):
         return _check_sentinel(self.data['lolomos'][self.id][key])
@@ -38,6 +81,16 @@ class LoLoMo(object):
         """Pass call on to the backing dict of this LoLoMo."""
         return self.data['lolomos'][self.id].get(key, default)
 
+    @property
+    def lists(self):
+        """The video lists of the LoLoMo, the video lists share the index of the references"""
+        if self._lists is None:
+            self._lists = OrderedDict(
+                (key, VideoList(self.data, key, self.jgraph_index))
+                for key, _
+                in self.jgraph_index.resolve_refs(self.data['lolomos'][self.id]))
+        return self._lists
+
     def lists_by_context(self, context, break_on_first=False):
         """Return a generator expression that iterates over all video
         lists with the given context.
@@ -57,7 +110,7 @@ class LoLoMo(object):
         for context_name in context:
             for list_id, video_list in iteritems(self.lists):
                 if match_context(video_list['context'], context_name):
-                    lists.update({list_id: VideoList(self.data, list_id)})
+                    lists.update({list_id: VideoList(self.data, list_id, self.jgraph_index)})
                     if break_on_first:
                         break
         return iteritems(lists)
@@ -67,15 +120,17 @@ class LoLoMo(object):
         for list_id, video_list in iteritems(self.lists):
             if not video_list['context'] == context:
                 continue
-            return list_id, VideoList(self.data, list_id)
+            return list_id, VideoList(self.data, list_id, self.jgraph_index)
         return None, None
 
 
-class LoCo(object):
+class LoCo(DataType):
     """List of components (LoCo)"""
+    __slots__ = ('id',)
+
     def __init__(self, path_response):
-        self.data = path_response
-        common.debug('LoCo data: {}', self.data)
+        super(LoCo, self).__init__(path_response)
+        common.debug('LoCo data: {}', common.LogDump(self.data))
         _filterout_loco_contexts(self.data, ['billboard'])
         self.id = next(iter(self.data['locos']))  # Get loco root id
 
@@ -111,33 +166,68 @@ class LoCo(object):
         return None, None
 
 
-class VideoListLoCo:
+class VideosDataType(with_metaclass(ABCMeta, DataType)):
+    """
+    Base class of the data types with a list of videos,
+    the videos are resolved from the data at the first access (_resolve_videos),
+    the other attributes are obtained from the videos, so they also reflect the changes made to the videos
+    """
+    __slots__ = ('_videos',)
+
+    def __init__(self, path_response):
+        super(VideosDataType, self).__init__(path_response)
+        self._videos = None
+
+    @abstractmethod
+    def _resolve_videos(self):
+        """Return an OrderedDict with the videos of the data"""
+
+    @property
+    def videos(self):
+        if self._videos is None:
+            self._videos = self._resolve_videos()
+        return self._videos
+
+    @property
+    def artitem(self):
+        """Art data of the first video (special handling for menus see parse_info in infolabels.py)"""
+        return next(iter(itervalues(self.videos)), None)
+
+    @property
+    def contained_titles(self):
+        """First videos titles (special handling for menus see parse_info in infolabels.py)"""
+        return _get_titles(self.videos) if self.videos else None
+
+    @property
+    def videoids(self):
+        if not self.videos:
+            return None
+        try:
+            return _get_videoids(self.videos)
+        except KeyError:
+            return None
+
+
+class VideoListLoCo(VideosDataType):
     """A video list, for LoCo data"""
+    __slots__ = ('list_id',)
+
     def __init__(self, path_response, list_id):
         # common.debug('VideoListLoCo data: {}', path_response)
-        self.perpetual_range_selector = path_response.get('_perpetual_range_selector')
-        self.data = path_response
+        super(VideoListLoCo, self).__init__(path_response)
         self.list_id = list_id
-        self.videoids = None
-        # Set a 'UNSPECIFIED' type videoid (special handling for menus see parse_info in infolabels.py)
-        self.videoid = common.VideoId(videoid=list_id)
-        self.contained_titles = None
-        self.artitem = None
-        if 'lists' not in path_response:
+
+    def _resolve_videos(self):
+        if 'lists' not in self.data:
             # No data in path response
-            return
+            return OrderedDict()
         # Set videos data for the specified list id
-        self.videos = OrderedDict(resolve_refs(self.data['lists'][list_id], self.data))
-        if not self.videos:
-            return
-        # Set first videos titles (special handling for menus see parse_info in infolabels.py)
-        self.contained_titles = _get_titles(self.videos)
-        # Set art data of first video (special handling for menus see parse_info in infolabels.py)
-        self.artitem = listvalues(self.videos)[0]
-        try:
-            self.videoids = _get_videoids(self.videos)
-        except KeyError:
-            self.videoids = None
+        return OrderedDict(resolve_refs(self.data['lists'][self.list_id], self.data))
+
+    @property
+    def videoid(self):
+        # Set a 'UNSPECIFIED' type videoid (special handling for menus see parse_info in infolabels.py)
+        return common.VideoId(videoid=self.list_id)
 
     def __getitem__(self, key):
         return _check_sentinel(self.data['lists'][self.list_id]['componentSummary'][key])
@@ -147,68 +237,62 @@ class VideoListLoCo:
         return _check_sentinel(self.data['lists'][self.list_id]['componentSummary'].get(key, default))
 
 
-class VideoList:
+class VideoList(VideosDataType):
     """A video list"""
-    def __init__(self, path_response, list_id=None):
+    __slots__ = ('list_id', '_jgraph_index')
+
+    def __init__(self, path_response, list_id=None, jgraph_index=None):
         # common.debug('VideoList data: {}', path_response)
-        self.perpetual_range_selector = path_response.get('_perpetual_range_selector')
-        self.data = path_response
-        has_data = bool(path_response.get('lists'))
-        self.videos = OrderedDict()
-        self.artitem = None
-        self.contained_titles = None
-        self.videoids = None
-        if has_data:
-            # Generate one videoid, or from the first id of the list or with specified one
-            self.videoid = common.VideoId(
-                videoid=(list_id
-                         if list_id
-                         else next(iter(self.data['lists']))))
-            self.videos = OrderedDict(resolve_refs(self.data['lists'][self.videoid.value], self.data))
-            if self.videos:
-                # self.artitem = next(itervalues(self.videos))
-                self.artitem = listvalues(self.videos)[0]
-                self.contained_titles = _get_titles(self.videos)
-                try:
-                    self.videoids = _get_videoids(self.videos)
-                except KeyError:
-                    self.videoids = None
+        super(VideoList, self).__init__(path_response)
+        # Use the first id of the list or the specified one
+        self.list_id = (list_id or next(iter(self.data['lists']))) if path_response.get('lists') else None
+        self._jgraph_index = jgraph_index
+
+    def __getstate__(self):
+        state = super(VideoList, self).__getstate__()
+        state.pop('_jgraph_index', None)
+        return state
+
+    def _resolve_videos(self):
+        if not self.list_id:
+            return OrderedDict()
+        list_data = self.data['lists'][self.list_id]
+        return OrderedDict(self._jgraph_index.resolve_refs(list_data)
+                           if self._jgraph_index
+                           else resolve_refs(list_data, self.data))
+
+    @property
+    def videoid(self):
+        return common.VideoId(videoid=self.list_id) if self.list_id else None
 
     def __getitem__(self, key):
-        return _check_sentinel(self.data['lists'][self.videoid.value][key])
+        return _check_sentinel(self.data['lists'][self.list_id][key])
 
     def get(self, key, default=None):
         """Pass call on to the backing dict of this VideoList."""
-        return _check_sentinel(self.data['lists'][self.videoid.value].get(key, default))
+        return _check_sentinel(self.data['lists'][self.list_id].get(key, default))
 
 
-class VideoListSorted:
+class VideoListSorted(VideosDataType):
     """A video list"""
+    __slots__ = ('context_name', 'context_id', 'req_sort_order_type')
+
     def __init__(self, path_response, context_name, context_id, req_sort_order_type):
         # common.debug('VideoListSorted data: {}', path_response)
-        self.perpetual_range_selector = path_response.get('_perpetual_range_selector')
-        self.data = path_response
+        super(VideoListSorted, self).__init__(path_response)
         self.context_name = context_name
-        has_data = bool((context_id and path_response.get(context_name)
-                         and path_response[context_name].get(context_id))
-                        or (not context_id and path_response.get(context_name)))
-        self.data_lists = {}
-        self.videos = OrderedDict()
-        self.artitem = None
-        self.contained_titles = None
-        self.videoids = None
-        if has_data:
-            self.data_lists = path_response[context_name][context_id][req_sort_order_type] \
-                if context_id else path_response[context_name][req_sort_order_type]
-            self.videos = OrderedDict(resolve_refs(self.data_lists, self.data))
-            if self.videos:
-                # self.artitem = next(itervalues(self.videos))
-                self.artitem = listvalues(self.videos)[0]
-                self.contained_titles = _get_titles(self.videos)
-                try:
-                    self.videoids = _get_videoids(self.videos)
-                except KeyError:
-                    self.videoids = None
+        self.context_id = context_id
+        self.req_sort_order_type = req_sort_order_type
+
+    @property
+    def data_lists(self):
+        context_data = self.data.get(self.context_name)
+        if self.context_id:
+            context_data = context_data.get(self.context_id) if context_data else None
+        return context_data[self.req_sort_order_type] if context_data else {}
+
+    def _resolve_videos(self):
+        return OrderedDict(resolve_refs(self.data_lists, self.data))
 
     def __getitem__(self, key):
         return _check_sentinel(self.data_lists[key])
@@ -218,23 +302,26 @@ class VideoListSorted:
         return _check_sentinel(self.data_lists.get(key, default))
 
 
-class SearchVideoList:
+class SearchVideoList(VideosDataType):
     """A video list with search results"""
-    def __init__(self, path_response):
-        self.perpetual_range_selector = path_response.get('_perpetual_range_selector')
-        self.data = path_response
-        has_data = 'search' in path_response
-        self.videos = OrderedDict()
-        self.videoids = None
-        self.artitem = None
-        self.contained_titles = None
-        if has_data:
-            self.title = common.get_local_string(30100).format(list(self.data['search']['byTerm'])[0][1:])
-            self.videos = OrderedDict(resolve_refs(list(self.data['search']['byReference'].values())[0], self.data))
-            self.videoids = _get_videoids(self.videos)
-            # self.artitem = next(itervalues(self.videos), None)
-            self.artitem = listvalues(self.videos)[0] if self.videos else None
-            self.contained_titles = _get_titles(self.videos)
+    __slots__ = ()
+
+    def _resolve_videos(self):
+        if 'search' not in self.data:
+            return OrderedDict()
+        return OrderedDict(resolve_refs(list(self.data['search']['byReference'].values())[0], self.data))
+
+    @property
+    def title(self):
+        return common.get_local_string(30100).format(list(self.data['search']['byTerm'])[0][1:])
+
+    @property
+    def contained_titles(self):
+        return _get_titles(self.videos) if 'search' in self.data else None
+
+    @property
+    def videoids(self):
+        return _get_videoids(self.videos) if 'search' in self.data else None
 
     def __getitem__(self, key):
         return _check_sentinel(self.data['search'][key])
@@ -244,16 +331,20 @@ class SearchVideoList:
         return _check_sentinel(self.data['search'].get(key, default))
 
 
-class CustomVideoList:
+class CustomVideoList(VideosDataType):
     """A video list"""
-    def __init__(self, path_response):
-        self.perpetual_range_selector = path_response.get('_perpetual_range_selector')
-        self.data = path_response
-        self.videos = OrderedDict(self.data.get('videos', {}))
-        self.videoids = _get_videoids(self.videos)
-        # self.artitem = next(itervalues(self.videos))
-        self.artitem = listvalues(self.videos)[0] if self.videos else None
-        self.contained_titles = _get_titles(self.videos)
+    __slots__ = ()
+
+    def _resolve_videos(self):
+        return OrderedDict(self.data.get('videos', {}))
+
+    @property
+    def contained_titles(self):
+        return _get_titles(self.videos)
+
+    @property
+    def videoids(self):
+        return _get_videoids(self.videos)
 
     def __getitem__(self, key):
         return _check_sentinel(self.data[key])
@@ -263,29 +354,50 @@ class CustomVideoList:
         return _check_sentinel(self.data.get(key, default))
 
 
-class SeasonList:
+class SeasonList(DataType):
     """A list of seasons. Includes tvshow art."""
+    __slots__ = ('videoid', '_seasons')
+
     def __init__(self, videoid, path_response):
         # common.debug('SeasonList data: {}', path_response)
-        self.perpetual_range_selector = path_response.get('_perpetual_range_selector')
-        self.data = path_response
+        super(SeasonList, self).__init__(path_response)
         self.videoid = videoid
-        self.tvshow = self.data['videos'][self.videoid.tvshowid]
-        self.seasons = OrderedDict(
-            resolve_refs(self.tvshow['seasonList'], self.data))
+        self._seasons = None
+
+    @property
+    def tvshow(self):
+        return self.data['videos'][self.videoid.tvshowid]
+
+    @property
+    def seasons(self):
+        if self._seasons is None:
+            self._seasons = OrderedDict(resolve_refs(self.tvshow['seasonList'], self.data))
+        return self._seasons
 
 
-class EpisodeList:
+class EpisodeList(DataType):
     """A list of episodes. Includes tvshow art."""
+    __slots__ = ('videoid', '_episodes')
+
     def __init__(self, videoid, path_response):
         # common.debug('EpisodeList data: {}', path_response)
-        self.perpetual_range_selector = path_response.get('_perpetual_range_selector')
-        self.data = path_response
+        super(EpisodeList, self).__init__(path_response)
         self.videoid = videoid
-        self.tvshow = self.data['videos'][self.videoid.tvshowid]
-        self.season = self.data['seasons'][self.videoid.seasonid]
-        self.episodes = OrderedDict(
-            resolve_refs(self.season['episodes'], self.data))
+        self._episodes = None
+
+    @property
+    def tvshow(self):
+        return self.data['videos'][self.videoid.tvshowid]
+
+    @property
+    def season(self):
+        return self.data['seasons'][self.videoid.seasonid]
+
+    @property
+    def episodes(self):
+        if self._episodes is None:
+            self._episodes = OrderedDict(resolve_refs(self.season['episodes'], self.data))
+        return self._episodes
 
 
 class SubgenreList:
@@ -300,11 +412,15 @@ class SubgenreList:
             self.lists = list(path_response['genres'].get(genre_id, {}).get('subgenres').items())
 
 
+def _get_slots(cls):
+    """Return the names of the slots of a class and of its base classes"""
+    return [name for base_cls in cls.__mro__ for name in getattr(base_cls, '__slots__', ())]
+
+
 def merge_data_type(data, data_to_merge):
+    # The videoids and the titles are obtained from the videos, so only the videos need to be merged
     for video_id, video in iteritems(data_to_merge.videos):
         data.videos[video_id] = video
-    data.videoids.extend(data_to_merge.videoids)
-    data.contained_titles.extend(data_to_merge.contained_titles)
 
 
 def _check_sentinel(value):
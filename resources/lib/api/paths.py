@@ -8,6 +8,8 @@
     See LICENSES/MIT.md for more information.
 """
 from __future__ import absolute_import, division, unicode_literals
+from operator import itemgetter
+
 from future.utils import iteritems
 
 import resources.lib.common as common
@@ -155,8 +157,8 @@ def build_paths(base_path, partial_paths):
 def resolve_refs(references, targets):
     """Return a generator expression that returns the objects in targets
     by resolving the references in sorted order"""
-    return (common.get_path(ref, targets, include_key=True)
-            for index, ref in iterate_references(references))
+    return (_get_reference_target(path, targets)
+            for index, path in iterate_references(references))
 
 
 def iterate_references(source):
@@ -165,9 +167,7 @@ def iterate_references(source):
     reaches the first empty reference, which signals the end of the reference
     list.
     Items with a key that do not represent an integer are ignored."""
-    for index, ref in sorted({int(k): v
-                              for k, v in iteritems(source)
-                              if common.is_numeric(k)}.items()):
+    for index, ref in _numeric_items(source):
         path = reference_path(ref)
         if path is None:
             break
@@ -179,9 +179,7 @@ def iterate_references(source):
 
 def count_references(source):
     counter = 0
-    for index, ref in sorted({int(k): v  # pylint: disable=unused-variable
-                              for k, v in iteritems(source)
-                              if common.is_numeric(k)}.items()):
+    for index, ref in _numeric_items(source):  # pylint: disable=unused-variable
         path = reference_path(ref)
 
         if path is None:
@@ -192,6 +190,57 @@ def count_references(source):
     return counter
 
 
+class JsonGraphIndex(object):
+    """
+    Index of the references of a path response, to be used when the lists of the same response
+    are parsed multiple times (e.g. the video lists of a LoLoMo), the references of each list
+    are parsed only at the first access, then they are obtained from the index
+    """
+
+    def __init__(self, data):
+        self.data = data
+        # Each list is indexed by its object id, the list object is kept to prevent the reuse of the id
+        self._lists_references = {}
+
+    def iterate_references(self, source):
+        """Return a list of index=>reference path pairs, same of iterate_references"""
+        try:
+            return self._lists_references[id(source)][1]
+        except KeyError:
+            references = list(iterate_references(source))
+            self._lists_references[id(source)] = (source, references)
+            return references
+
+    def resolve_refs(self, references):
+        """Return a generator expression that returns the objects in the data
+        by resolving the references in sorted order, same of resolve_refs"""
+        data = self.data
+        return (_get_reference_target(path, data)
+                for index, path in self.iterate_references(references))
+
+
+def _numeric_items(source):
+    """Return the items of a dict that have a key representing an integer,
+    as a list of (int key, value) pairs sorted by key"""
+    items = []
+    for key, value in iteritems(source):
+        try:
+            items.append((int(key), value))
+        except ValueError:
+            # Not all the unicode digits (e.g. superscripts) can be converted, then isdigit can not be used
+            continue
+    items.sort(key=itemgetter(0))
+    return items
+
+
+def _get_reference_target(path, targets):
+    """Return a tuple with the key and the object of the reference path,
+    raise KeyError if any key along the path does not exist"""
+    for key in path:
+        targets = targets[key]
+    return path[-1], targets
+
+
 def reference_path(ref):
     """Return the actual reference path (a list of path items to follow)
     for a reference item.
@@ -273,7 +322,7 @@ def jgraph_get(key, data, full_data=None):
     :param full_data: pass the entire JSON Graph data (is only needed to resolve the 'ref' primitive type),
                       if 'data' is equal to 'full_data' this param can be ignored
     """
-    return _resolve_type(data.get(key), full_data or data)
+    return _resolve_type(data.get(key), full_data or data, ())
 
 
 def jgraph_get_path(path, data, full_data=None):
@@ -282,25 +331,37 @@ def jgraph_get_path(path, data, full_data=None):
     :param full_data: pass the entire JSON Graph data (is only needed to resolve the 'ref' primitive type),
                       if 'data' is equal to 'full_data' this param can be ignored
     :raise KeyError: if any key along the path does not exist
+    :raise InvalidReferenceError: if a reference points to itself, directly or through other references
     """
-    current_value = jgraph_get(path[0], data, full_data or data)
-    if len(path) == 1:
-        return current_value
-    return jgraph_get_path(path[1:], current_value, full_data or data)
+    return _jgraph_get_path(path, data, full_data or data, ())
+
+
+def _jgraph_get_path(path, data, full_data, resolving_refs):
+    for key in path:
+        data = _resolve_type(data.get(key), full_data, resolving_refs)
+    return data
 
 
-def _resolve_type(return_data, full_data):
-    """Resolve the data on basis of Falcor JSON Graph primitive types"""
-    if isinstance(return_data, dict):
+def _resolve_type(return_data, full_data, resolving_refs):
+    """
+    Resolve the data on basis of Falcor JSON Graph primitive types
+    :param resolving_refs: tuple of the reference paths being resolved, to detect the cyclic references
+    """
+    # A reference can point to another reference, so they are followed until a value is found
+    while isinstance(return_data, dict):
         primitive_type = return_data.get('$type')
         if primitive_type == 'ref':
             # Reference type: used to find and get a value within the same JSON Graph data
-            return_data = jgraph_get_path(return_data['value'], full_data)
-            # Look for a recursive reference
-            return _resolve_type(return_data, full_data)
+            ref_path = tuple(return_data['value'])
+            if ref_path in resolving_refs:
+                raise InvalidReferenceError('Cyclic reference encountered: {}'.format(list(ref_path)))
+            resolving_refs += (ref_path,)
+            return_data = _jgraph_get_path(ref_path, full_data, full_data, resolving_refs)
+            continue
         if primitive_type == 'atom':
             # Atom: contains a JSON data and other properties (not managed here) to handle metadata
             return return_data.get('value')
+        break
     return return_data
 
 
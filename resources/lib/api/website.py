@@ -10,7 +10,7 @@
 from __future__ import absolute_import, division, unicode_literals
 
 import json
-from re import search, compile as recompile, DOTALL, sub
+from re import search, compile as recompile, sub
 
 from future.utils import iteritems
 
@@ -62,7 +62,8 @@ PAGE_ITEMS_API_URL = {
 PAGE_ITEM_ERROR_CODE = 'models/flow/data/fields/errorCode/value'
 PAGE_ITEM_ERROR_CODE_LIST = 'models\\i18nStrings\\data\\login/login'
 
-JSON_REGEX = r'netflix\.{}\s*=\s*(.*?);\s*</script>'
+# Match the start of the JSON data assignments, e.g. "netflix.reactContext = {...};</script>"
+JSON_START_REGEX = recompile(r'netflix\.(\w+)\s*=\s*')
 AVATAR_SUBPATH = ['images', 'byWidth', '320']
 
 PROFILE_DEBUG_INFO = ['isAccountOwner', 'isActive', 'isKids', 'maturityLevel', 'language']
@@ -75,7 +76,8 @@ def extract_session_data(content, validate=False, update_profiles=False):
     the session relevant data from the HTML page
     """
     common.debug('Extracting session data...')
-    react_context = extract_json(content, 'reactContext')
+    page_data = PageJsonData(content)
+    react_context = page_data.get('reactContext')
     if validate:
         validate_login(react_context)
 
@@ -95,7 +97,7 @@ def extract_session_data(content, validate=False, update_profiles=False):
 
     api_data = extract_api_data(react_context)
     # Note: Falcor cache does not exist if membershipStatus is not CURRENT_MEMBER
-    falcor_cache = extract_json(content, 'falcorCache')
+    falcor_cache = page_data.get('falcorCache')
 
     if update_profiles:
         parse_profiles(falcor_cache)
@@ -155,8 +157,7 @@ def extract_session_data(content, validate=False, update_profiles=False):
     else:
         api_data['client_version'] = result.groups()[0]
     # Save api urls
-    for key, path in list(api_data.items()):
-        g.LOCAL_DB.set_value(key, path, TABLE_SESSION)
+    g.LOCAL_DB.set_values(api_data, TABLE_SESSION)
 
     api_data['is_profile_session_active'] = is_profile_session_active
     return api_data
@@ -182,13 +183,12 @@ def parse_profiles(data):
             g.SHARED_DB.set_profile(guid, sort_order)
             # Add profile language description translated from locale
             summary['language_desc'] = g.py2_decode(xbmc.convertLanguage(summary['language'][:2], xbmc.ENGLISH_NAME))
-            for key, value in iteritems(summary):
-                if common.is_debug_verbose() and key in PROFILE_DEBUG_INFO:
-                    common.debug('Profile info {}', {key: value})
-                if key == 'profileName':  # The profile name is coded as HTML
-                    value = parse_html(value)
-                g.LOCAL_DB.set_profile_config(key, value, guid)
-            g.LOCAL_DB.set_profile_config('avatar', avatar_url, guid)
+            if common.is_debug_verbose():
+                common.debug('Profile info {}', {key: summary[key] for key in PROFILE_DEBUG_INFO if key in summary})
+            if 'profileName' in summary:  # The profile name is coded as HTML
+                summary['profileName'] = parse_html(summary['profileName'])
+            summary['avatar'] = avatar_url
+            g.LOCAL_DB.set_profile_config_many(summary, guid)
             sort_order += 1
         _delete_non_existing_profiles(current_guids)
     except Exception:
@@ -309,14 +309,64 @@ def validate_login(react_context):
             raise LoginValidateError(error_msg)
 
 
+class PageJsonData(object):
+    """
+    The JSON data of a netflix content page, all the data are located with a single scan of the page,
+    then each JSON is decoded only when it is requested
+    """
+
+    def __init__(self, content):
+        self._json_strings = _find_json_strings(content.decode('utf-8'))
+        self._json_data = {}
+
+    def get(self, name):
+        """Get a decoded JSON by the name of the variable (e.g. 'reactContext')"""
+        if name not in self._json_data:
+            if name not in self._json_strings:
+                common.error('JSON {} not found in the page', name)
+                raise WebsiteParsingError('Unable to extract {}'.format(name))
+            self._json_data[name] = _decode_json(self._json_strings[name], name)
+        return self._json_data[name]
+
+
+def _find_json_strings(text):
+    """Find all the 'netflix.NAME = JSON;</script>' assignments, return a dict with: name, JSON string"""
+    json_strings = {}
+    pos = 0
+    while True:
+        match = JSON_START_REGEX.search(text, pos)
+        if not match:
+            break
+        # The JSON ends at the first '</script>' preceded by a semicolon
+        end = match.end()
+        while True:
+            end = text.find('</script>', end)
+            if end == -1:
+                return json_strings
+            index = end - 1
+            while index >= match.end() and text[index].isspace():
+                index -= 1
+            if index >= match.end() and text[index] == ';':
+                break
+            end += 9
+        # When the same variable is assigned more times, the first one is kept
+        json_strings.setdefault(match.group(1), text[match.end():index])
+        # The search continues from the start of the value, because an assignment that is not
+        # a JSON (e.g. a function) can end after the assignments that follow it
+        pos = match.end()
+    return json_strings
+
+
 @common.time_execution(immediate=True)
 def extract_json(content, name):
     """Extract json from netflix content page"""
+    return PageJsonData(content).get(name)
+
+
+def _decode_json(json_str, name):
+    """Decode a JSON string of a netflix content page"""
     common.debug('Extracting {} JSON', name)
-    json_str = None
     try:
-        json_array = recompile(JSON_REGEX.format(name), DOTALL).findall(content.decode('utf-8'))
-        json_str = json_array[0]
         json_str_replace = json_str.replace('\\"', '\\\\"')  # Escape double-quotes
         json_str_replace = json_str_replace.replace('\\s', '\\\\s')  # Escape \s
         json_str_replace = json_str_replace.replace('\\n', '\\\\n')  # Escape line feed
@@ -325,8 +375,7 @@ def extract_json(content, name):
         json_str_replace = sub(r'\\(?!["])', r'\\\\', json_str_replace)  # Escape backslash (only when is not followed by double quotation marks \")
         return json.loads(json_str_replace)
     except Exception:
-        if json_str:
-            common.error('JSON string trying to load: {}', json_str)
+        common.error('JSON string trying to load: {}', json_str)
         import traceback
         common.error(g.py2_decode(traceback.format_exc(), 'latin-1'))
         raise WebsiteParsingError('Unable to extract {}'.format(name))
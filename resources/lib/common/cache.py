@@ -10,6 +10,8 @@
 """
 from __future__ import absolute_import, division, unicode_literals
 
+from future.utils import iteritems
+
 from resources.lib.common import make_http_call_cache
 from resources.lib.common.cache_utils import deserialize_data, serialize_data
 from resources.lib.globals import g
@@ -30,14 +32,19 @@ class Cache(object):
     def __init__(self):
         self._make_call = _make_call_service if g.IS_SERVICE else _make_call_client
 
-    def get(self, bucket, identifier):
-        """Get a item from cache bucket"""
+    def get(self, bucket, identifier, copy=False):
+        """
+        Get a item from cache bucket
+
+        :param copy: if True get a new copy of the data that can be modified, otherwise in the service instance
+                     the data object is shared with the cache and must not be modified
+        """
         call_args = {
             'bucket': bucket,
-            'identifier': identifier
+            'identifier': identifier,
+            'copy': copy
         }
-        data = self._make_call('get', call_args)
-        return deserialize_data(data)
+        return self._make_call('get', call_args)
 
     def add(self, bucket, identifier, data, ttl=None, expires=None):
         """
@@ -56,7 +63,38 @@ class Cache(object):
             'ttl': ttl,
             'expires': expires
         }
-        self._make_call('add', call_args, serialize_data(data))
+        self._make_call('add', call_args, data)
+
+    def get_many(self, bucket, identifiers):
+        """
+        Get multiple items from a cache bucket with a single call
+
+        :return: a dict with the identifiers and the data of the items found
+        """
+        call_args = {
+            'bucket': bucket,
+            'identifiers': identifiers
+        }
+        return self._make_call('get_many', call_args)
+
+    def add_many(self, bucket, data, ttl=None, expires=None):
+        """
+        Add or update multiple items to a cache bucket with a single call
+
+        :param bucket: bucket where save the data
+        :param data: a dict with the key identifiers and the contents
+        :param ttl: override default expiration (in seconds)
+        :param expires: override default expiration (in timestamp) if specified override also the 'ttl' value
+        """
+        if not data:
+            return
+        call_args = {
+            'bucket': bucket,
+            'data': None,  # This value is injected after the _make_call
+            'ttl': ttl,
+            'expires': expires
+        }
+        self._make_call('add_many', call_args, data)
 
     def delete(self, bucket, identifier, including_suffixes=False):
         """
@@ -86,8 +124,18 @@ class Cache(object):
 
 
 def _make_call_client(callname, params=None, data=None):
-    # In the client-frontend instance is needed to use the IPC cache http service
-    return make_http_call_cache(callname, params, data)
+    # In the client-frontend instance is needed to use the IPC cache http service,
+    # the data is serialized here, so the cache service can store it without serialize it again
+    if callname == 'add':
+        data = serialize_data(data)
+    elif callname == 'add_many':
+        data = serialize_data({identifier: serialize_data(value) for identifier, value in iteritems(data)})
+    result = make_http_call_cache(callname, params, data)
+    if callname == 'get':
+        return deserialize_data(result)
+    if callname == 'get_many':
+        return {identifier: deserialize_data(value) for identifier, value in iteritems(deserialize_data(result))}
+    return result
 
 
 def _make_call_service(callname, params=None, data=None):
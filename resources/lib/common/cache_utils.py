@@ -9,6 +9,7 @@
 """
 from __future__ import absolute_import, division, unicode_literals
 
+import zlib
 from functools import wraps
 
 import resources.lib.common as common
@@ -26,16 +27,19 @@ except NameError:  # Python 3
     unicode = str  # pylint: disable=redefined-builtin
 
 # Cache buckets (the default_ttl is the variable name in 'global' class)
-CACHE_COMMON = {'name': 'cache_common', 'is_persistent': False, 'default_ttl': 'CACHE_TTL'}
-CACHE_GENRES = {'name': 'cache_genres', 'is_persistent': False, 'default_ttl': 'CACHE_TTL'}
-CACHE_SUPPLEMENTAL = {'name': 'cache_supplemental', 'is_persistent': False, 'default_ttl': 'CACHE_TTL'}
-CACHE_METADATA = {'name': 'cache_metadata', 'is_persistent': True, 'default_ttl': 'CACHE_METADATA_TTL'}
-CACHE_INFOLABELS = {'name': 'cache_infolabels', 'is_persistent': True, 'default_ttl': 'CACHE_METADATA_TTL'}
-CACHE_ARTINFO = {'name': 'cache_artinfo', 'is_persistent': True, 'default_ttl': 'CACHE_METADATA_TTL'}
-CACHE_MANIFESTS = {'name': 'cache_manifests', 'is_persistent': False, 'default_ttl': 'CACHE_TTL'}
-CACHE_BOOKMARKS = {'name': 'cache_bookmarks', 'is_persistent': False, 'default_ttl': 'CACHE_TTL'}
-CACHE_MYLIST = {'name': 'cache_mylist', 'is_persistent': False, 'default_ttl': 'CACHE_MYLIST_TTL'}
-CACHE_SEARCH = {'name': 'cache_search', 'is_persistent': False, 'default_ttl': ''}  # Only customized ttl
+# The memory_size is the max size in bytes of the data kept in the memory-cache, when exceeded the least recently
+# used items are removed from the memory (the items of persistent buckets remain available from the database)
+_MB = 1024 * 1024
+CACHE_COMMON = {'name': 'cache_common', 'is_persistent': False, 'default_ttl': 'CACHE_TTL', 'memory_size': 20 * _MB}
+CACHE_GENRES = {'name': 'cache_genres', 'is_persistent': False, 'default_ttl': 'CACHE_TTL', 'memory_size': 2 * _MB}
+CACHE_SUPPLEMENTAL = {'name': 'cache_supplemental', 'is_persistent': False, 'default_ttl': 'CACHE_TTL', 'memory_size': 2 * _MB}
+CACHE_METADATA = {'name': 'cache_metadata', 'is_persistent': True, 'default_ttl': 'CACHE_METADATA_TTL', 'memory_size': 10 * _MB}
+CACHE_INFOLABELS = {'name': 'cache_infolabels', 'is_persistent': True, 'default_ttl': 'CACHE_METADATA_TTL', 'memory_size': 5 * _MB}
+CACHE_ARTINFO = {'name': 'cache_artinfo', 'is_persistent': True, 'default_ttl': 'CACHE_METADATA_TTL', 'memory_size': 5 * _MB}
+CACHE_MANIFESTS = {'name': 'cache_manifests', 'is_persistent': False, 'default_ttl': 'CACHE_TTL', 'memory_size': 5 * _MB}
+CACHE_BOOKMARKS = {'name': 'cache_bookmarks', 'is_persistent': False, 'default_ttl': 'CACHE_TTL', 'memory_size': 1 * _MB}
+CACHE_MYLIST = {'name': 'cache_mylist', 'is_persistent': False, 'default_ttl': 'CACHE_MYLIST_TTL', 'memory_size': 5 * _MB}
+CACHE_SEARCH = {'name': 'cache_search', 'is_persistent': False, 'default_ttl': '', 'memory_size': 5 * _MB}  # Only customized ttl
 
 # The complete list of buckets (to obtain the list quickly)
 BUCKET_NAMES = ['cache_common', 'cache_genres', 'cache_supplemental', 'cache_metadata', 'cache_infolabels',
@@ -45,6 +49,12 @@ BUCKETS = [CACHE_COMMON, CACHE_GENRES, CACHE_SUPPLEMENTAL, CACHE_METADATA, CACHE
            CACHE_ARTINFO, CACHE_MANIFESTS, CACHE_BOOKMARKS, CACHE_MYLIST, CACHE_SEARCH]
 
 
+# The cache calls that exchange multiple items, over IPC the items are transferred as a single serialized dict
+MULTIPLE_ITEMS_CALLS = ['get_many', 'add_many']
+# The cache calls where the items data is exchanged in serialized form
+SERIALIZED_DATA_CALLS = ['get', 'add', 'get_many', 'add_many']
+
+
 # Logic to get the identifier
 # cache_output: called without params, use the first argument value of the function as identifier
 # cache_output: with identify_from_kwarg_name, get value identifier from kwarg name specified,
@@ -129,3 +139,21 @@ def deserialize_data(value):
         # This should happen only if manually mixing the database data
         common.error('It was not possible to deserialize the cache data, try purge cache from expert settings menu')
         raise CacheMiss()
+
+
+def compress_data(value):
+    """Compress the serialized data, used to reduce the size of the data stored in the database"""
+    return zlib.compress(value)
+
+
+def decompress_data(value):
+    """Decompress the data stored in the database"""
+    if value[:1] == b'x':  # zlib header, the data stored by previous add-on versions are not compressed
+        try:
+            return zlib.decompress(value)
+        except zlib.error:
+            # The data are truncated or are not compressed data
+            # This should happen only if manually mixing the database data
+            common.error('It was not possible to decompress the cache data, try purge cache from expert settings menu')
+            raise CacheMiss()
+    return value
@@ -8,7 +8,10 @@
     See LICENSES/MIT.md for more information.
 """
 from __future__ import absolute_import, division, unicode_literals
+
+import threading
 from functools import wraps
+
 import AddonSignals
 
 from resources.lib.globals import g
@@ -23,6 +26,10 @@ except NameError:  # Python 3
     unicode = str  # pylint: disable=redefined-builtin
 
 IPC_TIMEOUT_SECS = 20
+HTTP_SERVICE_DEFAULT_PORTS = {'ns': 8001, 'cache': 8002}
+
+# Keep-alive connections to the service servers, each thread uses its own connections
+_HTTP_CONNECTIONS = threading.local()
 
 
 class BackendNotReady(Exception):
@@ -93,28 +100,13 @@ def make_http_call(callname, data):
     """Make an IPC call via HTTP and wait for it to return.
     The contents of data will be expanded to kwargs and passed into the target function."""
     from collections import OrderedDict
-    try:  # Python 3
-        from urllib.request import build_opener, install_opener, ProxyHandler, HTTPError, URLError, urlopen
-    except ImportError:  # Python 2
-        from urllib2 import build_opener, install_opener, ProxyHandler, HTTPError, URLError, urlopen
     import json
     debug('Handling HTTP IPC call to {}'.format(callname))
-    # Note: On python 3, using 'localhost' slowdown the call (Windows OS is affected) not sure if it is an urllib issue
-    url = 'http://127.0.0.1:{}/{}'.format(g.LOCAL_DB.get_value('ns_service_port', 8001), callname)
-    install_opener(build_opener(ProxyHandler({})))  # don't use proxy for localhost
-    try:
-        result = json.loads(
-            urlopen(url=url, data=json.dumps(data).encode('utf-8'), timeout=IPC_TIMEOUT_SECS).read(),
-            object_pairs_hook=OrderedDict)
-    except HTTPError as exc:
-        result = json.loads(exc.reason)
-    except URLError as exc:
-        # On PY2 the exception message have to be decoded with latin-1 for system with symbolic characters
-        err_msg = g.py2_decode(str(exc), 'latin-1')
-        if '10049' in err_msg:
-            err_msg += '\r\nPossible cause is wrong localhost settings in your operative system.'
-        error(err_msg)
-        raise BackendNotReady(g.py2_encode(err_msg, encoding='latin-1'))
+    status, reason, content = _make_http_request('ns', callname, json.dumps(data).encode('utf-8'))
+    if status == 200:
+        result = json.loads(content, object_pairs_hook=OrderedDict)
+    else:
+        result = json.loads(reason)
     _raise_for_error(callname, result)
     return result
 
@@ -122,31 +114,91 @@ def make_http_call(callname, data):
 def make_http_call_cache(callname, params, data):
     """Make an IPC call via HTTP and wait for it to return.
     The contents of data will be expanded to kwargs and passed into the target function."""
-    try:  # Python 3
-        from urllib.request import build_opener, install_opener, ProxyHandler, HTTPError, URLError, Request, urlopen
-    except ImportError:  # Python 2
-        from urllib2 import build_opener, install_opener, ProxyHandler, HTTPError, URLError, Request, urlopen
     import json
     # debug('Handling HTTP IPC call to {}'.format(callname))
-    # Note: On python 3, using 'localhost' slowdown the call (Windows OS is affected) not sure if it is an urllib issue
-    url = 'http://127.0.0.1:{}/{}'.format(g.LOCAL_DB.get_value('cache_service_port', 8002), callname)
-    install_opener(build_opener(ProxyHandler({})))  # don't use proxy for localhost
-    r = Request(url=url, data=data, headers={'Params': json.dumps(params)})
-    try:
-        result = urlopen(r, timeout=IPC_TIMEOUT_SECS).read()
-    except HTTPError as exc:
+    status, reason, content = _make_http_request('cache', callname, data, {'Params': json.dumps(params)})
+    if status != 200:
         try:
-            raise apierrors.__dict__[exc.reason]()
+            raise apierrors.__dict__[reason]()
         except KeyError:
-            raise Exception('The service has returned: {}'.format(exc.reason))
-    except URLError as exc:
-        # On PY2 the exception message have to be decoded with latin-1 for system with symbolic characters
-        err_msg = g.py2_decode(str(exc), 'latin-1')
-        if '10049' in err_msg:
-            err_msg += '\r\nPossible cause is wrong localhost settings in your operative system.'
-        error(err_msg)
-        raise BackendNotReady(g.py2_encode(err_msg, encoding='latin-1'))
-    return result
+            raise Exception('The service has returned: {}'.format(reason))
+    return content
+
+
+def _make_http_request(service, callname, body=None, headers=None):
+    """
+    Make an HTTP request to a service server over a keep-alive connection (one for each thread)
+    :return: tuple of response status code, reason and content
+    """
+    try:  # Python 3
+        from http.client import HTTPException
+    except ImportError:  # Python 2
+        from httplib import HTTPException
+    import socket
+    retry = True
+    while True:
+        conn = _get_http_connection(service)
+        # A reused connection can have been closed by the server after the keep-alive timeout
+        is_reused = conn.sock is not None
+        is_sent = False
+        try:
+            conn.request('POST' if body is not None else 'GET', '/' + callname, body, headers or {})
+            is_sent = True
+            response = conn.getresponse()
+            return response.status, response.reason, response.read()
+        except (HTTPException, socket.error) as exc:
+            _close_http_connection(service)
+            # Retry only when the request has surely not been processed: the request has not been sent
+            # (e.g. connection refused because the service has been restarted on a different port), or the
+            # reused keep-alive connection has been closed by the server without any response.
+            # A request already sent could have been processed, then it is not retried because the calls
+            # could be not idempotent
+            if retry and not isinstance(exc, socket.timeout) and \
+                    (not is_sent or (is_reused and _is_closed_without_response(exc))):
+                retry = False
+                continue
+            # On PY2 the exception message have to be decoded with latin-1 for system with symbolic characters
+            err_msg = g.py2_decode(str(exc), 'latin-1')
+            if '10049' in err_msg:
+                err_msg += '\r\nPossible cause is wrong localhost settings in your operative system.'
+            error(err_msg)
+            raise BackendNotReady(g.py2_encode(err_msg, encoding='latin-1'))
+
+
+def _is_closed_without_response(exc):
+    """Check if the exception is due to the server that has closed the connection without send a response"""
+    try:  # Python 3
+        from http.client import RemoteDisconnected
+        return isinstance(exc, RemoteDisconnected)
+    except ImportError:  # Python 2
+        from httplib import BadStatusLine
+        # An empty status line is received when the connection is closed without a response
+        return isinstance(exc, BadStatusLine) and exc.line == "''"
+
+
+def _get_http_connection(service):
+    """Get the keep-alive HTTP connection of the current thread to a service server"""
+    connections = getattr(_HTTP_CONNECTIONS, 'connections', None)
+    if connections is None:
+        connections = _HTTP_CONNECTIONS.connections = {}
+    if service not in connections:
+        try:  # Python 3
+            from http.client import HTTPConnection
+        except ImportError:  # Python 2
+            from httplib import HTTPConnection
+        # The service port is read only when the connection is created, then it is kept until
+        # the connection fails, e.g. because the service is restarted on a different port
+        port = g.LOCAL_DB.get_value('{}_service_port'.format(service), HTTP_SERVICE_DEFAULT_PORTS[service])
+        # Note: On python 3, using 'localhost' slowdown the call (Windows OS is affected)
+        connections[service] = HTTPConnection('127.0.0.1', port, timeout=IPC_TIMEOUT_SECS)
+    return connections[service]
+
+
+def _close_http_connection(service):
+    connections = getattr(_HTTP_CONNECTIONS, 'connections', {})
+    conn = connections.pop(service, None)
+    if conn:
+        conn.close()
 
 
 def make_addonsignals_call(callname, data):
@@ -9,6 +9,7 @@
 """
 from __future__ import absolute_import, division, unicode_literals
 
+import sys
 import time
 from functools import wraps
 from future.utils import iteritems
@@ -18,6 +19,42 @@ import xbmc
 from resources.lib.globals import g
 
 __LOG_LEVEL__ = None
+__LOG_MODULES__ = None
+
+# Max length of the text of the data written to the log with LogDump
+LOG_DUMP_MAX_LENGTH = 10000
+
+# Cache of the modules enabled to the verbose logging
+_MODULES_ENABLED = {}
+
+
+class LogDump(object):
+    """
+    Data to be written to the log as text, the text is created only when the message is written
+    to the log, with a limited size. Use it in the log calls for the data that can be large, e.g.:
+    debug('Path response: {}', LogDump(path_response))
+
+    :param data: the data to be written
+    :param to_text: optional function to convert the data to text (e.g. json.dumps)
+    :param max_length: max length of the text
+    """
+    __slots__ = ('data', 'to_text', 'max_length')
+
+    def __init__(self, data, to_text=None, max_length=LOG_DUMP_MAX_LENGTH):
+        self.data = data
+        self.to_text = to_text
+        self.max_length = max_length
+
+    def __str__(self):
+        text = self.to_text(self.data) if self.to_text else '{}'.format(self.data)
+        if len(text) > self.max_length:
+            text = '{}... ({} characters truncated)'.format(text[:self.max_length], len(text) - self.max_length)
+        return text
+
+    __unicode__ = __str__
+
+    def __format__(self, format_spec):
+        return format(self.__str__(), format_spec)
 
 
 def perf_clock():
@@ -35,18 +72,24 @@ def get_log_level():
     Lazily read the log level settings
     """
     # pylint: disable=global-statement
-    global __LOG_LEVEL__
+    global __LOG_LEVEL__, __LOG_MODULES__
     if __LOG_LEVEL__ is None:
         try:
             __LOG_LEVEL__ = g.ADDON.getSettingString('debug_log_level')
             if __LOG_LEVEL__ != 'Disabled':
                 _log('Debug logging level is {}'.format(__LOG_LEVEL__), xbmc.LOGINFO)
+            # Names of the modules enabled to the verbose logging (e.g. "api, services.msl"),
+            # all modules are enabled when not specified
+            __LOG_MODULES__ = tuple(module.strip() for module in g.ADDON.getSettingString('debug_log_modules').split(',')
+                                    if module.strip())
         except Exception:  # pylint: disable=broad-except
             # If settings.xml was not created yet, as at first service run
             # g.ADDON.getSettingString('debug_log_level') will thrown a TypeError
             # If any other error appears, we don't want the service to crash,
             # let's return 'Disabled' in all case
             __LOG_LEVEL__ = 'Disabled'
+            __LOG_MODULES__ = ()
+        _MODULES_ENABLED.clear()
     return __LOG_LEVEL__
 
 
@@ -61,6 +104,19 @@ def reset_log_level_global_var():
     __LOG_LEVEL__ = None
 
 
+def _is_module_enabled(module_name):
+    """Check if a module is enabled to the verbose logging"""
+    try:
+        return _MODULES_ENABLED[module_name]
+    except KeyError:
+        # The module names are compared without the add-on package prefix
+        name = module_name[len('resources.lib.'):] if module_name.startswith('resources.lib.') else module_name
+        is_enabled = any(name == module or name.startswith(module + '.') or name.endswith('.' + module)
+                         for module in __LOG_MODULES__)
+        _MODULES_ENABLED[module_name] = is_enabled
+        return is_enabled
+
+
 def _log(msg, level, *args, **kwargs):
     """Log a message to the Kodi logfile."""
     if args or kwargs:
@@ -76,6 +132,17 @@ def debug(msg, *args, **kwargs):
     """Log a debug message."""
     if get_log_level() != 'Verbose':
         return
+    if __LOG_MODULES__ and not _is_module_enabled(sys._getframe(1).f_globals.get('__name__', '')):  # pylint: disable=protected-access
+        return
+    _log(msg, xbmc.LOGDEBUG, *args, **kwargs)
+
+
+def _debug_module(module_name, msg, *args, **kwargs):
+    """Log a debug message on behalf of a module"""
+    if get_log_level() != 'Verbose':
+        return
+    if __LOG_MODULES__ and not _is_module_enabled(module_name):
+        return
     _log(msg, xbmc.LOGDEBUG, *args, **kwargs)
 
 
@@ -149,8 +216,7 @@ def time_execution(immediate):
             finally:
                 execution_time = int((perf_clock() - start) * 1000)
                 if immediate:
-                    debug('Call to {} took {}ms'
-                          .format(func.__name__, execution_time))
+                    _debug_module(func.__module__, 'Call to {} took {}ms', func.__name__, execution_time)
                 else:
                     g.TIME_TRACE.append([func.__name__, execution_time,
                                          g.time_trace_level])
@@ -88,15 +88,6 @@ def _encode_params(params):
     return ('?' + urlencode(params)) if params else ''
 
 
-def is_numeric(string):
-    """Return true if string represents an integer, else false"""
-    try:
-        int(string)
-    except ValueError:
-        return False
-    return True
-
-
 def strp(value, form):
     """
     Helper function to safely create datetime objects from strings
@@ -141,13 +132,18 @@ def strf_timestamp(timestamp, form):
 
 
 def merge_dicts(dict_to_merge, merged_dict):
-    """Recursively merge the contents of dict_to_merge into merged_dict.
+    """Merge the contents of dict_to_merge into merged_dict, including the nested dicts.
     Values that are already present in merged_dict will be overwritten if they are also present in dict_to_merge"""
-    for key, value in iteritems(dict_to_merge):
-        if isinstance(merged_dict.get(key), dict):
-            merge_dicts(value, merged_dict[key])
-        else:
-            merged_dict[key] = value
+    # Iterative merge, the nested dicts to be merged are kept in a stack instead of using recursive calls
+    stack = [(dict_to_merge, merged_dict)]
+    while stack:
+        source_dict, dest_dict = stack.pop()
+        for key, value in iteritems(source_dict):
+            dest_value = dest_dict.get(key)
+            if isinstance(dest_value, dict) and isinstance(value, dict):
+                stack.append((value, dest_value))
+            else:
+                dest_dict[key] = value
     return merged_dict
 
 
@@ -218,5 +214,14 @@ def run_threaded(non_blocking, target_func, *args, **kwargs):
     if not non_blocking:
         return target_func(*args, **kwargs)
     from threading import Thread
-    Thread(target=target_func, args=args, kwargs=kwargs).start()
+    Thread(target=_run_and_close_connections, args=(target_func,) + args, kwargs=kwargs).start()
     return None
+
+
+def _run_and_close_connections(target_func, *args, **kwargs):
+    """Call a function, then close the database connections opened by the current thread"""
+    from resources.lib.database.db_base_sqlite import close_thread_connections
+    try:
+        target_func(*args, **kwargs)
+    finally:
+        close_thread_connections()
@@ -9,9 +9,12 @@
 """
 from __future__ import absolute_import, division, unicode_literals
 
+import threading
 from functools import wraps
 
 import mysql.connector
+from future.utils import iteritems
+from mysql.connector.pooling import MySQLConnectionPool
 
 import resources.lib.common as common
 import resources.lib.database.db_base as db_base
@@ -20,6 +23,51 @@ import resources.lib.database.db_create_mysql as db_create_mysql
 from resources.lib.database.db_exceptions import (MySQLConnectionError, MySQLError)
 from resources.lib.globals import g
 
+POOL_SIZE = 5  # Max number of connections kept open with the MySQL server
+
+# Connection pools, one for each connection configuration
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+class _ConnectionPool(object):
+    """
+    A bounded pool of connections, the connections are opened only when needed
+    and checked (and reconnected if needed) by MySQLConnectionPool when are taken from the pool
+    """
+    def __init__(self, config):
+        # There is no session state to clean, then the connections are returned to the pool as they are
+        self.pool = MySQLConnectionPool(pool_size=POOL_SIZE, pool_name='netflix_addon', pool_reset_session=False)
+        self.pool.set_config(**config)
+        self.config = config
+        self.connections_count = 0
+        self.lock = threading.Lock()
+
+    def get_connection(self):
+        with self.lock:
+            try:
+                return self.pool.get_connection()
+            except mysql.connector.errors.PoolError:
+                # All the opened connections are in use
+                if self.connections_count < POOL_SIZE:
+                    self.pool.add_connection()
+                    self.connections_count += 1
+                    return self.pool.get_connection()
+        # The not pooled connection is opened without holding the lock,
+        # so that meanwhile the pooled connections given back can be taken by the other threads
+        common.debug('MySQL connection pool exhausted, a not pooled connection will be used')
+        return mysql.connector.connect(**self.config)
+
+
+def get_pooled_connection(config):
+    """Get a connection from the pool of the connection configuration, the connection is returned by close()"""
+    pool_key = tuple(sorted(iteritems(config)))
+    with _POOLS_LOCK:
+        if pool_key not in _POOLS:
+            _POOLS[pool_key] = _ConnectionPool(config)
+        pool = _POOLS[pool_key]
+    return pool.get_connection()
+
 
 def handle_connection(func):
     """
@@ -32,15 +80,17 @@ def handle_connection(func):
             return func(*args, **kwargs)
         conn = None
         try:
-            if not args[0].conn or (args[0].conn and not args[0].conn.is_connected()):
-                args[0].conn = mysql.connector.connect(**args[0].config)
-                conn = args[0].conn
+            if not args[0].conn:
+                # Take a connection for the current thread, the nested calls will use the same connection
+                args[0].conn = conn = get_pooled_connection(args[0].config)
             return func(*args, **kwargs)
         except mysql.connector.Error as exc:
             common.error('MySQL error {}:', exc)
             raise MySQLConnectionError
         finally:
-            if conn and conn.is_connected():
+            if conn:
+                args[0].conn = None
+                # Return the connection to the pool
                 conn.close()
     return wrapper
 
@@ -48,6 +98,7 @@ def handle_connection(func):
 class MySQLDatabase(db_base.BaseDatabase):
     def __init__(self, test_config=None):  # pylint: disable=super-on-old-class
         self.is_mysql_database = True
+        self._thread_storage = threading.local()
         self.database = 'netflix_addon'
         if test_config:
             self.is_connection_test = True
@@ -66,6 +117,15 @@ class MySQLDatabase(db_base.BaseDatabase):
             }
         super(MySQLDatabase, self).__init__()
 
+    @property
+    def conn(self):
+        """The connection in use by the current thread"""
+        return getattr(self._thread_storage, 'conn', None)
+
+    @conn.setter
+    def conn(self, value):
+        self._thread_storage.conn = value
+
     def _initialize_connection(self):
         try:
             common.debug('Trying connection to the MySQL database {}', self.database)
@@ -92,6 +152,7 @@ class MySQLDatabase(db_base.BaseDatabase):
         finally:
             if self.conn and self.conn.is_connected():
                 self.conn.close()
+            self.conn = None
 
     def _execute_non_query(self, query, params=None, cursor=None, **kwargs):
         try:
@@ -207,6 +268,46 @@ class MySQLDatabase(db_base.BaseDatabase):
         value = common.convert_to_string(value)
         self._execute_non_query(query, (key, value), multi=True)
 
+    @handle_connection
+    def set_values(self, dict_values, table=db_utils.TABLE_SHARED_APP_CONF):
+        """
+        Store multiple values to database with a single query
+        :param dict_values: The key/value to store
+        :param table: Table map
+        """
+        table_name = table[0]
+        table_columns = table[1]
+        query = 'INSERT INTO {0} ({1}, {2}) VALUES (%s, %s) ON DUPLICATE KEY UPDATE {2} = VALUES({2})'\
+            .format(table_name, table_columns[0], table_columns[1])
+        records_values = [(key, common.convert_to_string(value)) for key, value in iteritems(dict_values)]
+        try:
+            # The executemany of a INSERT is converted to a single multiple-row insert
+            self.get_cursor().executemany(query, records_values)
+        except mysql.connector.Error as exc:
+            common.error('MySQL error {}:', exc)
+            raise MySQLError
+
+    def _execute_many_in_transaction(self, queries):
+        """
+        Execute multiple queries within a single transaction
+        :param queries: list of tuples, each with the query and the list of the params to execute it with executemany
+        """
+        try:
+            self.conn.start_transaction()
+            cursor = self.get_cursor()
+            for query, params_list in queries:
+                cursor.executemany(query.replace("?", "%s"), params_list)  # sqlite use '?' placeholder
+            self.conn.commit()
+        except mysql.connector.Error as exc:
+            common.error('MySQL error {}:', exc)
+            self.conn.rollback()
+            raise MySQLError
+        except Exception:
+            # e.g. the params of the queries are not valid, the transaction must be closed anyway,
+            # otherwise the connection would be returned to the pool with the transaction still open
+            self.conn.rollback()
+            raise
+
     @handle_connection
     def delete_key(self, key, table=db_utils.TABLE_SHARED_APP_CONF):
         """
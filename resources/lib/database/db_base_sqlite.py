@@ -13,6 +13,8 @@ import sqlite3 as sql
 import threading
 from functools import wraps
 
+from future.utils import iteritems
+
 import resources.lib.common as common
 import resources.lib.database.db_base as db_base
 import resources.lib.database.db_create_sqlite as db_create_sqlite
@@ -26,6 +28,7 @@ except ImportError:
 
 
 CONN_ISOLATION_LEVEL = None  # Autocommit mode
+CONN_CACHED_STATEMENTS = 200  # Max number of prepared statements cached by each connection
 
 # ---------------------------------------------------------------------------
 # Pay attention with the SQLite syntax:
@@ -34,6 +37,54 @@ CONN_ISOLATION_LEVEL = None  # Autocommit mode
 # LIKE comparator use ASCII, the unicode chars are not comparable
 # ---------------------------------------------------------------------------
 
+# Connections pool, each thread has its own connections (one for each database file)
+# that remain open for the whole life of the thread
+_THREAD_STORAGE = threading.local()
+
+
+def get_thread_connection(db_file_path):
+    """
+    Get the connection to a database file owned by the current thread,
+    the connection will be opened at first access and then reused
+    """
+    connections = getattr(_THREAD_STORAGE, 'connections', None)
+    if connections is None:
+        connections = _THREAD_STORAGE.connections = {}
+    conn = connections.get(db_file_path)
+    if conn is None:
+        conn = sql.connect(db_file_path,
+                           isolation_level=CONN_ISOLATION_LEVEL,
+                           cached_statements=CONN_CACHED_STATEMENTS)
+        # With WAL journal the readers do not block the writer and vice versa,
+        # this also applies between the connections of the add-on frontend and the service
+        conn.execute(str('PRAGMA journal_mode=WAL'))
+        conn.execute(str('PRAGMA synchronous=NORMAL'))
+        connections[db_file_path] = conn
+    return conn
+
+
+def close_thread_connections():
+    """Close all the database connections owned by the current thread"""
+    connections = getattr(_THREAD_STORAGE, 'connections', None)
+    if not connections:
+        return
+    for conn in connections.values():
+        conn.close()
+    connections.clear()
+
+
+def rollback_transaction(conn):
+    """Rollback the transaction started on the connection with 'BEGIN TRANSACTION', if it is still open"""
+    # In autocommit mode the connection rollback() method does nothing on Python 2,
+    # so the rollback is executed as statement, otherwise the connection remains within the transaction
+    if not getattr(conn, 'in_transaction', True):  # Python 2 has not in_transaction
+        return
+    try:
+        conn.execute(str('ROLLBACK'))
+    except sql.Error as exc:
+        # e.g. when the transaction has been already rolled back by SQLite due to the error
+        common.warn('SQLite rollback error {}', exc.args[0])
+
 
 def handle_connection(func):
     """
@@ -44,44 +95,21 @@ def handle_connection(func):
         if args[0].is_mysql_database:
             # If database is mysql pass to next decorator
             return func(*args, **kwargs)
-        conn = None
         try:
-            if not args[0].is_connected:
-                args[0].mutex.acquire()
-                args[0].conn = sql.connect(args[0].db_file_path,
-                                           isolation_level=CONN_ISOLATION_LEVEL)
-                args[0].is_connected = True
-                conn = args[0].conn
-
             return func(*args, **kwargs)
         except sql.Error as exc:
             common.error('SQLite error {}:', exc.args[0])
             raise SQLiteConnectionError
-        finally:
-            if conn:
-                args[0].is_connected = False
-                conn.close()
-                args[0].mutex.release()
     return wrapper
 
 
 class SQLiteDatabase(db_base.BaseDatabase):
     def __init__(self, db_filename):  # pylint: disable=super-on-old-class
-        self.mutex = threading.Lock()
-        self.local_storage = threading.local()
         self.is_mysql_database = False
         self.db_filename = db_filename
         self.db_file_path = db_utils.get_local_db_path(db_filename)
         super(SQLiteDatabase, self).__init__()
 
-    @property
-    def is_connected(self):
-        return getattr(self.local_storage, 'is_connected', False)
-
-    @is_connected.setter
-    def is_connected(self, val):
-        self.local_storage.is_connected = val
-
     def _initialize_connection(self):
         try:
             common.debug('Trying connection to the database {}', self.db_filename)
@@ -139,15 +167,15 @@ class SQLiteDatabase(db_base.BaseDatabase):
             raise exc_ve
 
     def get_cursor(self):
-        return self.conn.cursor()
+        return get_thread_connection(self.db_file_path).cursor()
 
     def get_cursor_for_dict_results(self):
-        conn_cursor = self.conn.cursor()
+        conn_cursor = get_thread_connection(self.db_file_path).cursor()
         conn_cursor.row_factory = lambda c, r: dict(list(zip([col[0] for col in c.description], r)))
         return conn_cursor
 
     def get_cursor_for_list_results(self):
-        conn_cursor = self.conn.cursor()
+        conn_cursor = get_thread_connection(self.db_file_path).cursor()
         conn_cursor.row_factory = lambda cursor, row: row[0]
         return conn_cursor
 
@@ -218,6 +246,47 @@ class SQLiteDatabase(db_base.BaseDatabase):
                 .format(table_name, table_columns[0], table_columns[1])
             self._execute_non_query(insert_query, (key, value))
 
+    @handle_connection
+    def set_values(self, dict_values, table=db_utils.TABLE_APP_CONF):
+        """
+        Store multiple values to database within a single transaction
+        :param dict_values: The key/value to store
+        :param table: Table map
+        """
+        table_name = table[0]
+        table_columns = table[1]
+        # Update or insert approach, insert only the keys that not exists (no id changes)
+        update_query = 'UPDATE {} SET {} = ? WHERE {} = ?'.format(table_name,
+                                                                  table_columns[1],
+                                                                  table_columns[0])
+        insert_query = 'INSERT OR IGNORE INTO {} ({}, {}) VALUES (?, ?)'\
+            .format(table_name, table_columns[0], table_columns[1])
+        records_values = [(key, common.convert_to_string(value)) for key, value in iteritems(dict_values)]
+        self._execute_many_in_transaction([
+            (update_query, [(value, key) for key, value in records_values]),
+            (insert_query, records_values)])
+
+    def _execute_many_in_transaction(self, queries):
+        """
+        Execute multiple queries within a single transaction
+        :param queries: list of tuples, each with the query and the list of the params to execute it with executemany
+        """
+        conn = get_thread_connection(self.db_file_path)
+        try:
+            cursor = conn.cursor()
+            cursor.execute(str('BEGIN TRANSACTION'))
+            for query, params_list in queries:
+                cursor.executemany(query, params_list)
+            cursor.execute(str('COMMIT'))
+        except sql.Error as exc:
+            common.error('SQLite error {}:', exc.args[0])
+            rollback_transaction(conn)
+            raise SQLiteError
+        except Exception:
+            # e.g. the params of the queries are not valid, the transaction must be closed anyway
+            rollback_transaction(conn)
+            raise
+
     @handle_connection
     def delete_key(self, key, table=db_utils.TABLE_APP_CONF):
         """
@@ -107,5 +107,29 @@ def create_database(config):
     cur.execute(table)
     cur.execute(alter_tbl)
 
+    table = ('CREATE TABLE netflix_addon.library_sync_jobs ('
+             'JobID INT(11) NOT NULL AUTO_INCREMENT,'
+             'Status VARCHAR(20) NOT NULL,'
+             'StartTime VARCHAR(50) NOT NULL,'
+             'LastUpdate VARCHAR(50) NOT NULL,'
+             'TotalItems INT(11) NOT NULL DEFAULT 0,'
+             'PRIMARY KEY (JobID))'
+             'ENGINE = INNODB, CHARACTER SET utf8mb4, COLLATE utf8mb4_unicode_ci;')
+    cur.execute(table)
+
+    table = ('CREATE TABLE netflix_addon.library_sync_journal ('
+             'JobID INT(11) NOT NULL,'
+             'VideoID INT(11) NOT NULL,'
+             'PRIMARY KEY (JobID, VideoID))'
+             'ENGINE = INNODB, CHARACTER SET utf8mb4, COLLATE utf8mb4_unicode_ci;')
+    cur.execute(table)
+
+    table = ('CREATE TABLE netflix_addon.video_lib_files_hash ('
+             'PathHash CHAR(40) NOT NULL,'
+             'ContentHash CHAR(40) NOT NULL,'
+             'PRIMARY KEY (PathHash))'
+             'ENGINE = INNODB, CHARACTER SET utf8mb4, COLLATE utf8mb4_unicode_ci;')
+    cur.execute(table)
+
     if conn and conn.is_connected():
         conn.close()
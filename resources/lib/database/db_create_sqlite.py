@@ -139,5 +139,24 @@ def _create_shared_database(db_file_path):
                 'REFERENCES Profiles (Guid) ON DELETE CASCADE ON UPDATE CASCADE);')
     cur.execute(table)
 
+    table = str('CREATE TABLE library_sync_jobs ('
+                'JobID      INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,'
+                'Status     TEXT    NOT NULL,'
+                'StartTime  TEXT    NOT NULL,'
+                'LastUpdate TEXT    NOT NULL,'
+                'TotalItems INTEGER NOT NULL DEFAULT 0);')
+    cur.execute(table)
+
+    table = str('CREATE TABLE library_sync_journal ('
+                'JobID   INTEGER NOT NULL,'
+                'VideoID INTEGER NOT NULL,'
+                'PRIMARY KEY (JobID, VideoID));')
+    cur.execute(table)
+
+    table = str('CREATE TABLE video_lib_files_hash ('
+                'PathHash    TEXT PRIMARY KEY NOT NULL,'
+                'ContentHash TEXT NOT NULL);')
+    cur.execute(table)
+
     if conn:
         conn.close()
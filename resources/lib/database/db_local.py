@@ -11,6 +11,8 @@ from __future__ import absolute_import, division, unicode_literals
 
 from datetime import datetime
 
+from future.utils import iteritems
+
 import resources.lib.common as common
 import resources.lib.database.db_base_sqlite as db_sqlite
 import resources.lib.database.db_utils as db_utils
@@ -77,6 +79,22 @@ class NFLocalDatabase(db_sqlite.SQLiteDatabase):
             insert_query = 'INSERT INTO profiles_config (Guid, Name, Value) VALUES (?, ?, ?)'
             self._execute_non_query(insert_query, (guid, key, value))
 
+    @db_sqlite.handle_connection
+    def set_profile_config_many(self, dict_values, guid=None):
+        """
+        Store multiple values to a profile within a single transaction,
+        if guid is not specified, are stored to active profile
+        """
+        if not guid:
+            guid = self._get_active_guid_profile()
+        # Update or insert approach, insert only the keys that not exists (no id changes)
+        update_query = 'UPDATE profiles_config SET Value = ? WHERE Guid = ? AND Name = ?'
+        insert_query = 'INSERT OR IGNORE INTO profiles_config (Guid, Name, Value) VALUES (?, ?, ?)'
+        records_values = [(key, common.convert_to_string(value)) for key, value in iteritems(dict_values)]
+        self._execute_many_in_transaction([
+            (update_query, [(value, guid, key) for key, value in records_values]),
+            (insert_query, [(guid, key, value) for key, value in records_values])])
+
     @db_sqlite.handle_connection
     def set_profile(self, guid, is_active, sort_order):
         """Update or Insert a profile"""
@@ -9,13 +9,21 @@
 """
 from __future__ import absolute_import, division, unicode_literals
 
+import hashlib
 from datetime import datetime
 
+from future.utils import iteritems
+
 import resources.lib.common as common
 import resources.lib.database.db_base_mysql as db_base_mysql
 import resources.lib.database.db_base_sqlite as db_base_sqlite
 import resources.lib.database.db_utils as db_utils
 
+# Number of library sync jobs kept in the database
+LIB_SYNC_JOBS_HISTORY = 10
+# Max number of parameters in a query, the SQLite default limit is 999
+MAX_QUERY_PARAMS = 500
+
 
 def get_shareddb_class(use_mysql=False):
     # Dynamically sets the inherit class
@@ -37,6 +45,9 @@ def get_shareddb_class(use_mysql=False):
         def set_value(self, key, value, table=db_utils.TABLE_SHARED_APP_CONF):  # pylint: disable=useless-super-delegation
             super(NFSharedDatabase, self).set_value(key, value, table)
 
+        def set_values(self, dict_values, table=db_utils.TABLE_SHARED_APP_CONF):  # pylint: disable=useless-super-delegation
+            super(NFSharedDatabase, self).set_values(dict_values, table)
+
         def delete_key(self, key, table=db_utils.TABLE_SHARED_APP_CONF):  # pylint: disable=useless-super-delegation
             super(NFSharedDatabase, self).delete_key(key, table)
 
@@ -152,6 +163,26 @@ def get_shareddb_class(use_mysql=False):
             result = cur.fetchone()
             return result[0] if result is not None else default_value
 
+        @db_base_mysql.handle_connection
+        @db_base_sqlite.handle_connection
+        def get_tvshow_seasons_episodes_ids(self, tvshowid):
+            """
+            Get the IDs of all seasons and episodes of a tvshow
+            :return: a dict with the season IDs and the set of the episode IDs of each season
+            """
+            query = ('SELECT video_lib_seasons.SeasonID, video_lib_episodes.EpisodeID '
+                     'FROM video_lib_seasons '
+                     'LEFT JOIN video_lib_episodes '
+                     'ON video_lib_episodes.SeasonID = video_lib_seasons.SeasonID '
+                     'WHERE video_lib_seasons.TvShowID = ?')
+            cur = self._execute_query(query, (tvshowid,))
+            seasons = {}
+            for seasonid, episodeid in cur.fetchall():
+                episodes_ids = seasons.setdefault(seasonid, set())
+                if episodeid is not None:
+                    episodes_ids.add(episodeid)
+            return seasons
+
         @db_base_mysql.handle_connection
         @db_base_sqlite.handle_connection
         def get_all_video_id_list(self):
@@ -296,6 +327,37 @@ def get_shareddb_class(use_mysql=False):
                                 'VALUES (?, ?, ?)')
                 self._execute_non_query(insert_query, (seasonid, episodeid, file_path))
 
+        @db_base_mysql.handle_connection
+        @db_base_sqlite.handle_connection
+        def insert_episodes_bulk(self, tvshowid, nfo_export, exclude_update, episodes):
+            """
+            Update or insert a tvshow and insert the seasons and the episodes that not exists,
+            all within a single transaction
+            :param episodes: list of tuples with: seasonid, episodeid, file path
+            """
+            if self.is_mysql_database:
+                tvshow_queries = [
+                    ('INSERT INTO video_lib_tvshows (TvShowID, NfoExport, ExcludeUpdate) VALUES (?, ?, ?) '
+                     'ON DUPLICATE KEY UPDATE NfoExport = VALUES(NfoExport), ExcludeUpdate = VALUES(ExcludeUpdate)',
+                     [(tvshowid, str(nfo_export), str(exclude_update))])]
+                insert_season_query = ('INSERT INTO video_lib_seasons (TvShowID, SeasonID) VALUES (?, ?) '
+                                       'ON DUPLICATE KEY UPDATE SeasonID = SeasonID')
+                insert_episode_query = ('INSERT INTO video_lib_episodes (SeasonID, EpisodeID, FilePath) '
+                                        'VALUES (?, ?, ?) ON DUPLICATE KEY UPDATE EpisodeID = EpisodeID')
+            else:
+                tvshow_queries = [
+                    ('UPDATE video_lib_tvshows SET NfoExport = ?, ExcludeUpdate = ? WHERE TvShowID = ?',
+                     [(str(nfo_export), str(exclude_update), tvshowid)]),
+                    ('INSERT OR IGNORE INTO video_lib_tvshows (TvShowID, NfoExport, ExcludeUpdate) VALUES (?, ?, ?)',
+                     [(tvshowid, str(nfo_export), str(exclude_update))])]
+                insert_season_query = 'INSERT OR IGNORE INTO video_lib_seasons (TvShowID, SeasonID) VALUES (?, ?)'
+                insert_episode_query = ('INSERT OR IGNORE INTO video_lib_episodes (SeasonID, EpisodeID, FilePath) '
+                                        'VALUES (?, ?, ?)')
+            seasons_ids = sorted(set(seasonid for seasonid, _, _ in episodes))
+            self._execute_many_in_transaction(tvshow_queries + [
+                (insert_season_query, [(tvshowid, seasonid) for seasonid in seasons_ids]),
+                (insert_episode_query, episodes)])
+
         @db_base_mysql.handle_connection
         @db_base_sqlite.handle_connection
         def delete_movie(self, movieid):
@@ -447,10 +509,123 @@ def get_shareddb_class(use_mysql=False):
                     self._execute_non_query(insert_query, (profile_guid, videoid,
                                                            value, date_last_modified))
 
+        @db_base_mysql.handle_connection
+        @db_base_sqlite.handle_connection
+        def get_last_library_sync_job(self):
+            """Get the data of the last library sync job as dict, or None if there are no jobs"""
+            query = ('SELECT JobID, Status, StartTime, LastUpdate, TotalItems, '
+                     '(SELECT COUNT(*) FROM library_sync_journal '
+                     'WHERE library_sync_journal.JobID = library_sync_jobs.JobID) AS ProcessedItems '
+                     'FROM library_sync_jobs ORDER BY JobID DESC LIMIT 1')
+            cur = self.get_cursor_for_dict_results()
+            cur = self._execute_query(query, cursor=cur)
+            result = cur.fetchone()
+            if result:
+                result['StartTime'] = common.convert_from_string(result['StartTime'], datetime)
+                result['LastUpdate'] = common.convert_from_string(result['LastUpdate'], datetime)
+            return result
+
+        @db_base_mysql.handle_connection
+        @db_base_sqlite.handle_connection
+        def create_library_sync_job(self):
+            """Create a new running library sync job and return the job id"""
+            query = ('INSERT INTO library_sync_jobs (Status, StartTime, LastUpdate) '
+                     'VALUES (?, ?, ?)')
+            date_now = common.convert_to_string(datetime.now())
+            cur = self.get_cursor()
+            self._execute_non_query(query, (db_utils.LIB_SYNC_JOB_RUNNING, date_now, date_now), cur)
+            return cur.lastrowid
+
+        @db_base_mysql.handle_connection
+        @db_base_sqlite.handle_connection
+        def update_library_sync_job(self, job_id, status=None, total_items=None):
+            """
+            Update the status and/or the total items of a library sync job,
+            when a job is completed the journal of the processed video ids is deleted
+            """
+            data = db_utils.sql_filtered_update('library_sync_jobs',
+                                                ['Status', 'TotalItems', 'LastUpdate'],
+                                                ['JobID'],
+                                                [status, total_items,
+                                                 common.convert_to_string(datetime.now()), job_id])
+            self._execute_non_query(data[0], data[1])
+            if status == db_utils.LIB_SYNC_JOB_COMPLETED:
+                # The previous jobs are always completed, so all the journal is no longer needed
+                query = 'DELETE FROM library_sync_journal WHERE JobID <= ?'
+                self._execute_non_query(query, (job_id,))
+                # Keep only the history of the last jobs
+                query = 'DELETE FROM library_sync_jobs WHERE JobID <= ?'
+                self._execute_non_query(query, (job_id - LIB_SYNC_JOBS_HISTORY,))
+
+        @db_base_mysql.handle_connection
+        @db_base_sqlite.handle_connection
+        def get_library_sync_job_videoids(self, job_id):
+            """Get the video ids already processed by a library sync job"""
+            query = 'SELECT VideoID FROM library_sync_journal WHERE JobID = ?'
+            cur = self._execute_query(query, (job_id,))
+            return set(row[0] for row in cur.fetchall())
+
+        @db_base_mysql.handle_connection
+        @db_base_sqlite.handle_connection
+        def add_library_sync_job_videoid(self, job_id, videoid):
+            """Record a video id as processed by a library sync job"""
+            if self.is_mysql_database:
+                insert_query = ('INSERT INTO library_sync_journal (JobID, VideoID) VALUES (?, ?) '
+                                'ON DUPLICATE KEY UPDATE VideoID = VideoID')
+            else:
+                insert_query = 'INSERT OR IGNORE INTO library_sync_journal (JobID, VideoID) VALUES (?, ?)'
+            update_query = 'UPDATE library_sync_jobs SET LastUpdate = ? WHERE JobID = ?'
+            self._execute_many_in_transaction([
+                (insert_query, [(job_id, videoid)]),
+                (update_query, [(common.convert_to_string(datetime.now()), job_id)])])
+
+        @db_base_mysql.handle_connection
+        @db_base_sqlite.handle_connection
+        def get_library_files_hash(self, file_paths):
+            """Get the content hashes of the exported files, return a dict with: file path, content hash"""
+            paths_by_hash = {_get_path_hash(file_path): file_path for file_path in file_paths}
+            paths_hashes = list(paths_by_hash.keys())
+            files_hash = {}
+            for index in range(0, len(paths_hashes), MAX_QUERY_PARAMS):
+                chunk = paths_hashes[index:index + MAX_QUERY_PARAMS]
+                query = ('SELECT PathHash, ContentHash FROM video_lib_files_hash WHERE PathHash IN ({})'
+                         .format(','.join(['?'] * len(chunk))))
+                cur = self._execute_query(query, chunk)
+                for path_hash, content_hash in cur.fetchall():
+                    files_hash[paths_by_hash[path_hash]] = content_hash
+            return files_hash
+
+        @db_base_mysql.handle_connection
+        @db_base_sqlite.handle_connection
+        def set_library_files_hash(self, files_hash):
+            """Update or insert the content hashes of the exported files, within a single transaction"""
+            if self.is_mysql_database:
+                query = ('INSERT INTO video_lib_files_hash (PathHash, ContentHash) VALUES (?, ?) '
+                         'ON DUPLICATE KEY UPDATE ContentHash = VALUES(ContentHash)')
+            else:
+                query = 'INSERT OR REPLACE INTO video_lib_files_hash (PathHash, ContentHash) VALUES (?, ?)'
+            self._execute_many_in_transaction([
+                (query, [(_get_path_hash(file_path), content_hash)
+                         for file_path, content_hash in iteritems(files_hash)])])
+
+        @db_base_mysql.handle_connection
+        @db_base_sqlite.handle_connection
+        def delete_library_files_hash(self, file_paths):
+            """Delete the content hashes of the exported files"""
+            query = 'DELETE FROM video_lib_files_hash WHERE PathHash = ?'
+            self._execute_many_in_transaction([
+                (query, [(_get_path_hash(file_path),) for file_path in file_paths])])
+
         @db_base_mysql.handle_connection
         @db_base_sqlite.handle_connection
         def purge_library(self):
             """Delete all records from library tables"""
+            query = 'DELETE FROM video_lib_files_hash'
+            self._execute_non_query(query)
+            query = 'DELETE FROM library_sync_journal'
+            self._execute_non_query(query)
+            query = 'DELETE FROM library_sync_jobs'
+            self._execute_non_query(query)
             query = 'DELETE FROM video_lib_movies'
             self._execute_non_query(query)
             query = 'DELETE FROM video_lib_episodes'
@@ -461,3 +636,8 @@ def get_shareddb_class(use_mysql=False):
             self._execute_non_query(query)
 
     return NFSharedDatabase
+
+
+def _get_path_hash(file_path):
+    """Get the hash of a file path, used as key because the paths can be too long to be indexed"""
+    return hashlib.sha1(file_path.encode('utf-8')).hexdigest()
@@ -89,4 +89,94 @@ def run_shared_db_updates(current_version, upgrade_to_version):  # pylint: disab
             shared_db_conn.conn.close()
 
     if common.is_less_version(current_version, '0.3'):
+        # Changes: added tables 'library_sync_jobs' and 'library_sync_journal'
+        # (the MySQL database could be already created with these tables by a newer version)
+
+        # SQLite
+        import sqlite3 as sql
+        from resources.lib.database.db_base_sqlite import CONN_ISOLATION_LEVEL
+        from resources.lib.database import db_utils
+
+        shared_db_conn = sql.connect(db_utils.get_local_db_path(db_utils.SHARED_DB_FILENAME),
+                                     isolation_level=CONN_ISOLATION_LEVEL)
+        cur = shared_db_conn.cursor()
+
+        table = str('CREATE TABLE IF NOT EXISTS library_sync_jobs ('
+                    'JobID      INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,'
+                    'Status     TEXT    NOT NULL,'
+                    'StartTime  TEXT    NOT NULL,'
+                    'LastUpdate TEXT    NOT NULL,'
+                    'TotalItems INTEGER NOT NULL DEFAULT 0);')
+        cur.execute(table)
+
+        table = str('CREATE TABLE IF NOT EXISTS library_sync_journal ('
+                    'JobID   INTEGER NOT NULL,'
+                    'VideoID INTEGER NOT NULL,'
+                    'PRIMARY KEY (JobID, VideoID));')
+        cur.execute(table)
+        shared_db_conn.close()
+
+        # MySQL
+        if g.ADDON.getSettingBool('use_mysql'):
+            import mysql.connector
+            from resources.lib.database.db_base_mysql import MySQLDatabase
+
+            shared_db_conn = MySQLDatabase()
+            shared_db_conn.conn = mysql.connector.connect(**shared_db_conn.config)
+            cur = shared_db_conn.conn.cursor()
+
+            table = ('CREATE TABLE IF NOT EXISTS netflix_addon.library_sync_jobs ('
+                     'JobID INT(11) NOT NULL AUTO_INCREMENT,'
+                     'Status VARCHAR(20) NOT NULL,'
+                     'StartTime VARCHAR(50) NOT NULL,'
+                     'LastUpdate VARCHAR(50) NOT NULL,'
+                     'TotalItems INT(11) NOT NULL DEFAULT 0,'
+                     'PRIMARY KEY (JobID))'
+                     'ENGINE = INNODB, CHARACTER SET utf8mb4, COLLATE utf8mb4_unicode_ci;')
+            cur.execute(table)
+
+            table = ('CREATE TABLE IF NOT EXISTS netflix_addon.library_sync_journal ('
+                     'JobID INT(11) NOT NULL,'
+                     'VideoID INT(11) NOT NULL,'
+                     'PRIMARY KEY (JobID, VideoID))'
+                     'ENGINE = INNODB, CHARACTER SET utf8mb4, COLLATE utf8mb4_unicode_ci;')
+            cur.execute(table)
+            shared_db_conn.conn.close()
+
+    if common.is_less_version(current_version, '0.4'):
+        # Changes: added table 'video_lib_files_hash'
+
+        # SQLite
+        import sqlite3 as sql
+        from resources.lib.database.db_base_sqlite import CONN_ISOLATION_LEVEL
+        from resources.lib.database import db_utils
+
+        shared_db_conn = sql.connect(db_utils.get_local_db_path(db_utils.SHARED_DB_FILENAME),
+                                     isolation_level=CONN_ISOLATION_LEVEL)
+        cur = shared_db_conn.cursor()
+
+        table = str('CREATE TABLE IF NOT EXISTS video_lib_files_hash ('
+                    'PathHash    TEXT PRIMARY KEY NOT NULL,'
+                    'ContentHash TEXT NOT NULL);')
+        cur.execute(table)
+        shared_db_conn.close()
+
+        # MySQL
+        if g.ADDON.getSettingBool('use_mysql'):
+            import mysql.connector
+            from resources.lib.database.db_base_mysql import MySQLDatabase
+
+            shared_db_conn = MySQLDatabase()
+            shared_db_conn.conn = mysql.connector.connect(**shared_db_conn.config)
+            cur = shared_db_conn.conn.cursor()
+
+            table = ('CREATE TABLE IF NOT EXISTS netflix_addon.video_lib_files_hash ('
+                     'PathHash CHAR(40) NOT NULL,'
+                     'ContentHash CHAR(40) NOT NULL,'
+                     'PRIMARY KEY (PathHash))'
+                     'ENGINE = INNODB, CHARACTER SET utf8mb4, COLLATE utf8mb4_unicode_ci;')
+            cur.execute(table)
+            shared_db_conn.conn.close()
+
+    if common.is_less_version(current_version, '0.5'):
         pass
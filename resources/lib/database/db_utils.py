@@ -36,6 +36,11 @@ VidLibProp = {
     'file_path': 'FilePath'
 }
 
+# Status of the library sync jobs
+LIB_SYNC_JOB_RUNNING = 'running'
+LIB_SYNC_JOB_INTERRUPTED = 'interrupted'
+LIB_SYNC_JOB_COMPLETED = 'completed'
+
 
 def get_local_db_path(db_filename):
     # First ensure database folder exists
@@ -253,25 +253,34 @@ def _best_art(arts):
 def get_info_from_netflix(videoids):
     """Get infolabels and arts from cache (if exist) or Netflix API, for multiple videoid"""
     profile_language_code = g.LOCAL_DB.get_profile_config('language', '')
+    cache_identifiers = [videoid.value + '_' + profile_language_code for videoid in videoids]
+    # Get the data of all videoids with a single request for each cache bucket
+    cached_infos = g.CACHE.get_many(CACHE_INFOLABELS, cache_identifiers)
+    cached_arts = g.CACHE.get_many(CACHE_ARTINFO, cache_identifiers)
     videoids_to_request = []
     info_data = {}
-    for videoid in videoids:
-        try:
-            infos = get_info(videoid, None, None, profile_language_code)[0]
-            art = _get_art(videoid, None, profile_language_code)
-            info_data[videoid.value] = infos, art
+    for videoid, cache_identifier in zip(videoids, cache_identifiers):
+        if cache_identifier in cached_infos and cache_identifier in cached_arts:
+            info_data[videoid.value] = cached_infos[cache_identifier]['infos'], cached_arts[cache_identifier]
             common.debug('Got infolabels and art from cache for videoid {}', videoid)
-        except (AttributeError, TypeError):
+        else:
             videoids_to_request.append(videoid)
 
     if videoids_to_request:
         # Retrieve missing data from API
         common.debug('Retrieving infolabels and art from API for {} videoids', len(videoids_to_request))
         raw_data = api.get_video_raw_data(videoids_to_request)
+        infos_to_cache = {}
+        arts_to_cache = {}
         for videoid in videoids_to_request:
-            infos = get_info(videoid, raw_data['videos'][videoid.value], raw_data, profile_language_code)[0]
-            art = get_art(videoid, raw_data['videos'][videoid.value], profile_language_code)
+            cache_identifier = videoid.value + '_' + profile_language_code
+            infos, quality_infos = parse_info(videoid, raw_data['videos'][videoid.value], raw_data)
+            art = parse_art(videoid, raw_data['videos'][videoid.value])
+            infos_to_cache[cache_identifier] = {'infos': infos, 'quality_infos': quality_infos}
+            arts_to_cache[cache_identifier] = art
             info_data[videoid.value] = infos, art
+        g.CACHE.add_many(CACHE_INFOLABELS, infos_to_cache)
+        g.CACHE.add_many(CACHE_ARTINFO, arts_to_cache)
     return info_data
 
 
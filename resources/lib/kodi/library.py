@@ -10,7 +10,6 @@
 from __future__ import absolute_import, division, unicode_literals
 
 import os
-import random
 from functools import wraps
 
 import xbmc
@@ -21,7 +20,9 @@ import resources.lib.kodi.ui as ui
 from resources.lib.api.paths import PATH_REQUEST_SIZE_STD
 from resources.lib.globals import g
 from resources.lib.kodi.library_items import (export_item, remove_item, export_new_item, get_item,
+                                              library_export_batch, pop_changed_folders,
                                               ItemNotFound, FOLDER_MOVIES, FOLDER_TV, library_path)
+from resources.lib.kodi.library_metadata import prefetch_metadata
 from resources.lib.kodi.library_tasks import compile_tasks, execute_tasks
 
 try:  # Kodi >= 19
@@ -41,11 +42,13 @@ def update_kodi_library(library_operation):
         if is_remove:
             _remove_from_kodi_library(videoid)
         library_operation(videoid, task_handler, *args, **kwargs)
-        if not is_remove:
+        # Only the folders with new or changed files need to be scanned
+        changed_folders = pop_changed_folders()
+        if not is_remove and changed_folders:
             # Update Kodi library through service
             # This prevents a second call to cancel the update
             common.debug('Notify service to update the library')
-            common.send_signal(common.Signals.LIBRARY_UPDATE_REQUESTED)
+            common.send_signal(common.Signals.LIBRARY_UPDATE_REQUESTED, list(changed_folders))
 
     return kodi_library_update_wrapper
 
@@ -95,12 +98,13 @@ def is_in_library(videoid):
     raise common.InvalidVideoId('videoid {} type not implemented'.format(videoid))
 
 
-def export_new_episodes(videoid, silent=False, nfo_settings=None):
+def export_new_episodes(videoid, silent=False, nfo_settings=None, metadata=None):
     """
     Export new episodes for a tv show by it's video id
     :param videoid: The videoid of the tv show to process
     :param silent: don't display user interface while exporting
     :param nfo_settings: the nfo settings
+    :param metadata: the refreshed metadata of the tv show, if not specified will be requested
     :return: None
     """
 
@@ -110,34 +114,37 @@ def export_new_episodes(videoid, silent=False, nfo_settings=None):
         common.debug('Exporting new episodes for {}', videoid)
         method(videoid, [export_new_item],
                title=common.get_local_string(30198),
-               nfo_settings=nfo_settings)
+               nfo_settings=nfo_settings,
+               metadata=metadata)
     else:
         common.debug('{} is not a tv show, no new episodes will be exported', videoid)
 
 
 @update_kodi_library
-def execute_library_tasks(videoid, task_handlers, title, nfo_settings=None):
+def execute_library_tasks(videoid, task_handlers, title, nfo_settings=None, metadata=None):
     """Execute library tasks for videoid and show errors in foreground"""
     for task_handler in task_handlers:
         execute_tasks(title=title,
-                      tasks=compile_tasks(videoid, task_handler, nfo_settings),
+                      tasks=compile_tasks(videoid, task_handler, nfo_settings, metadata),
                       task_handler=task_handler,
                       notify_errors=True,
                       library_home=library_path())
 
 
 @update_kodi_library
-def execute_library_tasks_silently(videoid, task_handlers, title=None, nfo_settings=None):
+def execute_library_tasks_silently(videoid, task_handlers, title=None, nfo_settings=None, metadata=None):
     """Execute library tasks for videoid and don't show any GUI feedback"""
     # pylint: disable=unused-argument
     for task_handler in task_handlers:
-        for task in compile_tasks(videoid, task_handler, nfo_settings):
-            try:
-                task_handler(task, library_path())
-            except Exception:  # pylint: disable=broad-except
-                import traceback
-                common.error(g.py2_decode(traceback.format_exc(), 'latin-1'))
-                common.error('{} of {} failed', task_handler.__name__, task['title'])
+        # The exported items are written and added to the database all together at the end
+        with library_export_batch():
+            for task in compile_tasks(videoid, task_handler, nfo_settings, metadata):
+                try:
+                    task_handler(task, library_path())
+                except Exception:  # pylint: disable=broad-except
+                    import traceback
+                    common.error(g.py2_decode(traceback.format_exc(), 'latin-1'))
+                    common.error('{} of {} failed', task_handler.__name__, task['title'])
 
 
 def sync_mylist_to_library():
@@ -151,14 +158,16 @@ def sync_mylist_to_library():
     nfo_settings.show_export_dialog()
 
     mylist_video_id_list, mylist_video_id_list_type = common.make_call('get_mylist_videoids_profile_switch')
-    for index, video_id in enumerate(mylist_video_id_list):
-        videoid = common.VideoId(
-            **{('movieid' if (mylist_video_id_list_type[index] == 'movie') else 'tvshowid'): video_id})
+    videoids = [common.VideoId(**{('movieid' if (mylist_video_id_list_type[index] == 'movie') else 'tvshowid'): video_id})
+                for index, video_id in enumerate(mylist_video_id_list)]
+    # The metadata are requested in background (with a limited rate), while the items are exported
+    for videoid, metadata in prefetch_metadata(videoids):
+        if not metadata:
+            continue
         execute_library_tasks(videoid, [export_item],
                               common.get_local_string(30018),
-                              nfo_settings=nfo_settings)
-        # Add some randomness between operations to limit servers load and ban risks
-        xbmc.sleep(random.randint(1000, 3001))
+                              nfo_settings=nfo_settings,
+                              metadata=metadata)
 
 
 @common.time_execution(immediate=False)
@@ -10,24 +10,22 @@
 """
 from __future__ import absolute_import, division, unicode_literals
 
-import random
+import time
 from datetime import datetime, timedelta
 
-import xbmc
-
 import resources.lib.common as common
 import resources.lib.kodi.nfo as nfo
 import resources.lib.kodi.ui as ui
-from resources.lib.database.db_utils import (VidLibProp)
+from resources.lib.database.db_utils import (VidLibProp, LIB_SYNC_JOB_RUNNING, LIB_SYNC_JOB_INTERRUPTED,
+                                             LIB_SYNC_JOB_COMPLETED)
 from resources.lib.globals import g
 from resources.lib.kodi.library import (export_new_episodes, execute_library_tasks_silently,
                                         execute_library_tasks)
 from resources.lib.kodi.library_items import export_item, remove_item
+from resources.lib.kodi.library_metadata import prefetch_metadata
 
-try:  # Python 2
-    unicode
-except NameError:  # Python 3
-    unicode = str  # pylint: disable=redefined-builtin
+# A running job that has not processed any item for this time is considered interrupted
+LIB_SYNC_JOB_TIMEOUT = timedelta(minutes=30)
 
 
 def show_excluded_from_auto_update(videoid):
@@ -50,40 +48,44 @@ def auto_update_library(sync_with_mylist, silent):
     :param silent: don't display user interface while performing an operation
     :return: None
     """
-    if _is_auto_update_library_running():
+    last_job = g.SHARED_DB.get_last_library_sync_job()
+    if _is_auto_update_library_running(last_job):
         return
     execute_lib_tasks_method = execute_library_tasks_silently if silent else execute_library_tasks
     common.info(
         'Starting auto update library - check updates for tv shows (sync with My List is {})',
         'ENABLED' if sync_with_mylist else 'DISABLED')
-    g.SHARED_DB.set_value('library_auto_update_is_running', True)
-    g.SHARED_DB.set_value('library_auto_update_start_time', datetime.now())
+    # The progress is recorded in a journal, so an interrupted job is resumed by skipping the processed items
+    if last_job and last_job['Status'] != LIB_SYNC_JOB_COMPLETED:
+        job_id = last_job['JobID']
+        g.SHARED_DB.update_library_sync_job(job_id, LIB_SYNC_JOB_RUNNING)
+        processed_videoids_values = g.SHARED_DB.get_library_sync_job_videoids(job_id)
+        common.info('Resuming the interrupted auto update library started on {} ({} items already processed)',
+                    last_job['StartTime'], len(processed_videoids_values))
+    else:
+        job_id = g.SHARED_DB.create_library_sync_job()
+        processed_videoids_values = set()
     try:
         videoids_to_update = []
 
-        # Get the list of the exported items to Kodi library
-        exported_tvshows_videoids_values = g.SHARED_DB.get_tvshows_id_list()
-        exported_movies_videoids_values = g.SHARED_DB.get_movies_id_list()
+        # Get the exported items to Kodi library (as sets to compare them quickly)
+        exported_tvshows_videoids_values = set(g.SHARED_DB.get_tvshows_id_list())
+        exported_movies_videoids_values = set(g.SHARED_DB.get_movies_id_list())
 
         if sync_with_mylist:
             # Get My List videoids of the chosen profile
             # Use make_http_call instead make_http because call AddonSignals on same instance makes problems
             mylist_video_id_list, mylist_video_id_list_type = common.make_http_call(
                 'get_mylist_videoids_profile_switch', None)
+            mylist_videoids_values = set(int(video_id) for video_id in mylist_video_id_list)
 
-            # Check if tv shows have been removed from the My List
-            for videoid_value in exported_tvshows_videoids_values:
-                if unicode(videoid_value) in mylist_video_id_list:
-                    continue
-                # The tv show no more exist in My List so remove it from library
+            # Remove from library the tv shows that no more exist in My List
+            for videoid_value in exported_tvshows_videoids_values - mylist_videoids_values:
                 videoid = common.VideoId.from_path([common.VideoId.SHOW, videoid_value])
                 execute_lib_tasks_method(videoid, [remove_item])
 
-            # Check if movies have been removed from the My List
-            for videoid_value in exported_movies_videoids_values:
-                if unicode(videoid_value) in mylist_video_id_list:
-                    continue
-                # The movie no more exist in My List so remove it from library
+            # Remove from library the movies that no more exist in My List
+            for videoid_value in exported_movies_videoids_values - mylist_videoids_values:
                 videoid = common.VideoId.from_path([common.VideoId.MOVIE, videoid_value])
                 execute_lib_tasks_method(videoid, [remove_item])
 
@@ -104,42 +106,56 @@ def auto_update_library(sync_with_mylist, silent):
         videoids_to_update.extend(list(set(tvshows_videoids_to_upd) - set(videoids_to_update)))
 
         # Add missing tv shows/movies or update existing tv shows
-        _update_library(videoids_to_update, exported_tvshows_videoids_values, silent)
+        _update_library(videoids_to_update, exported_tvshows_videoids_values, silent,
+                        job_id, processed_videoids_values)
 
         common.debug('Auto update of the library completed')
-        g.SHARED_DB.set_value('library_auto_update_is_running', False)
+        g.SHARED_DB.update_library_sync_job(job_id, LIB_SYNC_JOB_COMPLETED)
         if not g.ADDON.getSettingBool('lib_auto_upd_disable_notification'):
             ui.show_notification(common.get_local_string(30220), time=5000)
-        common.debug('Notify service to communicate to Kodi of update the library')
-        common.send_signal(common.Signals.LIBRARY_UPDATE_REQUESTED)
     except Exception:  # pylint: disable=broad-except
         import traceback
         common.error('An error has occurred in the library auto update')
         common.error(g.py2_decode(traceback.format_exc(), 'latin-1'))
-        g.SHARED_DB.set_value('library_auto_update_is_running', False)
+        g.SHARED_DB.update_library_sync_job(job_id, LIB_SYNC_JOB_INTERRUPTED)
 
 
-def _is_auto_update_library_running():
-    update = g.SHARED_DB.get_value('library_auto_update_is_running', False)
-    if update:
-        start_time = g.SHARED_DB.get_value('library_auto_update_start_time',
-                                           datetime.utcfromtimestamp(0))
-        if datetime.now() >= start_time + timedelta(hours=6):
-            g.SHARED_DB.set_value('library_auto_update_is_running', False)
-            common.warn('Canceling previous library update: duration >6 hours')
-        else:
+def is_auto_update_library_interrupted():
+    """Return true if the last auto update of the library has been interrupted and can be resumed"""
+    last_job = g.SHARED_DB.get_last_library_sync_job()
+    if not last_job or last_job['Status'] == LIB_SYNC_JOB_COMPLETED:
+        return False
+    return not _is_auto_update_library_running(last_job)
+
+
+def _is_auto_update_library_running(last_job):
+    if last_job and last_job['Status'] == LIB_SYNC_JOB_RUNNING:
+        if datetime.now() < last_job['LastUpdate'] + LIB_SYNC_JOB_TIMEOUT:
             common.debug('Library auto update is already running')
             return True
+        common.warn('The previous library auto update has not been updated for too long, '
+                    'it is considered interrupted')
     return False
 
 
-def _update_library(videoids_to_update, exported_tvshows_videoids_values, silent):
+def _update_library(videoids_to_update, exported_tvshows_videoids_values, silent,
+                    job_id, processed_videoids_values):
     execute_lib_tasks_method = execute_library_tasks_silently if silent else execute_library_tasks
-    # Get the list of the Tv Shows exported to exclude from updates
-    excluded_videoids_values = g.SHARED_DB.get_tvshows_id_list(VidLibProp['exclude_update'], True)
-    for videoid in videoids_to_update:
-        # Check if current videoid is excluded from updates
-        if int(videoid.value) in excluded_videoids_values:
+    # Get the Tv Shows exported to exclude from updates
+    excluded_videoids_values = set(g.SHARED_DB.get_tvshows_id_list(VidLibProp['exclude_update'], True))
+    # Skip also the items already processed by an interrupted job
+    videoids_to_update = [videoid for videoid in videoids_to_update
+                          if int(videoid.value) not in excluded_videoids_values and
+                          int(videoid.value) not in processed_videoids_values]
+    total_items = len(processed_videoids_values) + len(videoids_to_update)
+    g.SHARED_DB.update_library_sync_job(job_id, total_items=total_items)
+    processed_items = 0
+    start_time = time.time()
+    # The metadata are requested in background (with a limited rate), while the items are exported,
+    # only the metadata of the tv shows are refreshed, to get the new seasons/episodes
+    for videoid, metadata in prefetch_metadata(videoids_to_update,
+                                               refresh=lambda videoid: videoid.mediatype == common.VideoId.SHOW):
+        if not metadata:
             continue
         if int(videoid.value) in exported_tvshows_videoids_values:
             # It is possible that the user has chosen not to export NFO files for a tv show
@@ -149,8 +165,13 @@ def _update_library(videoids_to_update, exported_tvshows_videoids_values, silent
         else:
             nfo_settings = nfo.NFOSettings()
         if videoid.mediatype == common.VideoId.SHOW:
-            export_new_episodes(videoid, silent, nfo_settings)
+            export_new_episodes(videoid, silent, nfo_settings, metadata)
         if videoid.mediatype == common.VideoId.MOVIE:
-            execute_lib_tasks_method(videoid, [export_item], nfo_settings=nfo_settings)
-        # Add some randomness between operations to limit servers load and ban risks
-        xbmc.sleep(random.randint(1000, 5001))
+            execute_lib_tasks_method(videoid, [export_item], nfo_settings=nfo_settings, metadata=metadata)
+        g.SHARED_DB.add_library_sync_job_videoid(job_id, int(videoid.value))
+        processed_items += 1
+        common.debug('Auto update library progress: {} of {} items processed',
+                     len(processed_videoids_values) + processed_items, total_items)
+    elapsed_time = time.time() - start_time
+    common.info('Auto update library: {} items processed in {:.0f} seconds ({:.1f} items/minute)',
+                processed_items, elapsed_time, processed_items * 60 / elapsed_time if elapsed_time else 0)
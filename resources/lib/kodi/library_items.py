@@ -9,13 +9,19 @@
 """
 from __future__ import absolute_import, division, unicode_literals
 
+import hashlib
 import os
 import re
+import threading
 import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from contextlib import contextmanager
 
 import xbmc
 import xbmcvfs
 
+from future.utils import iteritems
+
 import resources.lib.api.api_requests as api
 import resources.lib.common as common
 import resources.lib.kodi.ui as ui
@@ -32,6 +38,12 @@ FOLDER_MOVIES = 'movies'
 FOLDER_TV = 'shows'
 ILLEGAL_CHARACTERS = '[<|>|"|?|$|!|:|#|*]'
 
+# The items exported within a library_export_batch, to be added to the database all together
+_DB_BATCH = threading.local()
+# The files exported within a library_export_batch, to be written all together,
+# and the folders of the written files, to be scanned by the Kodi library update
+_FILES_BATCH = threading.local()
+
 
 class ItemNotFound(Exception):
     """The requested item could not be found in the Kodi library"""
@@ -153,15 +165,21 @@ def export_item(item_task, library_home):
     destination_folder = g.py2_decode(makeLegalFilename('/'.join(
         [library_home, item_task['section'], item_task['destination']])))
     _create_destination_folder(destination_folder)
+    item_files = []
     if item_task['is_strm']:
         export_filename = g.py2_decode(makeLegalFilename('/'.join(
             [destination_folder, item_task['filename'] + '.strm'])))
-        _add_to_library(item_task['videoid'], export_filename, (item_task['nfo_data'] is not None))
         _write_strm_file(item_task, export_filename)
+        item_files.append(export_filename)
     if item_task['nfo_data'] is not None:
         nfo_filename = g.py2_decode(makeLegalFilename('/'.join(
             [destination_folder, item_task['filename'] + '.nfo'])))
         _write_nfo_file(item_task['nfo_data'], nfo_filename)
+        item_files.append(nfo_filename)
+    if item_task['is_strm']:
+        # Added after the files, so that an item is never in the database without its files
+        _add_to_library(item_task['videoid'], export_filename, (item_task['nfo_data'] is not None),
+                        item_files=item_files)
     common.debug('Exported {}', item_task['title'])
 
 
@@ -171,35 +189,136 @@ def _create_destination_folder(destination_folder):
         xbmcvfs.mkdirs(destination_folder)
 
 
-def _add_to_library(videoid, export_filename, nfo_export, exclude_update=False):
+def _add_to_library(videoid, export_filename, nfo_export, exclude_update=False, item_files=None):
     """Add an exported file to the library"""
-    if videoid.mediatype == common.VideoId.EPISODE:
-        g.SHARED_DB.set_tvshow(videoid.tvshowid, nfo_export, exclude_update)
-        g.SHARED_DB.insert_season(videoid.tvshowid, videoid.seasonid)
-        g.SHARED_DB.insert_episode(videoid.tvshowid, videoid.seasonid,
-                                   videoid.value, export_filename)
-    elif videoid.mediatype == common.VideoId.MOVIE:
-        g.SHARED_DB.set_movie(videoid.value, export_filename, nfo_export)
+    items = getattr(_DB_BATCH, 'items', None)
+    if items is None:
+        _add_items_to_library([(videoid, export_filename, nfo_export, exclude_update, item_files or [])])
+    else:
+        items.append((videoid, export_filename, nfo_export, exclude_update, item_files or []))
+
+
+def _add_items_to_library(items, failed_files=None):
+    """
+    Add the exported items to the database, the episodes with a single transaction for each tvshow,
+    the items with files that could not be written are not added
+    """
+    tvshows = OrderedDict()
+    for videoid, export_filename, nfo_export, exclude_update, item_files in items:
+        if failed_files and any(file_path in failed_files for file_path in item_files):
+            common.warn('{} not added to the library, its files could not be written', export_filename)
+            continue
+        if videoid.mediatype == common.VideoId.EPISODE:
+            tvshow_data = tvshows.setdefault(videoid.tvshowid, {'episodes': []})
+            tvshow_data['nfo_export'] = nfo_export
+            tvshow_data['exclude_update'] = exclude_update
+            tvshow_data['episodes'].append((videoid.seasonid, videoid.value, export_filename))
+        elif videoid.mediatype == common.VideoId.MOVIE:
+            g.SHARED_DB.set_movie(videoid.value, export_filename, nfo_export)
+    for tvshowid, tvshow_data in iteritems(tvshows):
+        g.SHARED_DB.insert_episodes_bulk(tvshowid, tvshow_data['nfo_export'], tvshow_data['exclude_update'],
+                                         tvshow_data['episodes'])
 
 
 def _write_strm_file(item_task, export_filename):
     """Write the playable URL to a strm file"""
-    filehandle = xbmcvfs.File(xbmc.translatePath(export_filename), 'wb')
-    try:
-        filehandle.write(bytearray(common.build_url(videoid=item_task['videoid'],
-                                                    mode=g.MODE_PLAY).encode('utf-8')))
-    finally:
-        filehandle.close()
+    _write_file(export_filename,
+                common.build_url(videoid=item_task['videoid'], mode=g.MODE_PLAY).encode('utf-8'))
 
 
 def _write_nfo_file(nfo_data, nfo_filename):
     """Write the NFO file"""
-    filehandle = xbmcvfs.File(xbmc.translatePath(nfo_filename), 'wb')
+    _write_file(nfo_filename,
+                '<?xml version=\'1.0\' encoding=\'UTF-8\'?>'.encode('utf-8') +
+                ET.tostring(nfo_data, encoding='utf-8', method='xml'))
+
+
+@contextmanager
+def library_export_batch():
+    """
+    Context manager to collect the files and the items exported to the library, at the exit
+    are written only the files with a content changed from the previous export, then the items
+    are added to the database, except the items with files that could not be written.
+    It yields a dict where are added the paths of the files that could not be written, with the error.
+    A batch opened within another batch of the same thread is merged with the outer batch
+    """
+    if getattr(_FILES_BATCH, 'files', None) is not None:
+        # Nested batch, the files and the items will be processed at the exit of the outer batch
+        yield _FILES_BATCH.failed_files
+        return
+    _FILES_BATCH.files = OrderedDict()
+    _FILES_BATCH.failed_files = failed_files = OrderedDict()
+    _DB_BATCH.items = []
     try:
-        filehandle.write(bytearray('<?xml version=\'1.0\' encoding=\'UTF-8\'?>'.encode('utf-8')))
-        filehandle.write(bytearray(ET.tostring(nfo_data, encoding='utf-8', method='xml')))
+        yield failed_files
     finally:
-        filehandle.close()
+        files = _FILES_BATCH.files
+        items = _DB_BATCH.items
+        _FILES_BATCH.files = None
+        _FILES_BATCH.failed_files = None
+        _DB_BATCH.items = None
+        failed_files.update(_write_files(files))
+        _add_items_to_library(items, failed_files)
+
+
+def pop_changed_folders():
+    """Get the folders where the current thread has written files since the last call"""
+    changed_folders = getattr(_FILES_BATCH, 'changed_folders', None) or set()
+    _FILES_BATCH.changed_folders = set()
+    return changed_folders
+
+
+def _write_file(file_path, content):
+    files = getattr(_FILES_BATCH, 'files', None)
+    if files is None:
+        failed_files = _write_files({file_path: content})
+        if failed_files:
+            raise IOError('Cannot write the file {}: {}'.format(file_path, failed_files[file_path]))
+    else:
+        files[file_path] = content
+
+
+def _write_files(files):
+    """
+    Write the files, skip the files that already exist with the same content
+    (compared with the hashes stored at the previous export) to avoid needless writes and library scans
+
+    :return: a dict with the paths of the files that could not be written and the errors
+    """
+    failed_files = OrderedDict()
+    if not files:
+        return failed_files
+    stored_hashes = g.SHARED_DB.get_library_files_hash(list(files.keys()))
+    written_hashes = {}
+    skipped_writes = 0
+    for file_path, content in iteritems(files):
+        content_hash = hashlib.sha1(content).hexdigest()
+        translated_path = xbmc.translatePath(file_path)
+        if stored_hashes.get(file_path) == content_hash and xbmcvfs.exists(translated_path):
+            skipped_writes += 1
+            continue
+        try:
+            filehandle = xbmcvfs.File(translated_path, 'wb')
+            try:
+                if not filehandle.write(bytearray(content)):
+                    raise IOError('The file write has failed')
+            finally:
+                filehandle.close()
+        except Exception as exc:  # pylint: disable=broad-except
+            import traceback
+            common.error(g.py2_decode(traceback.format_exc(), 'latin-1'))
+            failed_files[file_path] = '{}: {}'.format(type(exc).__name__, exc)
+            continue
+        written_hashes[file_path] = content_hash
+    if written_hashes:
+        g.SHARED_DB.set_library_files_hash(written_hashes)
+        changed_folders = getattr(_FILES_BATCH, 'changed_folders', None)
+        if changed_folders is None:
+            changed_folders = _FILES_BATCH.changed_folders = set()
+        changed_folders.update(os.path.dirname(file_path) for file_path in written_hashes)
+    common.info('Library export: {} files written, {} writes of unchanged files avoided, {} writes failed',
+                len(written_hashes), skipped_writes, len(failed_files))
+    return failed_files
 
 
 def remove_item(item_task, library_home=None):
@@ -234,6 +353,8 @@ def remove_item(item_task, library_home=None):
             xbmcvfs.rmdir(parent_folder)
 
         _remove_videoid_from_db(videoid)
+        g.SHARED_DB.delete_library_files_hash([item_task['filepath'],
+                                               os.path.splitext(item_task['filepath'])[0] + '.nfo'])
     except ItemNotFound:
         common.warn('The video with id {} not exists in the database', videoid)
     except Exception as exc:
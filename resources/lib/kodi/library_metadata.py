@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+    Copyright (C) 2017 Sebastian Golasch (plugin.video.netflix)
+    Kodi library integration: metadata prefetch for the library exports
+
+    SPDX-License-Identifier: MIT
+    See LICENSES/MIT.md for more information.
+"""
+from __future__ import absolute_import, division, unicode_literals
+
+import threading
+import time
+
+import resources.lib.api.api_requests as api
+import resources.lib.common as common
+from resources.lib.api.exceptions import MetadataNotAvailable
+from resources.lib.database.db_base_sqlite import close_thread_connections
+from resources.lib.globals import g
+
+try:  # Python 3
+    from queue import Queue, Empty
+except ImportError:  # Python 2
+    from Queue import Queue, Empty
+
+# Limits of the metadata requests to avoid servers overload and ban risks,
+# on average one request every two seconds, with bursts of max three requests
+METADATA_REQUESTS_RATE = 0.5  # Requests per second
+METADATA_REQUESTS_BURST = 3
+METADATA_WORKERS = 2
+
+
+class TokenBucket(object):
+    """
+    Rate limiter that allow on average 'rate' operations per second, with bursts of max 'capacity' operations
+    """
+    def __init__(self, rate, capacity, clock=time.time):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.clock = clock
+        self.last_time = clock()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token, return the seconds to wait before to use it"""
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_time) * self.rate)
+            self.last_time = now
+            self.tokens -= 1
+            # When there are no tokens available, the token is taken in advance
+            return -self.tokens / self.rate if self.tokens < 0 else 0
+
+
+def prefetch_metadata(videoids, refresh=False, workers=None, rate_limiter=None,
+                      get_metadata_func=None):
+    """
+    Get the metadata of the videoids by using a pool of worker threads, the requests rate is limited
+
+    (generator) yield a tuple with the videoid and its metadata as soon as each metadata is received,
+    the metadata is None when it is not available
+    :param videoids: list of VideoId
+    :param refresh: if True refresh the cached metadata,
+                    can be also a function that receives the videoid and returns if refresh its metadata
+    :param workers: number of worker threads, if not specified it depends on the IPC in use
+    :param rate_limiter: a TokenBucket instance, if not specified a default one is used
+    :param get_metadata_func: function used to get the metadata, default api.get_metadata
+    """
+    get_metadata_func = get_metadata_func or api.get_metadata
+    if workers is None:
+        workers = _get_default_workers()
+    rate_limiter = rate_limiter or TokenBucket(METADATA_REQUESTS_RATE, METADATA_REQUESTS_BURST)
+    videoids_queue = Queue()
+    for videoid in videoids:
+        videoids_queue.put(videoid)
+    results_queue = Queue()
+    stop_event = threading.Event()
+
+    def _worker():
+        try:
+            while not stop_event.is_set():
+                try:
+                    videoid = videoids_queue.get_nowait()
+                except Empty:
+                    break
+                if stop_event.wait(rate_limiter.reserve()):
+                    break
+                metadata = None
+                try:
+                    metadata = _get_metadata(get_metadata_func, videoid, refresh)
+                finally:
+                    # Always send a result, otherwise the caller would wait forever
+                    results_queue.put((videoid, metadata))
+        finally:
+            close_thread_connections()
+
+    for _ in range(min(workers, len(videoids))):
+        thread = threading.Thread(target=_worker)
+        thread.daemon = True
+        thread.start()
+    try:
+        for _ in range(len(videoids)):
+            yield results_queue.get()
+    finally:
+        # Stop the workers also when the caller stops to iterate
+        stop_event.set()
+
+
+def _get_default_workers():
+    # AddonSignals handle the return of the calls with a single slot for each call name,
+    # then the concurrent calls with the same name overwrite the return of each other,
+    # so concurrent requests are possible only with the IPC over HTTP or within the service
+    if g.IPC_OVER_HTTP or g.IS_SERVICE:
+        return METADATA_WORKERS
+    return 1
+
+
+def _get_metadata(get_metadata_func, videoid, refresh):
+    try:
+        return get_metadata_func(videoid, refresh(videoid) if callable(refresh) else refresh)
+    except MetadataNotAvailable:
+        common.warn('Metadata not available for videoid {}', videoid)
+    except Exception:  # pylint: disable=broad-except
+        import traceback
+        common.error(g.py2_decode(traceback.format_exc(), 'latin-1'))
+    return None
@@ -15,13 +15,15 @@ import re
 
 import xbmcgui
 
+from future.utils import iteritems
+
 import resources.lib.api.api_requests as api
 import resources.lib.common as common
 import resources.lib.kodi.nfo as nfo
 from resources.lib.api.exceptions import MetadataNotAvailable
 from resources.lib.database.db_utils import (VidLibProp)
 from resources.lib.globals import g
-from resources.lib.kodi.library_items import (export_item, remove_item, export_new_item,
+from resources.lib.kodi.library_items import (export_item, remove_item, export_new_item, library_export_batch,
                                               FOLDER_MOVIES, FOLDER_TV, ILLEGAL_CHARACTERS)
 from resources.lib.kodi.ui import show_library_task_errors
 
@@ -36,34 +38,42 @@ def execute_tasks(title, tasks, task_handler, **kwargs):
     notify_errors = kwargs.pop('notify_errors', False)
     progress = xbmcgui.DialogProgress()
     progress.create(title)
-    for task_num, task in enumerate(tasks):
-        task_title = task.get('title', 'Unknown Task')
-        progress.update(int(task_num * 100 / len(tasks)), task_title)
-#        xbmc.sleep(25)
-        if progress.iscanceled():
-            break
-        if not task:
-            continue
-        try:
-            task_handler(task, **kwargs)
-        except Exception as exc:  # pylint: disable=broad-except
-            import traceback
-            common.error(g.py2_decode(traceback.format_exc(), 'latin-1'))
-            errors.append({
-                'task_title': task_title,
-                'error': '{}: {}'.format(type(exc).__name__, exc)})
+    # The exported items are written and added to the database all together at the end
+    with library_export_batch() as failed_files:
+        for task_num, task in enumerate(tasks):
+            task_title = task.get('title', 'Unknown Task')
+            progress.update(int(task_num * 100 / len(tasks)), task_title)
+#            xbmc.sleep(25)
+            if progress.iscanceled():
+                break
+            if not task:
+                continue
+            try:
+                task_handler(task, **kwargs)
+            except Exception as exc:  # pylint: disable=broad-except
+                import traceback
+                common.error(g.py2_decode(traceback.format_exc(), 'latin-1'))
+                errors.append({
+                    'task_title': task_title,
+                    'error': '{}: {}'.format(type(exc).__name__, exc)})
+    # The files that could not be written at the end of the batch
+    errors.extend({'task_title': file_path, 'error': error} for file_path, error in iteritems(failed_files))
     show_library_task_errors(notify_errors, errors)
     return errors
 
 
 @common.time_execution(immediate=False)
-def compile_tasks(videoid, task_handler, nfo_settings=None):
-    """Compile a list of tasks for items based on the videoid"""
+def compile_tasks(videoid, task_handler, nfo_settings=None, metadata=None):
+    """
+    Compile a list of tasks for items based on the videoid
+
+    :param metadata: the metadata of the videoid, if not specified will be requested
+    """
     common.debug('Compiling library tasks for task handler "{}" and videoid "{}"', task_handler.__name__, videoid)
     tasks = None
     try:
         if task_handler == export_item:
-            metadata = api.get_metadata(videoid)
+            metadata = metadata or api.get_metadata(videoid)
             if videoid.mediatype == common.VideoId.MOVIE:
                 tasks = _create_export_movie_task(videoid, metadata[0], nfo_settings)
             elif videoid.mediatype in common.VideoId.TV_TYPES:
@@ -73,7 +83,7 @@ def compile_tasks(videoid, task_handler, nfo_settings=None):
                                  .format(videoid, task_handler.__name__))
 
         if task_handler == export_new_item:
-            metadata = api.get_metadata(videoid, True)
+            metadata = metadata or api.get_metadata(videoid, True)
             tasks = _create_new_episodes_tasks(videoid, metadata, nfo_settings)
 
         if task_handler == remove_item:
@@ -180,20 +190,23 @@ def _create_export_item_task(title, section, videoid, destination, filename, nfo
 def _create_new_episodes_tasks(videoid, metadata, nfo_settings=None):
     tasks = []
     if metadata and 'seasons' in metadata[0]:
+        if not nfo_settings:
+            nfo_export = g.SHARED_DB.get_tvshow_property(videoid.value, VidLibProp['nfo_export'], False)
+            nfo_settings = nfo.NFOSettings(nfo_export)
+        # Load all the exported seasons and episodes once, to compare them with the metadata
+        exported_seasons = g.SHARED_DB.get_tvshow_seasons_episodes_ids(videoid.value)
         for season in metadata[0]['seasons']:
-            if not nfo_settings:
-                nfo_export = g.SHARED_DB.get_tvshow_property(videoid.value, VidLibProp['nfo_export'], False)
-                nfo_settings = nfo.NFOSettings(nfo_export)
             # Check and add missing seasons and episodes
-            _add_missing_items(tasks, season, videoid, metadata, nfo_settings)
+            _add_missing_items(tasks, season, videoid, metadata, nfo_settings, exported_seasons)
     return tasks
 
 
-def _add_missing_items(tasks, season, videoid, metadata, nfo_settings):
-    if g.SHARED_DB.season_id_exists(videoid.value, season['id']):
+def _add_missing_items(tasks, season, videoid, metadata, nfo_settings, exported_seasons):
+    exported_episodes_ids = exported_seasons.get(int(season['id']))
+    if exported_episodes_ids is not None:
         # The season exists, try to find any missing episode
         for episode in season['episodes']:
-            if not g.SHARED_DB.episode_id_exists(videoid.value, season['id'], episode['id']):
+            if int(episode['id']) not in exported_episodes_ids:
                 tasks.append(_create_export_episode_task(
                     videoid=videoid.derive_season(season['id']).derive_episode(episode['id']),
                     episode=episode,
@@ -72,7 +72,7 @@ def play(videoid):
     # Get metadata of videoid
     try:
         metadata = api.get_metadata(videoid)
-        common.debug('Metadata is {}', metadata)
+        common.debug('Metadata is {}', common.LogDump(metadata))
     except MetadataNotAvailable:
         common.warn('Metadata not available for {}', videoid)
         metadata = [{}, {}]
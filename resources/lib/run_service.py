@@ -9,6 +9,7 @@
 from __future__ import absolute_import, division, unicode_literals
 
 import threading
+import time
 from socket import gaierror
 
 from xbmcgui import Window
@@ -89,11 +90,13 @@ class NetflixService(object):
         return False
 
     def _init_server(self, server):
+        start_time = time.time()
         server['class'].allow_reuse_address = True
         server['instance'] = server['class'](
             (self.HOST_ADDRESS, select_port(server['name']))
         )
         server['thread'] = threading.Thread(target=server['instance'].serve_forever)
+        info('[{}] Server initialized in {:.3f} sec', server['name'], time.time() - start_time)
 
     def start_services(self):
         """
@@ -106,7 +109,7 @@ class NetflixService(object):
             server['instance'].server_activate()
             server['instance'].timeout = 1
             server['thread'].start()
-            info('[{}] Thread started'.format(server['name']))
+            info('[{}] Thread started', server['name'])
         self.controller = ActionController()
         self.library_updater = LibraryUpdateService()
         self.settings_monitor = SettingsMonitor()
@@ -127,6 +130,9 @@ class NetflixService(object):
             server['instance'] = None
             server['thread'].join()
             server['thread'] = None
+        # Close the database connections opened by the service main thread
+        from resources.lib.database.db_base_sqlite import close_thread_connections
+        close_thread_connections()
         info('Stopped MSL Service')
 
     def run(self):
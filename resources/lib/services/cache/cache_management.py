@@ -15,35 +15,38 @@ from datetime import datetime, timedelta
 from functools import wraps
 from time import time
 
+from future.utils import iteritems
+
 from resources.lib import common
 from resources.lib.api.exceptions import UnknownCacheBucketError, CacheMiss
 from resources.lib.common import g
+from resources.lib.database.db_base_sqlite import get_thread_connection, rollback_transaction
 from resources.lib.database.db_exceptions import SQLiteConnectionError, SQLiteError, ProfilesMissing
-from resources.lib.common.cache_utils import BUCKET_NAMES, BUCKETS
+from resources.lib.common.cache_utils import (BUCKET_NAMES, compress_data, decompress_data,
+                                              serialize_data)
+from resources.lib.services.cache.cache_memory import CacheEntry, MemoryBucket
+
+try:  # Python 2
+    unichr
+except NameError:  # Python 3
+    unichr = chr  # pylint: disable=redefined-builtin
 
-CONN_ISOLATION_LEVEL = None  # Autocommit mode
+# The expired items are deleted from the database in small batches, so the service loop is never stalled
+SWEEP_BATCH_SIZE = 200
+SWEEP_INTERVAL = 60  # Seconds between the sweeps when there are no other items to delete
+# When the data stored in the database exceeds this size, the items next to the expiration are deleted
+DB_MAX_SIZE = 100 * 1024 * 1024
 
 
 def handle_connection(func):
     """A decorator that handle the connection status with the database"""
     @wraps(func)
     def wrapper(*args, **kwargs):
-        conn = None
         try:
-            if not args[0].is_connected:
-                args[0].mutex.acquire()
-                args[0].conn = sql.connect(args[0].db_file_path, isolation_level=CONN_ISOLATION_LEVEL)
-                args[0].is_connected = True
-                conn = args[0].conn
             return func(*args, **kwargs)
         except sql.Error as exc:
             common.error('SQLite error {}:', exc.args[0])
             raise SQLiteConnectionError
-        finally:
-            if conn:
-                args[0].is_connected = False
-                conn.close()
-                args[0].mutex.release()
     return wrapper
 
 
@@ -52,12 +55,12 @@ class CacheManagement(object):
 
     def __init__(self):
         self._identifier_prefix = None
-        self.mutex = threading.Lock()
-        self.local_storage = threading.local()
-        self.conn = None
         self.db_file_path = None
         self.memory_cache = {}
+        # Protects the memory-cache from changes made by concurrent requests
+        self.mutex = threading.RLock()
         self._initialize()
+        self.next_sweep = 0
         self.next_schedule = _compute_next_schedule()
 
     @property
@@ -79,17 +82,13 @@ class CacheManagement(object):
         return self.identifier_prefix + identifier
 
     @property
-    def is_connected(self):
-        return getattr(self.local_storage, 'is_connected', False)
-
-    @is_connected.setter
-    def is_connected(self, val):
-        self.local_storage.is_connected = val
+    def conn(self):
+        """The database connection of the current thread"""
+        return get_thread_connection(self.db_file_path)
 
     def _initialize(self):
         from resources.lib.database.db_utils import get_local_db_path
         self.db_file_path = get_local_db_path('nf_cache.sqlite3')
-        self.conn = sql.connect(self.db_file_path)
         self._create_table()
 
     def _create_table(self):
@@ -102,46 +101,82 @@ class CacheManagement(object):
                     'last_modified INT,'
                     'PRIMARY KEY (bucket, identifier));')
         cur.execute(table)
-        self.conn.close()
+        cur.execute('CREATE INDEX IF NOT EXISTS cache_data_expires ON cache_data (expires)')
 
     def on_service_tick(self):
-        """Check if expired cache cleaning is due and trigger it"""
+        """Delete a batch of expired cache items when the sweep is due, and check if the database compaction is due"""
+        timestamp = time()
+        if self.next_sweep <= timestamp:
+            deleted = self.sweep(timestamp)
+            # When the batch is full there are other items to delete, then continue at the next tick
+            self.next_sweep = timestamp + (1 if deleted >= SWEEP_BATCH_SIZE else SWEEP_INTERVAL)
         if self.next_schedule <= datetime.now():
-            common.debug('Triggering expired cache cleaning')
-            self.delete_expired()
+            common.debug('Triggering cache database compaction, memory-cache usage: {}', self.get_stats())
+            self._vacuum_db()
             g.LOCAL_DB.set_value('clean_cache_last_start', datetime.now())
             self.next_schedule = _compute_next_schedule()
 
-    def _get_cache_bucket(self, bucket_name):
-        """Get the data contained to a cache bucket"""
-        if bucket_name not in self.memory_cache:
-            if bucket_name not in BUCKET_NAMES:  # Verify only at the first time (something is wrong in source code)
+    def sweep(self, timestamp):
+        """
+        Delete the expired items from the memory-cache and a batch of expired items from the database,
+        when the database exceeds the size limit, the items next to the expiration are also deleted
+
+        :return: number of items deleted from the database
+        """
+        with self.mutex:
+            for bucket_data in self.memory_cache.values():
+                bucket_data.delete_expired(timestamp)
+        deleted = self._delete_expired_db(int(timestamp), SWEEP_BATCH_SIZE)
+        if deleted < SWEEP_BATCH_SIZE and self._get_db_size() > DB_MAX_SIZE:
+            common.debug('The cache database exceeds the size limit, deleting the items next to the expiration')
+            deleted += self._delete_next_to_expire_db(SWEEP_BATCH_SIZE)
+        return deleted
+
+    def _get_cache_bucket(self, bucket):
+        """Get the memory-cache bucket"""
+        if bucket['name'] not in self.memory_cache:
+            if bucket['name'] not in BUCKET_NAMES:  # Verify only at the first time (something is wrong in source code)
                 raise UnknownCacheBucketError()
-            self.memory_cache[bucket_name] = {}
-        return self.memory_cache[bucket_name]
+            return self.memory_cache.setdefault(bucket['name'], MemoryBucket(bucket['memory_size']))
+        return self.memory_cache[bucket['name']]
+
+    def get_stats(self):
+        """Get the usage statistics of the memory-cache buckets"""
+        with self.mutex:
+            return {bucket_name: bucket_data.get_stats() for bucket_name, bucket_data in iteritems(self.memory_cache)}
 
-    def get(self, bucket, identifier):
-        """Get a item from cache bucket"""
+    def get(self, bucket, identifier, serialized=False, copy=False):
+        """
+        Get a item from cache bucket
+
+        :param serialized: if True return the data in serialized form (used by IPC calls)
+        :param copy: if True return a new copy of the data object, otherwise the returned object is shared
+                     with the cache and must not be modified
+        """
         try:
             identifier = self._add_prefix(identifier)
-            cache_entry = self._get_cache_bucket(bucket['name'])[identifier]
-            if cache_entry['expires'] < int(time()):
-                # Cache expired
-                raise CacheMiss()
-            return cache_entry['data']
+            with self.mutex:
+                cache_entry = self._get_cache_bucket(bucket).get(identifier, int(time()))
         except KeyError:
-            if bucket['is_persistent']:
-                return self._get_db(bucket['name'], identifier)
-            raise CacheMiss()
+            if not bucket['is_persistent']:
+                raise CacheMiss()
+            serialized_data, expires = self._get_db(bucket['name'], identifier)
+            cache_entry = CacheEntry(serialized_data)
+            # Bring back the item to the memory-cache (it could have been evicted)
+            with self.mutex:
+                self._get_cache_bucket(bucket).add(identifier, cache_entry, expires, len(serialized_data))
         except ProfilesMissing:
             # Raised by _add_prefix there is no active profile guid when add-on is installed from scratch
             raise CacheMiss()
+        if serialized:
+            return cache_entry.serialized_data
+        return cache_entry.get_data_copy() if copy else cache_entry.data
 
     @handle_connection
     def _get_db(self, bucket_name, identifier):
         try:
             cursor = self.conn.cursor()
-            query = ('SELECT value FROM cache_data '
+            query = ('SELECT value, expires FROM cache_data '
                      'WHERE '
                      'expires > ? AND '
                      'bucket = ? AND identifier = ?')
@@ -149,12 +184,12 @@ class CacheManagement(object):
             result = cursor.fetchone()
             if result is None:
                 raise CacheMiss()
-            return result[0]
+            return decompress_data(bytes(result[0])), result[1]
         except sql.Error as exc:
             common.error('SQLite error {}:', exc.args[0])
             raise SQLiteError
 
-    def add(self, bucket, identifier, data, ttl=None, expires=None):
+    def add(self, bucket, identifier, data, ttl=None, expires=None, serialized=False):
         """
         Add or update an item to a cache bucket
 
@@ -163,19 +198,18 @@ class CacheManagement(object):
         :param data: the content
         :param ttl: override default expiration (in seconds)
         :param expires: override default expiration (in timestamp) if specified override also the 'ttl' value
+        :param serialized: if True the data is in serialized form (used by IPC calls)
         """
         try:
             identifier = self._add_prefix(identifier)
-            if not expires:
-                if not ttl and bucket['default_ttl']:
-                    ttl = getattr(g, bucket['default_ttl'])
-                expires = int(time() + ttl)
-            cache_entry = {'expires': expires, 'data': data}
+            expires = _compute_expires(bucket, ttl, expires)
+            cache_entry, serialized_data = _create_cache_entry(data, serialized)
             # Save the item data to memory-cache
-            self._get_cache_bucket(bucket['name']).update({identifier: cache_entry})
+            with self.mutex:
+                self._get_cache_bucket(bucket).add(identifier, cache_entry, expires, len(serialized_data))
             if bucket['is_persistent']:
                 # Save the item data to the cache database
-                self._add_db(bucket['name'], identifier, data, expires)
+                self._add_db(bucket['name'], identifier, serialized_data, expires)
         except ProfilesMissing:
             # Raised by _add_prefix there is no active profile guid when add-on is installed from scratch
             pass
@@ -186,10 +220,121 @@ class CacheManagement(object):
             cursor = self.conn.cursor()
             query = ('REPLACE INTO cache_data (bucket, identifier, value, expires, last_modified) '
                      'VALUES(?, ?, ?, ?, ?)')
-            cursor.execute(query, (bucket_name, identifier, sql.Binary(data), expires, int(time())))
+            cursor.execute(query, (bucket_name, identifier, sql.Binary(compress_data(data)), expires, int(time())))
+        except sql.Error as exc:
+            common.error('SQLite error {}:', exc.args[0])
+            raise SQLiteError
+
+    def get_many(self, bucket, identifiers, serialized=False):
+        """
+        Get multiple items from a cache bucket
+
+        :param bucket: bucket where get the data
+        :param identifiers: list of key identifiers of the data
+        :param serialized: if True return the data in serialized form (used by IPC calls)
+        :return: a dict with the identifiers and the data of the items found,
+                 the missing or expired items are not included
+        """
+        try:
+            identifier_prefix = self.identifier_prefix
+        except ProfilesMissing:
+            # Raised when there is no active profile guid when add-on is installed from scratch
+            return {}
+        timestamp = int(time())
+        cache_entries = {}
+        identifiers_to_fetch = []
+        with self.mutex:
+            bucket_data = self._get_cache_bucket(bucket)
+            for identifier in identifiers:
+                try:
+                    cache_entries[identifier] = bucket_data.get(identifier_prefix + identifier, timestamp)
+                except KeyError:
+                    identifiers_to_fetch.append(identifier)
+        if identifiers_to_fetch and bucket['is_persistent']:
+            items = self._get_many_db(bucket['name'], identifier_prefix, identifiers_to_fetch)
+            # Bring back the items to the memory-cache (they could have been evicted)
+            with self.mutex:
+                bucket_data = self._get_cache_bucket(bucket)
+                for identifier, (serialized_data, expires) in iteritems(items):
+                    cache_entries[identifier] = CacheEntry(serialized_data)
+                    bucket_data.add(identifier_prefix + identifier, cache_entries[identifier],
+                                    expires, len(serialized_data))
+        if serialized:
+            return {identifier: cache_entry.serialized_data for identifier, cache_entry in iteritems(cache_entries)}
+        return {identifier: cache_entry.data for identifier, cache_entry in iteritems(cache_entries)}
+
+    @handle_connection
+    def _get_many_db(self, bucket_name, identifier_prefix, identifiers):
+        results = {}
+        try:
+            cursor = self.conn.cursor()
+            # Split the identifiers to not exceed the max number of host parameters allowed by SQLite
+            for chunk in common.chunked_list(identifiers, 500):
+                query = ('SELECT identifier, value, expires FROM cache_data '
+                         'WHERE '
+                         'expires > ? AND '
+                         'bucket = ? AND identifier IN ({})').format(', '.join(['?'] * len(chunk)))
+                cursor.execute(query, [time(), bucket_name] + [identifier_prefix + identifier for identifier in chunk])
+                for identifier, value, expires in cursor.fetchall():
+                    try:
+                        results[identifier[len(identifier_prefix):]] = decompress_data(bytes(value)), expires
+                    except CacheMiss:
+                        # The data of the item are not valid, then it is considered as missing
+                        continue
+            return results
+        except sql.Error as exc:
+            common.error('SQLite error {}:', exc.args[0])
+            raise SQLiteError
+
+    def add_many(self, bucket, data, ttl=None, expires=None, serialized=False):
+        """
+        Add or update multiple items to a cache bucket
+
+        :param bucket: bucket where save the data
+        :param data: a dict with the key identifiers and the contents
+        :param ttl: override default expiration (in seconds)
+        :param expires: override default expiration (in timestamp) if specified override also the 'ttl' value
+        :param serialized: if True the contents are in serialized form (used by IPC calls)
+        """
+        try:
+            identifier_prefix = self.identifier_prefix
+        except ProfilesMissing:
+            # Raised when there is no active profile guid when add-on is installed from scratch
+            return
+        expires = _compute_expires(bucket, ttl, expires)
+        items = {}
+        # Save the items data to memory-cache
+        with self.mutex:
+            bucket_data = self._get_cache_bucket(bucket)
+            for identifier, value in iteritems(data):
+                cache_entry, serialized_data = _create_cache_entry(value, serialized)
+                bucket_data.add(identifier_prefix + identifier, cache_entry, expires, len(serialized_data))
+                items[identifier_prefix + identifier] = serialized_data
+        if bucket['is_persistent']:
+            # Save the items data to the cache database
+            self._add_many_db(bucket['name'], items, expires)
+
+    @handle_connection
+    def _add_many_db(self, bucket_name, items, expires):
+        last_modified = int(time())
+        query = ('REPLACE INTO cache_data (bucket, identifier, value, expires, last_modified) '
+                 'VALUES(?, ?, ?, ?, ?)')
+        # The values are prepared before the transaction, so the transaction contains only the writes
+        params_list = [(bucket_name, identifier, sql.Binary(compress_data(value)), expires, last_modified)
+                       for identifier, value in iteritems(items)]
+        cursor = self.conn.cursor()
+        try:
+            # Save all the items within a single transaction
+            cursor.execute(str('BEGIN TRANSACTION'))
+            cursor.executemany(query, params_list)
+            cursor.execute(str('COMMIT'))
         except sql.Error as exc:
             common.error('SQLite error {}:', exc.args[0])
+            rollback_transaction(self.conn)
             raise SQLiteError
+        except Exception:
+            rollback_transaction(self.conn)
+            raise
 
     def delete(self, bucket, identifier, including_suffixes):
         """
@@ -200,17 +345,11 @@ class CacheManagement(object):
         # Delete the item data from in memory-cache
         try:
             identifier = self._add_prefix(identifier)
-            bucket_data = self._get_cache_bucket(bucket['name'])
-            if including_suffixes:
-                keys_to_delete = [key_identifier for key_identifier in bucket_data.keys()
-                                  if key_identifier.startswith(identifier)]
-            else:
-                keys_to_delete = [identifier]
-            for key_identifier in keys_to_delete:
-                try:
-                    del bucket_data[key_identifier]
-                except KeyError:
-                    pass
+            with self.mutex:
+                if including_suffixes:
+                    self._get_cache_bucket(bucket).delete_prefix(identifier)
+                else:
+                    self._get_cache_bucket(bucket).delete(identifier)
             if bucket['is_persistent']:
                 # Delete the item data from cache database
                 self._delete_db(bucket['name'], identifier, including_suffixes)
@@ -223,11 +362,12 @@ class CacheManagement(object):
         try:
             cursor = self.conn.cursor()
             if including_suffixes:
-                identifier += '%'
-                query = 'DELETE FROM cache_data WHERE bucket = ? AND identifier LIKE ?'
+                # A range on the identifier allow to use the primary key index (LIKE is case-insensitive)
+                query = 'DELETE FROM cache_data WHERE bucket = ? AND identifier >= ? AND identifier < ?'
+                cursor.execute(query, (bucket_name, identifier, _get_prefix_upper_bound(identifier)))
             else:
                 query = 'DELETE FROM cache_data WHERE bucket = ? AND identifier = ?'
-            cursor.execute(query, (bucket_name, identifier))
+                cursor.execute(query, (bucket_name, identifier))
         except sql.Error as exc:
             common.error('SQLite error {}:', exc.args[0])
             raise SQLiteError
@@ -242,14 +382,15 @@ class CacheManagement(object):
         common.debug('Performing cache clearing')
         if buckets is None:
             # Clear all cache
-            self.memory_cache = {}
+            with self.mutex:
+                self.memory_cache = {}
             if clear_database:
                 self._clear_db()
         else:
             # Clear only specified buckets
             for bucket in buckets:
-                if bucket['name'] in self.memory_cache:
-                    del self.memory_cache[bucket['name']]
+                with self.mutex:
+                    self.memory_cache.pop(bucket['name'], None)
                 if clear_database:
                     self._clear_db(bucket)
 
@@ -267,35 +408,79 @@ class CacheManagement(object):
             common.error('SQLite error {}:', exc.args[0])
             raise SQLiteError
 
-    def delete_expired(self):
-        bucket_names_db = []
-        timestamp = time()
-        for bucket in BUCKETS:
-            if bucket['is_persistent']:
-                bucket_names_db.append(bucket['name'])
-            bucket_content = self._get_cache_bucket(bucket['name'])
-            for identifier, cache_entry in list(bucket_content.items()):
-                if cache_entry['expires'] < timestamp:
-                    try:
-                        del bucket_content[identifier]
-                    except KeyError:
-                        pass
-        if bucket_names_db:
-            self._delete_expired_db(bucket_names_db, timestamp)
+    @handle_connection
+    def _delete_expired_db(self, timestamp, limit):
+        # Only the items of the persistent buckets are stored in the database
+        query = ('DELETE FROM cache_data WHERE rowid IN '
+                 '(SELECT rowid FROM cache_data WHERE expires < ? LIMIT ?)')
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(query, (timestamp, limit))
+            return cursor.rowcount
+        except sql.Error as exc:
+            common.error('SQLite error {}:', exc.args[0])
+            raise SQLiteError
 
     @handle_connection
-    def _delete_expired_db(self, bucket_names, timestamp):
-        query = 'DELETE FROM cache_data WHERE ('
-        query += ' OR '.join(['bucket = ?'] * len(bucket_names))
-        query += ') AND expires < ?'
-        bucket_names.append(timestamp)
+    def _delete_next_to_expire_db(self, limit):
+        query = ('DELETE FROM cache_data WHERE rowid IN '
+                 '(SELECT rowid FROM cache_data ORDER BY expires LIMIT ?)')
         try:
             cursor = self.conn.cursor()
-            cursor.execute(query, bucket_names)
+            cursor.execute(query, (limit, ))
+            return cursor.rowcount
         except sql.Error as exc:
             common.error('SQLite error {}:', exc.args[0])
             raise SQLiteError
 
+    @handle_connection
+    def _get_db_size(self):
+        """Get the size of the data stored in the database (the free pages are excluded)"""
+        cursor = self.conn.cursor()
+        page_count = cursor.execute('PRAGMA page_count').fetchone()[0]
+        freelist_count = cursor.execute('PRAGMA freelist_count').fetchone()[0]
+        page_size = cursor.execute('PRAGMA page_size').fetchone()[0]
+        return (page_count - freelist_count) * page_size
+
+    @handle_connection
+    def _vacuum_db(self):
+        """Compact the database file, only when there is a significant amount of free pages"""
+        cursor = self.conn.cursor()
+        page_count = cursor.execute('PRAGMA page_count').fetchone()[0]
+        freelist_count = cursor.execute('PRAGMA freelist_count').fetchone()[0]
+        if freelist_count < page_count // 4:
+            return
+        try:
+            cursor.execute('VACUUM')
+        except sql.OperationalError as exc:
+            # The database could be busy by the cache requests, it will be retried at the next schedule
+            common.warn('Cache database compaction not performed: {}', exc)
+
+
+def _create_cache_entry(data, serialized):
+    """
+    Create the memory-cache entry of an item, the data are serialized here when are not received in serialized form
+    :return: tuple of the cache entry and the serialized data
+    """
+    # The received object is not kept, because the caller could modify it after it has been added,
+    # the entry will decode its own object from the serialized data only once, at the first access
+    serialized_data = data if serialized else serialize_data(data)
+    return CacheEntry(serialized_data), serialized_data
+
+
+def _get_prefix_upper_bound(prefix):
+    """Get the lowest string greater than all the strings that start with the prefix"""
+    return prefix[:-1] + unichr(ord(prefix[-1]) + 1)
+
+
+def _compute_expires(bucket, ttl, expires):
+    """Get the expiration timestamp of a cache item"""
+    if not expires:
+        if not ttl and bucket['default_ttl']:
+            ttl = getattr(g, bucket['default_ttl'])
+        expires = int(time() + ttl)
+    return expires
+
 
 def _compute_next_schedule():
     last_run = g.LOCAL_DB.get_value('clean_cache_last_start', data_type=datetime)
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+    Copyright (C) 2017 Sebastian Golasch (plugin.video.netflix)
+    Memory-cache bucket with size limit
+
+    SPDX-License-Identifier: MIT
+    See LICENSES/MIT.md for more information.
+"""
+from __future__ import absolute_import, division, unicode_literals
+
+from bisect import bisect_left, insort
+from collections import OrderedDict
+
+from resources.lib.common.cache_utils import deserialize_data
+
+_NOT_SET = object()
+
+
+class CacheEntry(object):
+    """
+    The data of a memory-cache item, kept in serialized form and as decoded object:
+    the data are serialized only once when added, then the IPC calls get the serialized data as they are,
+    and the service gets the decoded object that is decoded only once at the first access
+    """
+    __slots__ = ('serialized_data', '_data')
+
+    def __init__(self, serialized_data):
+        self.serialized_data = serialized_data
+        self._data = _NOT_SET
+
+    @property
+    def data(self):
+        """The decoded data object, WARNING: the object is shared and must be considered read-only"""
+        if self._data is _NOT_SET:
+            self._data = deserialize_data(self.serialized_data)
+        return self._data
+
+    def get_data_copy(self):
+        """A new copy of the data object, so it can be modified without changing the cached item"""
+        return deserialize_data(self.serialized_data)
+
+
+class MemoryBucket(object):
+    """
+    A bucket of the memory-cache, the items are kept in LRU order and when the total size
+    of the items exceeds the size limit, the least recently used items are evicted,
+    the identifiers are also kept sorted to find quickly the items that start with a prefix
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Each entry is a tuple: (data, expires, size)
+        self._entries = OrderedDict()
+        self._sorted_keys = []
+
+    def __len__(self):
+        return len(self._entries)
+
+    def keys(self):
+        return list(self._entries.keys())
+
+    def get(self, identifier, timestamp):
+        """Get the data of an item, raise KeyError if the item not exists or is expired"""
+        try:
+            entry = self._entries.pop(identifier)
+        except KeyError:
+            self.misses += 1
+            raise
+        if entry[1] < timestamp:
+            # The item is expired, then it is not re-inserted
+            self.size -= entry[2]
+            self._remove_sorted_key(identifier)
+            self.misses += 1
+            raise KeyError(identifier)
+        # Re-insert the item to move it at the end as most recently used
+        self._entries[identifier] = entry
+        self.hits += 1
+        return entry[0]
+
+    def add(self, identifier, data, expires, size):
+        """Add or update an item, then evict the least recently used items when the size limit is exceeded"""
+        self.delete(identifier)
+        if size > self.max_size:
+            # Too big to be kept in memory
+            self.evictions += 1
+            return
+        self._entries[identifier] = (data, expires, size)
+        insort(self._sorted_keys, identifier)
+        self.size += size
+        while self.size > self.max_size:
+            evicted_identifier, entry = self._entries.popitem(last=False)
+            self.size -= entry[2]
+            self._remove_sorted_key(evicted_identifier)
+            self.evictions += 1
+
+    def delete(self, identifier):
+        entry = self._entries.pop(identifier, None)
+        if entry:
+            self.size -= entry[2]
+            self._remove_sorted_key(identifier)
+
+    def delete_prefix(self, prefix):
+        """Delete all the items with the identifier that start with the prefix"""
+        start = bisect_left(self._sorted_keys, prefix)
+        end = start
+        while end < len(self._sorted_keys) and self._sorted_keys[end].startswith(prefix):
+            entry = self._entries.pop(self._sorted_keys[end])
+            self.size -= entry[2]
+            end += 1
+        del self._sorted_keys[start:end]
+
+    def _remove_sorted_key(self, identifier):
+        del self._sorted_keys[bisect_left(self._sorted_keys, identifier)]
+
+    def delete_expired(self, timestamp):
+        for identifier in [identifier for identifier, entry in self._entries.items() if entry[1] < timestamp]:
+            self.delete(identifier)
+
+    def get_stats(self):
+        return {'items': len(self._entries),
+                'size': self.size,
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions}
@@ -13,7 +13,10 @@ import json
 
 import resources.lib.common as common
 from resources.lib.api.exceptions import InvalidPathError
+from resources.lib.common.cache_utils import (MULTIPLE_ITEMS_CALLS, SERIALIZED_DATA_CALLS, deserialize_data,
+                                              serialize_data)
 from resources.lib.globals import g
+from resources.lib.services.tcp_server import ThreadPoolMixIn, IPC_KEEP_ALIVE_TIMEOUT
 
 try:  # Python 3
     from http.server import BaseHTTPRequestHandler
@@ -28,10 +31,15 @@ except ImportError:
 
 class NetflixHttpRequestHandler(BaseHTTPRequestHandler):
     """Handles cache requests from add-on client-frontend instance"""
+    # Use keep-alive connections, the connection is closed when it remains idle over the timeout
+    protocol_version = 'HTTP/1.1'
+    timeout = IPC_KEEP_ALIVE_TIMEOUT
+    # Headers and content are written separately, without TCP_NODELAY each response would be delayed by the ACK
+    disable_nagle_algorithm = True
 
     def do_HEAD(self):
         """Answers head requests with a success code"""
-        self.send_response(200)
+        self._send_result(200)
 
     def do_POST(self):
         """Handle cache POST requests"""
@@ -39,49 +47,64 @@ class NetflixHttpRequestHandler(BaseHTTPRequestHandler):
         params = json.loads(self.headers['Params'])
         # common.debug('Handling Cache HTTP POST IPC call to {} {}', self.path[1:], params.get('identifier'))
         try:
+            # The request content must always be read to keep the connection usable
+            length = int(self.headers.get('content-length', 0))
+            content = self.rfile.read(length)
             if 'data' in params:
                 # If argument 'data' exists, inject the data
-                length = int(self.headers.get('content-length', 0))
-                params['data'] = self.rfile.read(length) or None
-            result = _call(g.CACHE_MANAGEMENT, self.path[1:], params)
-            self.send_response(200)
-            self.end_headers()
-            if result is not None:
-                self.wfile.write(result)
+                params['data'] = content or None
+                if params['data'] and self.path[1:] in MULTIPLE_ITEMS_CALLS:
+                    params['data'] = deserialize_data(params['data'])
+            result = _call(g.CACHE_MANAGEMENT, self.path[1:], _set_serialized(self.path[1:], params))
+            self._send_result(200, result=_serialize_result(self.path[1:], result))
         except InvalidPathError:
-            self.send_response(404)
-            self.end_headers()
+            self._send_result(404)
         except Exception as exc:  # pylint: disable=broad-except
             if exc.__class__.__name__ != 'CacheMiss':
                 import traceback
                 common.error(g.py2_decode(traceback.format_exc(), 'latin-1'))
-            self.send_response(500, exc.__class__.__name__)
-            self.end_headers()
+            self._send_result(500, exc.__class__.__name__)
 
     def do_GET(self):
         """Handle cache GET requests"""
         params = json.loads(self.headers['Params'])
         # common.debug('Handling Cache HTTP GET IPC call to {} ({})', self.path[1:], params.get('identifier'))
         try:
-            result = _call(g.CACHE_MANAGEMENT, self.path[1:], params)
-            self.send_response(200)
-            self.end_headers()
-            if result is not None:
-                self.wfile.write(result)
+            result = _call(g.CACHE_MANAGEMENT, self.path[1:], _set_serialized(self.path[1:], params))
+            self._send_result(200, result=_serialize_result(self.path[1:], result))
         except InvalidPathError:
-            self.send_response(404)
-            self.end_headers()
+            self._send_result(404)
         except Exception as exc:  # pylint: disable=broad-except
             if exc.__class__.__name__ != 'CacheMiss':
                 import traceback
                 common.error(g.py2_decode(traceback.format_exc(), 'latin-1'))
-            self.send_response(500, exc.__class__.__name__)
-            self.end_headers()
+            self._send_result(500, exc.__class__.__name__)
+
+    def _send_result(self, code, message=None, result=None):
+        self.send_response(code, message)
+        self.send_header('Content-Length', str(len(result) if result is not None else 0))
+        self.end_headers()
+        if result is not None:
+            self.wfile.write(result)
 
     def log_message(self, *args):  # pylint: disable=arguments-differ
         """Disable the BaseHTTPServer Log"""
 
 
+def _set_serialized(func_name, params):
+    # The data is exchanged already serialized with the client-frontend,
+    # then the cache management can store and return it without pickle round-trips
+    if func_name in SERIALIZED_DATA_CALLS:
+        params['serialized'] = True
+    return params
+
+
+def _serialize_result(func_name, result):
+    if result is not None and func_name in MULTIPLE_ITEMS_CALLS:
+        return serialize_data(result)
+    return result
+
+
 def _call(instance, func_name, data):
     try:
         func = getattr(instance, func_name)
@@ -94,8 +117,13 @@ def _call(instance, func_name, data):
     return func()
 
 
-class CacheTCPServer(TCPServer):
+class CacheTCPServer(ThreadPoolMixIn, TCPServer):
     """Override TCPServer to allow usage of shared members"""
+    # The cache requests are short and independent, allow to serve several add-on instances at same time,
+    # the workers must be more than the clients (add-on instances, library workers, service threads)
+    # because each keep-alive connection keeps busy a worker also while it remains idle
+    pool_size = 8
+
     def __init__(self, server_address):
         """Initialization of CacheTCPServer"""
         common.info('Constructing CacheTCPServer')
@@ -28,6 +28,7 @@ class DirectoryBuilder(DirectoryRequests):
     def __init__(self, netflix_session):
         super(DirectoryBuilder, self).__init__()
         self.netflix_session = netflix_session
+        # The slots are registered with AddonSignals by NetflixSession, together with its own slots
         self.slots = [
             self.get_mainmenu,
             self.get_profiles,
@@ -45,8 +46,6 @@ class DirectoryBuilder(DirectoryRequests):
             self.add_videoids_to_video_list_cache,
             self.get_continuewatching_videoid_exists
         ]
-        for slot in self.slots:
-            common.register_slot(slot)
 
     @common.time_execution(immediate=True)
     @common.addonsignals_return_call
@@ -175,7 +174,7 @@ class DirectoryBuilder(DirectoryRequests):
     def add_videoids_to_video_list_cache(self, cache_bucket, cache_identifier, video_ids):
         """Add the specified video ids to a video list datatype in the cache (only if the cache item exists)"""
         try:
-            video_list_sorted_data = g.CACHE.get(cache_bucket, cache_identifier)
+            video_list_sorted_data = g.CACHE.get(cache_bucket, cache_identifier, copy=True)
             merge_data_type(video_list_sorted_data, self.req_datatype_video_list_byid(video_ids))
             g.CACHE.add(cache_bucket, cache_identifier, video_list_sorted_data)
         except CacheMiss:
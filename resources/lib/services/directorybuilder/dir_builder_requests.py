@@ -242,9 +242,10 @@ class DirectoryRequests(object):
         if not any(isinstance(item, list) for item in chunked_video_list):
             raise InvalidVideoListTypeError('The chunked_video_list not contains a list of a list of videoids')
         merged_response = {}
-        for videoids_list in chunked_video_list:
-            path = build_paths(['videos', videoids_list], VIDEO_LIST_PARTIAL_PATHS)
-            path_response = self.netflix_session._path_request(path)
+        # The chunks are requested concurrently, the path responses are merged in the order of the chunks
+        paths_list = [build_paths(['videos', videoids_list], VIDEO_LIST_PARTIAL_PATHS)
+                      for videoids_list in chunked_video_list]
+        for path_response in self.netflix_session._path_requests_concurrent(paths_list):
             common.merge_dicts(path_response, merged_response)
 
         if perpetual_range_selector:
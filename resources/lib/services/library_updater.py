@@ -9,6 +9,9 @@
 """
 from __future__ import absolute_import, division, unicode_literals
 
+import os
+import threading
+import time
 from datetime import datetime, timedelta
 
 import AddonSignals
@@ -17,13 +20,22 @@ import xbmc
 from resources.lib.globals import g
 import resources.lib.common as common
 import resources.lib.kodi.library as kodi_library
-from resources.lib.kodi.library_autoupdate import auto_update_library
+from resources.lib.kodi.library_autoupdate import auto_update_library, is_auto_update_library_interrupted
 
 try:  # Kodi >= 19
     from xbmcvfs import makeLegalFilename  # pylint: disable=ungrouped-imports
 except ImportError:  # Kodi 18
     from xbmc import makeLegalFilename  # pylint: disable=ungrouped-imports
 
+# Seconds without new requests to wait before starting the library scan, to group the requests
+LIBRARY_SCAN_DELAY = 10
+# Max seconds that a requested library scan can be delayed by the new requests
+LIBRARY_SCAN_MAX_DELAY = 300
+# Seconds to wait for a requested scan to start before requesting the next one
+LIBRARY_SCAN_START_TIMEOUT = 5
+# Above this number of changed folders, a scan of the whole library is performed
+LIBRARY_SCAN_MAX_FOLDERS = 10
+
 
 class LibraryUpdateService(xbmc.Monitor):
     """
@@ -42,28 +54,48 @@ class LibraryUpdateService(xbmc.Monitor):
 
         self.startidle = 0
         self.next_schedule = _compute_next_schedule()
+        self.auto_update_running = False
 
         # Update library variables
         xbmc.Monitor.__init__(self)
         self.scan_in_progress = False
-        self.scan_awaiting = False
+        self.scan_lock = threading.Lock()
+        # The requested scans not yet started, grouped until no more requests arrive
+        self.scan_requested_folders = set()
+        self.scan_requested_all = False
+        self.scan_first_request_time = None
+        self.scan_last_request_time = None
+        # The folders to be scanned one at a time (None means the whole library)
+        self.scan_queue = []
+        self.scan_queue_time = 0
         AddonSignals.registerSlot(
             g.ADDON.getAddonInfo('id'), common.Signals.LIBRARY_UPDATE_REQUESTED,
             self.update_kodi_library)
 
     def on_service_tick(self):
         """Check if update is due and trigger it"""
+        self._process_scan_requests()
         if not self.enabled:
             return
         if (self.next_schedule is not None
+                and not self.auto_update_running
                 and self.next_schedule <= datetime.now()
                 and self.is_idle()):
             common.debug('Triggering auto update library')
-
-            common.run_threaded(True, auto_update_library, g.ADDON.getSettingBool('lib_sync_mylist'), True)
-
             g.SHARED_DB.set_value('library_auto_update_last_start', datetime.now())
-            self.next_schedule = _compute_next_schedule()
+            # The next schedule is computed when the job ends, with the updated job state,
+            # otherwise a resumed job still marked as interrupted would be scheduled again
+            self.next_schedule = None
+            self.auto_update_running = True
+            common.run_threaded(True, self._auto_update_library, g.ADDON.getSettingBool('lib_sync_mylist'))
+
+    def _auto_update_library(self, sync_with_mylist):
+        try:
+            auto_update_library(sync_with_mylist, True)
+        finally:
+            # A job interrupted by an error is resumed at the next schedule, not immediately
+            self.next_schedule = _compute_next_schedule(resume_interrupted=False)
+            self.auto_update_running = False
 
     def is_idle(self):
         """
@@ -106,25 +138,79 @@ class LibraryUpdateService(xbmc.Monitor):
         # so we monitor events to ensure we're not cancelling a previous scan
         if library == 'video':
             self.scan_in_progress = False
-            if self.scan_awaiting:
-                common.debug('Kodi library update requested from library auto-update (from awaiting)')
-                self.update_kodi_library()
+            self._scan_next_folder()
 
-    def update_kodi_library(self, data=None):  # pylint: disable=unused-argument
+    def update_kodi_library(self, data=None):
+        """
+        Request a scan of the Kodi library, the requests are grouped and the scan starts
+        when no more requests arrive for a few seconds
+        :param data: list of the folders to be scanned, if not specified the whole library is scanned
+        """
+        with self.scan_lock:
+            if data:
+                self.scan_requested_folders.update(data)
+            else:
+                self.scan_requested_all = True
+            self.scan_last_request_time = time.time()
+            if self.scan_first_request_time is None:
+                self.scan_first_request_time = self.scan_last_request_time
+
+    def _process_scan_requests(self):
+        """Start the requested scans when the requests are no longer arriving"""
+        # If a scan is already in progress, the scan is delayed until the queued scans are done
+        if self.scan_queue:
+            if not self.scan_in_progress and time.time() - self.scan_queue_time > LIBRARY_SCAN_START_TIMEOUT:
+                # The previous scan has never started (or the finish event has been lost)
+                self._scan_next_folder()
+            return
+        with self.scan_lock:
+            if self.scan_first_request_time is None or self.scan_in_progress:
+                return
+            now = time.time()
+            if (now - self.scan_last_request_time < LIBRARY_SCAN_DELAY and
+                    now - self.scan_first_request_time < LIBRARY_SCAN_MAX_DELAY):
+                return
+            folders = self.scan_requested_folders
+            scan_all = self.scan_requested_all or len(folders) > LIBRARY_SCAN_MAX_FOLDERS
+            self.scan_requested_folders = set()
+            self.scan_requested_all = False
+            self.scan_first_request_time = None
+            self.scan_last_request_time = None
         # Update only the elements in the addon export folder for faster processing with a large library (on Kodi 18.x)
-        # If a scan is already in progress, the scan is delayed until onScanFinished event
-        if not self.scan_in_progress:
+        with self.scan_lock:
+            self.scan_queue = [None] if scan_all else sorted(folders)
+        self._scan_next_folder()
+
+    def _scan_next_folder(self):
+        with self.scan_lock:
+            if not self.scan_queue:
+                return
+            folder = self.scan_queue.pop(0)
+            self.scan_queue_time = time.time()
+        if folder is None:
             common.debug('Kodi library update requested from library auto-update')
-            self.scan_awaiting = False
             common.scan_library(
                 makeLegalFilename(
                     xbmc.translatePath(
                         kodi_library.library_path())))
         else:
-            self.scan_awaiting = True
+            common.debug('Kodi library update requested from library auto-update for the folder {}', folder)
+            common.scan_library(_ensure_trailing_separator(makeLegalFilename(xbmc.translatePath(folder))))
+
+
+def _ensure_trailing_separator(folder_path):
+    """The path of a folder to be scanned must end with a separator, as the path of the Kodi source"""
+    if '://' in folder_path:
+        # The VFS paths (e.g. smb://, nfs://) use always the slash, also on Windows
+        return folder_path if folder_path.endswith('/') else folder_path + '/'
+    return os.path.join(folder_path, '')
 
 
-def _compute_next_schedule():
+def _compute_next_schedule(resume_interrupted=True):
+    """
+    Compute the date of the next library auto update
+    :param resume_interrupted: if True and the last job has been interrupted, it is scheduled immediately
+    """
     try:
         if g.ADDON.getSettingBool('use_mysql'):
             client_uuid = g.LOCAL_DB.get_value('client_uuid')
@@ -134,12 +220,16 @@ def _compute_next_schedule():
                              'has been set as the main update manager')
                 return None
 
-        time = g.ADDON.getSetting('lib_auto_upd_start') or '00:00'
+        if resume_interrupted and is_auto_update_library_interrupted():
+            common.info('The interrupted library auto update will be resumed')
+            return datetime.now()
+
+        start_time = g.ADDON.getSetting('lib_auto_upd_start') or '00:00'
         last_run = g.SHARED_DB.get_value('library_auto_update_last_start',
                                          datetime.utcfromtimestamp(0))
         update_frequency = g.ADDON.getSettingInt('lib_auto_upd_freq')
 
-        last_run = last_run.replace(hour=int(time[0:2]), minute=int(time[3:5]))
+        last_run = last_run.replace(hour=int(start_time[0:2]), minute=int(start_time[3:5]))
         next_run = last_run + timedelta(days=[1, 2, 5, 7][update_frequency])
         if next_run >= datetime.now():
             common.info('Next library auto update is scheduled for {}', next_run)
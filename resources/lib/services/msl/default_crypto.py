@@ -12,6 +12,8 @@ from __future__ import absolute_import, division, unicode_literals
 
 import base64
 import json
+import threading
+import time
 
 try:  # The crypto package depends on the library installed (see Wiki)
     from Crypto.Random import get_random_bytes
@@ -29,10 +31,74 @@ except ImportError:
     from Cryptodome.Cipher import AES
 
 import resources.lib.common as common
+from resources.lib.globals import g
 
 from .base_crypto import MSLBaseCrypto
 from .exceptions import MSLError
 
+# The spare RSA key is stored in the same folder of the MSL data file
+RSA_SPARE_KEY_FILENAME = 'msl_rsa_spare_key.pem'
+RSA_KEY_SIZE = 2048
+
+
+class SpareRSAKeyGenerator(object):
+    """
+    Keep a spare RSA key ready to be used for the key handshakes,
+    the key is generated in background and saved to disk, so it is available also after a restart
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._spare_key = None
+        self._thread = None
+
+    def take_key(self):
+        """Take the spare RSA key (or generate a new one if not available) and prepare a new spare key"""
+        with self._lock:
+            thread = self._thread
+        if thread:
+            # The spare key is being generated, it takes less time to wait for it
+            thread.join()
+        with self._lock:
+            rsa_key = self._spare_key
+            self._spare_key = None
+        if rsa_key is None:
+            rsa_key = _load_spare_key()
+        if rsa_key is None:
+            common.debug('Spare RSA key not available, generating new RSA key')
+            rsa_key = _generate_key()
+        else:
+            common.debug('Using the spare RSA key')
+        # The key is taken, it must not be used again
+        common.delete_file(RSA_SPARE_KEY_FILENAME)
+        self.prepare_spare_key()
+        return rsa_key
+
+    def prepare_spare_key(self):
+        """Generate the spare RSA key in background, if not already available"""
+        with self._lock:
+            if self._spare_key or self._thread or common.file_exists(RSA_SPARE_KEY_FILENAME):
+                return
+            self._thread = threading.Thread(target=self._generate_spare_key)
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _generate_spare_key(self):
+        rsa_key = None
+        try:
+            rsa_key = _generate_key()
+            common.save_file(RSA_SPARE_KEY_FILENAME, rsa_key.exportKey())
+        except Exception:  # pylint: disable=broad-except
+            import traceback
+            common.error(g.py2_decode(traceback.format_exc(), 'latin-1'))
+        finally:
+            with self._lock:
+                self._spare_key = rsa_key
+                self._thread = None
+
+
+SPARE_RSA_KEY_GENERATOR = SpareRSAKeyGenerator()
+
 
 class DefaultMSLCrypto(MSLBaseCrypto):
     """Crypto Handler for non-Android platforms"""
@@ -54,10 +120,13 @@ class DefaultMSLCrypto(MSLBaseCrypto):
             self.rsa_key = RSA.importKey(
                 base64.standard_b64decode(msl_data['rsa_key']))
         except Exception:  # pylint: disable=broad-except
-            common.debug('Generating new RSA keys')
-            self.rsa_key = RSA.generate(2048)
+            common.debug('Loading new RSA keys')
+            self.rsa_key = SPARE_RSA_KEY_GENERATOR.take_key()
             self.encryption_key = None
             self.sign_key = None
+        else:
+            # Prepare a spare key in advance for the next key handshake with new keys
+            SPARE_RSA_KEY_GENERATOR.prepare_spare_key()
 
     def key_request_data(self):
         """Return a key request dict"""
@@ -115,6 +184,21 @@ class DefaultMSLCrypto(MSLBaseCrypto):
         }
 
 
+def _load_spare_key():
+    try:
+        return RSA.importKey(common.load_file(RSA_SPARE_KEY_FILENAME))
+    except Exception:  # pylint: disable=broad-except
+        # The file not exists or the key is not valid
+        return None
+
+
+def _generate_key():
+    start_time = time.time()
+    rsa_key = RSA.generate(RSA_KEY_SIZE)
+    common.debug('Generated RSA key in {:.3f} sec', time.time() - start_time)
+    return rsa_key
+
+
 def _decrypt_key(encrypted_key, cipher):
     return _base64key_decode(json.loads(cipher.decrypt(encrypted_key))['k'])
 
@@ -18,6 +18,7 @@ import xbmc
 import resources.lib.api.api_requests as api
 from resources.lib import common
 from resources.lib.common.cache_utils import CACHE_MANIFESTS
+from resources.lib.database.db_base_sqlite import close_thread_connections
 from resources.lib.database.db_utils import TABLE_SESSION
 from resources.lib.globals import g
 from resources.lib.services.msl import msl_utils
@@ -113,6 +114,7 @@ class EventsHandler(threading.Thread):
                 common.error(g.py2_decode(traceback.format_exc(), 'latin-1'))
                 self.clear_queue()
             monitor.waitForAbort(1)
+        close_thread_connections()
 
     def _process_event_request(self, event):
         """Do the event post request"""
@@ -256,4 +258,4 @@ class EventsHandler(threading.Thread):
 def get_manifest(videoid):
     """Get the manifest from cache"""
     cache_identifier = g.get_esn() + '_' + videoid.value
-    return g.CACHE.get(CACHE_MANIFESTS, cache_identifier)
+    return g.CACHE.get(CACHE_MANIFESTS, cache_identifier, copy=True)
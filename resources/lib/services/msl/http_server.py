@@ -28,6 +28,7 @@ except ImportError:
     from SocketServer import TCPServer
 
 import resources.lib.common as common
+from resources.lib.services.tcp_server import ThreadPoolMixIn
 
 from .msl_handler import MSLHandler
 from .exceptions import MSLError
@@ -87,10 +88,14 @@ class MSLHttpRequestHandler(BaseHTTPRequestHandler):
         """Disable the BaseHTTPServer Log"""
 
 
-class MSLTCPServer(TCPServer):
+class MSLTCPServer(ThreadPoolMixIn, TCPServer):
     """Override TCPServer to allow usage of shared members"""
+    pool_size = 2
+
     def __init__(self, server_address):
         """Initialization of MSLTCPServer"""
         common.info('Constructing MSLTCPServer')
+        # The manifest and license requests are executed concurrently,
+        # the MSL requests lock only the shared crypto session and tokens (see MSLRequests)
         self.msl_handler = MSLHandler()
         TCPServer.__init__(self, server_address, MSLHttpRequestHandler)
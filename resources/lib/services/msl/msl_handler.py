@@ -88,6 +88,7 @@ class MSLHandler(object):
             callback=self.switch_events_handler)
 
     def _init_msl_handler(self):
+        start_time = time.time()
         self.msl_requests = None
         try:
             msl_data = json.loads(common.load_file(MSL_DATA_FILENAME))
@@ -96,6 +97,7 @@ class MSLHandler(object):
             msl_data = None
         self.msl_requests = MSLRequests(msl_data)
         self.switch_events_handler()
+        common.debug('MSL handler initialized in {:.3f} sec', time.time() - start_time)
 
     def reinitialize_msl_handler(self, data=None):  # pylint: disable=unused-argument
         """
@@ -164,7 +166,7 @@ class MSLHandler(object):
         cache_identifier = esn + '_' + unicode(viewable_id)
         try:
             # The manifest must be requested once and maintained for its entire duration
-            manifest = g.CACHE.get(CACHE_MANIFESTS, cache_identifier)
+            manifest = g.CACHE.get(CACHE_MANIFESTS, cache_identifier, copy=True)
             expiration = int(manifest['expiration'] / 1000)
             if (expiration - time.time()) < 14400:
                 # Some devices remain active even longer than 48 hours, if the manifest is at the limit of the deadline
@@ -12,7 +12,7 @@ from __future__ import absolute_import, division, unicode_literals
 
 import base64
 import json
-import re
+import threading
 import zlib
 
 import resources.lib.common as common
@@ -40,6 +40,9 @@ class MSLRequests(MSLRequestBuilder):
             'Content-Type': 'text/plain',
             'Accept': '*/*'
         })
+        # The crypto session and the tokens are shared between the requests (manifest, license, events),
+        # the lock is held while they are used or changed, but not while waiting the responses
+        self.crypto_lock = threading.RLock()
         self._load_msl_data(msl_data)
         self.msl_switch_requested = False
 
@@ -154,13 +157,16 @@ class MSLRequests(MSLRequestBuilder):
     @common.time_execution(immediate=True)
     def chunked_request(self, endpoint, request_data, esn, disable_msl_switch=True, force_auth_credential=False):
         """Do a POST request and process the chunked response"""
-        self._mastertoken_checks()
-        auth_data = self._check_user_id_token(disable_msl_switch, force_auth_credential)
-        common.debug('Chunked request will be executed with auth data: {}', auth_data)
-
-        chunked_response = self._process_chunked_response(
-            self._post(endpoint, self.msl_request(request_data, esn, auth_data)),
-            save_uid_token_to_owner=auth_data['user_id_token'] is None)
+        with self.crypto_lock:
+            self._mastertoken_checks()
+            auth_data = self._check_user_id_token(disable_msl_switch, force_auth_credential)
+            common.debug('Chunked request will be executed with auth data: {}', auth_data)
+            msl_request_data = self.msl_request(request_data, esn, auth_data)
+        response = self._post(endpoint, msl_request_data)
+        with self.crypto_lock:
+            chunked_response = self._process_chunked_response(
+                response,
+                save_uid_token_to_owner=auth_data['user_id_token'] is None)
         return chunked_response['result']
 
     def _post(self, endpoint, request_data):
@@ -185,7 +191,7 @@ class MSLRequests(MSLRequestBuilder):
         except ValueError:
             # json() failed so parse and decrypt the chunked response
             common.debug('Received encrypted chunked response')
-            response = _parse_chunks(response.text)
+            response = _parse_chunks(response.content.decode('utf-8'))
             # TODO: sending for the renewal request is not yet implemented
             # if self.crypto.get_current_mastertoken_validity()['is_renewable']:
             #     # Check if mastertoken is renewed
@@ -249,34 +255,43 @@ def _get_error_details(decoded_response):
 
 @common.time_execution(immediate=True)
 def _parse_chunks(message):
-    header = json.loads(message.split('}}')[0] + '}}')
-    payloads = re.split(',\"signature\":\"[0-9A-Za-z=/+]+\"}', message.split('}}')[1])
-    payloads = [x + '}' for x in payloads][:-1]
-    return {'header': header, 'payloads': payloads}
+    """Parse the header of a chunked response, the payload chunks are parsed while they are iterated"""
+    decoder = json.JSONDecoder()
+    header, pos = decoder.raw_decode(message)
+    return {'header': header, 'payloads': _iter_payload_chunks(message, pos, decoder)}
+
+
+def _iter_payload_chunks(message, pos, decoder):
+    """(generator) Parse the payload chunks of a chunked response, one after the other in a single scan"""
+    message_len = len(message)
+    while True:
+        # Skip the whitespaces between the chunks
+        while pos < message_len and message[pos].isspace():
+            pos += 1
+        if pos == message_len:
+            break
+        payload_chunk, pos = decoder.raw_decode(message, pos)
+        yield payload_chunk
 
 
 @common.time_execution(immediate=True)
 def _decrypt_chunks(chunks, crypto):
-    decrypted_payload = ''
-    for chunk in chunks:
-        payloadchunk = json.loads(chunk)
-        payload = payloadchunk.get('payload')
-        decoded_payload = base64.standard_b64decode(payload)
-        encryption_envelope = json.loads(decoded_payload)
+    """Decrypt the payload chunks, the data are joined and decoded only once at the end"""
+    data_buffer = []
+    for payload_chunk in chunks:
+        encryption_envelope = json.loads(base64.standard_b64decode(payload_chunk['payload']))
         # Decrypt the text
         plaintext = crypto.decrypt(
             base64.standard_b64decode(encryption_envelope['iv']),
             base64.standard_b64decode(encryption_envelope.get('ciphertext')))
         # unpad the plaintext
         plaintext = json.loads(plaintext)
-        data = plaintext.get('data')
+        data = base64.standard_b64decode(plaintext.get('data'))
 
-        # uncompress data if compressed
+        # uncompress data if compressed, each chunk is compressed separately
         if plaintext.get('compressionalgo') == 'GZIP':
-            decoded_data = base64.standard_b64decode(data)
-            data = zlib.decompress(decoded_data, 16 + zlib.MAX_WBITS).decode('utf-8')
-        else:
-            data = base64.standard_b64decode(data).decode('utf-8')
+            data = zlib.decompress(data, 16 + zlib.MAX_WBITS)
 
-        decrypted_payload += data
-    return json.loads(decrypted_payload)
+        data_buffer.append(data)
+    # A multi-byte character can be split between two chunks, so the data are decoded only after the join
+    return json.loads(b''.join(data_buffer).decode('utf-8'))
@@ -21,6 +21,7 @@ except ImportError:
     from SocketServer import TCPServer
 
 import resources.lib.common as common
+from resources.lib.services.tcp_server import ThreadPoolMixIn
 
 from .nfsession import NetflixSession
 
@@ -28,9 +29,16 @@ from .nfsession import NetflixSession
 class NetflixHttpRequestHandler(BaseHTTPRequestHandler):
     """Handles & translates requests from Inputstream to Netflix"""
     # pylint: disable=invalid-name, broad-except
+    # The connection is closed after each response (HTTP/1.0): a keep-alive connection would keep a worker busy
+    # while it remains idle, blocking the requests of the other clients (add-on instances, library workers)
+    # Headers and content are written separately, without TCP_NODELAY each response would be delayed by the ACK
+    disable_nagle_algorithm = True
+
     def do_HEAD(self):
         """Answers head requests with a success code"""
         self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
 
     def do_POST(self):
         """Loads the licence for the requested resource"""
@@ -38,21 +46,27 @@ class NetflixHttpRequestHandler(BaseHTTPRequestHandler):
         func = getattr(NetflixSession, self.path[1:])
         length = int(self.headers.get('content-length', 0))
         data = json.loads(self.rfile.read(length)) or None
-        result = func(self.server.netflix_session, data)
+        # The requests are executed concurrently, except the calls that change the active profile
+        with self.server.netflix_session.call_lock(func.__name__):
+            result = func(self.server.netflix_session, data)
         if not isinstance(result, dict) or 'error' not in result:
+            content = json.dumps(result).encode('utf-8')
             self.send_response(200)
+            self.send_header('Content-Length', str(len(content)))
             self.end_headers()
-            self.wfile.write(json.dumps(result).encode('utf-8'))
+            self.wfile.write(content)
         else:
             self.send_response(500, json.dumps(result))
+            self.send_header('Content-Length', '0')
             self.end_headers()
 
     def log_message(self, *args):  # pylint: disable=arguments-differ
         """Disable the BaseHTTPServer Log"""
 
 
-class NetflixTCPServer(TCPServer):
+class NetflixTCPServer(ThreadPoolMixIn, TCPServer):
     """Override TCPServer to allow usage of shared members"""
+
     def __init__(self, server_address):
         """Initialization of MSLTCPServer"""
         common.info('Constructing NetflixTCPServer')
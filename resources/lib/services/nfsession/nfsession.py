@@ -10,26 +10,38 @@
 from __future__ import absolute_import, division, unicode_literals
 
 import json
+import threading
+from collections import deque
+from functools import wraps
 
 import resources.lib.common as common
 import resources.lib.api.paths as apipaths
 import resources.lib.api.website as website
 from resources.lib.common import cookies
+from resources.lib.database.db_base_sqlite import close_thread_connections
 from resources.lib.globals import g
 from resources.lib.services.directorybuilder.dir_builder import DirectoryBuilder
 from resources.lib.services.nfsession.nfsession_access import NFSessionAccess
-from resources.lib.services.nfsession.nfsession_base import needs_login
+from resources.lib.services.nfsession.nfsession_base import needs_login, changes_session_data, SessionCallsLock
 from resources.lib.api.exceptions import (NotLoggedInError, MissingCredentialsError, WebsiteParsingError,
                                           InvalidMembershipStatusAnonymous, LoginValidateErrorIncorrectPassword)
 
+# Max number of the path requests executed at same time, used to get the pages of a list without limits
+# (e.g. the full My List for the library sync) and the chunks of a video list
+PATH_REQUESTS_CONCURRENCY = 4
+
 
 class NetflixSession(NFSessionAccess, DirectoryBuilder):
     """Stateful netflix session management"""
 
+    # The calls that change the active profile, these calls are executed alone
+    exclusive_calls = ('login', 'logout', 'activate_profile', 'get_mylist_videoids_profile_switch')
+
     def __init__(self):
         NFSessionAccess.__init__(self)
+        self.session_calls_lock = SessionCallsLock()
         DirectoryBuilder.__init__(self, self)
-        self.slots = [
+        self.slots += [
             self.fetch_initial_page,
             self.login,
             self.logout,
@@ -42,10 +54,23 @@ class NetflixSession(NFSessionAccess, DirectoryBuilder):
             self.post
         ]
         for slot in self.slots:
-            common.register_slot(slot)
+            common.register_slot(self._locked_call(slot))
         self.prefetch_login()
         self.is_profile_session_active = False
 
+    def call_lock(self, call_name):
+        """Get the lock context to execute a call to the netflix session"""
+        if call_name in self.exclusive_calls:
+            return self.session_calls_lock.exclusive()
+        return self.session_calls_lock.shared()
+
+    def _locked_call(self, func):
+        @wraps(func)
+        def locked_call_wrapper(*args, **kwargs):
+            with self.call_lock(func.__name__):
+                return func(*args, **kwargs)
+        return locked_call_wrapper
+
     @common.addonsignals_return_call
     @needs_login
     def parental_control_data(self, password):
@@ -77,6 +102,7 @@ class NetflixSession(NFSessionAccess, DirectoryBuilder):
     @common.time_execution(immediate=True)
     @common.addonsignals_return_call
     @needs_login
+    @changes_session_data
     def fetch_initial_page(self):
         """Fetch initial page"""
         common.debug('Fetch initial page')
@@ -93,6 +119,7 @@ class NetflixSession(NFSessionAccess, DirectoryBuilder):
     def activate_profile(self, guid):
         self._activate_profile(guid)
 
+    @changes_session_data
     def _activate_profile(self, guid):
         """Set the profile identified by guid as active"""
         common.debug('Switching to profile {}', guid)
@@ -100,6 +127,14 @@ class NetflixSession(NFSessionAccess, DirectoryBuilder):
         if self.is_profile_session_active and guid == current_active_guid:
             common.info('The profile session of guid {} is still active, activation not needed.', guid)
             return
+        self._switch_profile(guid)
+        self.is_profile_session_active = True
+        g.LOCAL_DB.switch_active_profile(guid)
+        g.CACHE_MANAGEMENT.identifier_prefix = guid
+
+    @changes_session_data
+    def _switch_profile(self, guid):
+        """Switch the profile of the website session, without change the active profile of the add-on"""
         import time
         timestamp = time.time()
         common.info('Activating profile {}', guid)
@@ -117,10 +152,6 @@ class NetflixSession(NFSessionAccess, DirectoryBuilder):
         response = self._get('browse')
         self.auth_url = website.extract_session_data(response)['auth_url']
         # END Method 2
-
-        self.is_profile_session_active = True
-        g.LOCAL_DB.switch_active_profile(guid)
-        g.CACHE_MANAGEMENT.identifier_prefix = guid
         cookies.save(self.account_hash, self.session.cookies)
 
     @needs_login
@@ -130,20 +161,25 @@ class NetflixSession(NFSessionAccess, DirectoryBuilder):
         Perform a perpetual path request,
         Used exclusively to get My List of a profile other than the current one
         """
+        # The profile is switched temporarily only on the website session, so the add-on data
+        # (active profile, cache) are not changed, and the caller must hold the exclusive call lock
+        # (see exclusive_calls), so no other request is made with the profile of My List
         # Profile chosen by the user for the synchronization from which to get My List videos
         mylist_profile_guid = g.SHARED_DB.get_value('sync_mylist_profile_guid',
                                                     g.LOCAL_DB.get_guid_owner_profile())
         # Current profile active
         current_profile_guid = g.LOCAL_DB.get_active_profile_guid()
-        # Switch profile (only if necessary) in order to get My List videos
-        self._activate_profile(mylist_profile_guid)
-        # Get the My List data
-        path_response = self._perpetual_path_request(paths, length_params, perpetual_range_start,
-                                                     no_limit_req)
-        if mylist_profile_guid != current_profile_guid:
-            # Reactive again the previous profile
+        if mylist_profile_guid == current_profile_guid:
             self._activate_profile(current_profile_guid)
-        return path_response
+            return self._perpetual_path_request(paths, length_params, perpetual_range_start, no_limit_req)
+        # Switch profile in order to get My List videos
+        self._switch_profile(mylist_profile_guid)
+        try:
+            # Get the My List data
+            return self._perpetual_path_request(paths, length_params, perpetual_range_start, no_limit_req)
+        finally:
+            # Reactive again the previous profile, also when the request has failed
+            self._switch_profile(current_profile_guid)
 
     @common.addonsignals_return_call
     def path_request(self, paths):
@@ -176,32 +212,32 @@ class NetflixSession(NFSessionAccess, DirectoryBuilder):
 
         number_of_requests = 100 if no_limit_req else 2
         perpetual_range_start = int(perpetual_range_start) if perpetual_range_start else 0
-        range_start = perpetual_range_start
-        range_end = range_start + request_size
+        ranges_start = [perpetual_range_start + (n_req * response_size) for n_req in range(number_of_requests)]
         merged_response = {}
 
-        for n_req in range(number_of_requests):
-            path_response = self._path_request(
-                _set_range_selector(paths, range_start, range_end))
-            if not path_response:
-                break
-            if not common.check_path_exists(length_args, path_response):
-                # It may happen that the number of items to be received
-                # is equal to the number of the response_size
-                # so a second round will be performed, which will return an empty list
-                break
-            common.merge_dicts(path_response, merged_response)
-            response_count = response_length(path_response, *length_args)
-            if response_count < response_size:
-                # There are no other elements to request
-                break
-
-            range_start += response_size
-            if n_req == (number_of_requests - 1):
-                merged_response['_perpetual_range_selector'] = {'next_start': range_start}
-                common.debug('{} has other elements, added _perpetual_range_selector item', response_type)
-            else:
-                range_end = range_start + request_size
+        pages = self._iter_path_request_pages(
+            paths, ranges_start, request_size,
+            PATH_REQUESTS_CONCURRENCY if no_limit_req else 1)
+        try:
+            for n_req, path_response in enumerate(pages):
+                if not path_response:
+                    break
+                if not common.check_path_exists(length_args, path_response):
+                    # It may happen that the number of items to be received
+                    # is equal to the number of the response_size
+                    # so a second round will be performed, which will return an empty list
+                    break
+                common.merge_dicts(path_response, merged_response)
+                response_count = response_length(path_response, *length_args)
+                if response_count < response_size:
+                    # There are no other elements to request
+                    break
+                if n_req == (number_of_requests - 1):
+                    merged_response['_perpetual_range_selector'] = {'next_start': ranges_start[n_req] + response_size}
+                    common.debug('{} has other elements, added _perpetual_range_selector item', response_type)
+        finally:
+            # Discard the pages requested in advance that are no longer needed
+            pages.close()
 
         if perpetual_range_start > 0:
             previous_start = perpetual_range_start - (response_size * number_of_requests)
@@ -211,11 +247,66 @@ class NetflixSession(NFSessionAccess, DirectoryBuilder):
                 merged_response['_perpetual_range_selector'] = {'previous_start': previous_start}
         return merged_response
 
+    def _iter_path_request_pages(self, paths, ranges_start, request_size, concurrency):
+        """
+        Execute the path requests of the pages of a list, the first page is requested alone, then while the
+        pages are full (the list has other elements) the next pages are requested in advance concurrently
+
+        (generator) yield the path responses in the order of the pages
+        :param paths: the paths with the RANGE_PLACEHOLDER
+        :param ranges_start: list of the range start of each page
+        :param request_size: the range size of each page
+        :param concurrency: max number of the path requests executed at same time
+        """
+        yield self._execute_path_request(_set_range_selector(paths, ranges_start[0], ranges_start[0] + request_size))
+        next_pages_paths = (_set_range_selector(paths, range_start, range_start + request_size)
+                            for range_start in ranges_start[1:])
+        for path_response in self._iter_path_requests(next_pages_paths, concurrency):
+            yield path_response
+
+    def _iter_path_requests(self, paths_list, concurrency):
+        """
+        Execute multiple path requests with up to 'concurrency' requests at same time,
+        the next requests are started only when the caller asks for the next path responses
+
+        (generator) yield the path responses in the order of the paths
+        """
+        paths_iterator = iter(paths_list)
+        pending_requests = deque()
+        while True:
+            for paths in paths_iterator:
+                request = PathRequestThread(self._execute_path_request, paths)
+                request.start()
+                pending_requests.append(request)
+                if len(pending_requests) >= concurrency:
+                    break
+            if not pending_requests:
+                break
+            yield pending_requests.popleft().get_result()
+
     @common.time_execution(immediate=True)
     @needs_login
+    def _path_requests_concurrent(self, paths_list):
+        """
+        Execute multiple path requests concurrently, return the list of the path responses in the same order.
+        The first path request is executed alone, so if the session data have to be refreshed
+        it is done before that the other requests are started (as for the pages in _iter_path_request_pages)
+        """
+        if not paths_list:
+            return []
+        path_responses = [self._execute_path_request(paths_list[0])]
+        path_responses.extend(self._iter_path_requests(paths_list[1:], PATH_REQUESTS_CONCURRENCY))
+        return path_responses
+
+    @common.time_execution(immediate=True)
     def _path_request(self, paths, use_jsongraph=False):
         """Execute a path request with static paths"""
-        common.debug('Executing path request: {}', json.dumps(paths))
+        return self._execute_path_request(paths, use_jsongraph)
+
+    @needs_login
+    def _execute_path_request(self, paths, use_jsongraph=False):
+        """Execute a path request, can be called concurrently by multiple threads"""
+        common.debug('Executing path request: {}', common.LogDump(paths, json.dumps))
         custom_params = {}
         if use_jsongraph:
             custom_params['falcor_server'] = '0.1.0'
@@ -237,9 +328,9 @@ class NetflixSession(NFSessionAccess, DirectoryBuilder):
     def _callpath_request(self, callpaths, params=None, path_suffixs=None):
         """Execute a callPath request with static paths"""
         common.debug('Executing callPath request: {} params: {} path_suffixs: {}',
-                     json.dumps(callpaths),
+                     common.LogDump(callpaths, json.dumps),
                      params,
-                     json.dumps(path_suffixs))
+                     common.LogDump(path_suffixs, json.dumps))
         custom_params = {
             'falcor_server': '0.1.0',
             'method': 'call',
@@ -279,17 +370,44 @@ class NetflixSession(NFSessionAccess, DirectoryBuilder):
             raise
 
 
+class PathRequestThread(threading.Thread):
+    """Execute a path request in a separate thread"""
+
+    def __init__(self, path_request_func, paths):
+        super(PathRequestThread, self).__init__()
+        self.daemon = True
+        self.path_request_func = path_request_func
+        self.paths = paths
+        self.result = None
+        self.exception = None
+
+    def run(self):
+        try:
+            self.result = self.path_request_func(self.paths)
+        except Exception as exc:  # pylint: disable=broad-except
+            self.exception = exc
+        finally:
+            close_thread_connections()
+
+    def get_result(self):
+        """Wait the end of the path request and return the path response, or raise the path request exception"""
+        self.join()
+        if self.exception:
+            raise self.exception  # pylint: disable=raising-bad-type
+        return self.result
+
+
 def _set_range_selector(paths, range_start, range_end):
     """
     Replace the RANGE_PLACEHOLDER with an actual dict:
     {'from': range_start, 'to': range_end}
     """
-    from copy import deepcopy
-    # Make a deepcopy because we don't want to lose the original paths with the placeholder
-    ranged_paths = deepcopy(paths)
-    for path in ranged_paths:
-        try:
+    # Copy only the paths with the placeholder, because we don't want to lose the original paths,
+    # the other paths and the nested path items are never modified so can be shared
+    ranged_paths = []
+    for path in paths:
+        if apipaths.RANGE_PLACEHOLDER in path:
+            path = list(path)
             path[path.index(apipaths.RANGE_PLACEHOLDER)] = {'from': range_start, 'to': range_end}
-        except ValueError:
-            pass
+        ranged_paths.append(path)
     return ranged_paths
@@ -16,6 +16,7 @@ import resources.lib.api.website as website
 import resources.lib.kodi.ui as ui
 from resources.lib.database.db_utils import TABLE_SESSION
 from resources.lib.globals import g
+from resources.lib.services.nfsession.nfsession_base import changes_session_data
 from resources.lib.services.nfsession.nfsession_requests import NFSessionRequests
 from resources.lib.services.nfsession.nfsession_cookie import NFSessionCookie
 from resources.lib.api.exceptions import (LoginFailedError, LoginValidateError,
@@ -73,6 +74,7 @@ class NFSessionAccess(NFSessionRequests, NFSessionCookie):
         return self._login(modal_error_message=True)
 
     @common.time_execution(immediate=True)
+    @changes_session_data
     def _login(self, modal_error_message=False):
         """Perform account login"""
         try:
@@ -108,6 +110,7 @@ class NFSessionAccess(NFSessionRequests, NFSessionCookie):
 
     @common.addonsignals_return_call
     @common.time_execution(immediate=True)
+    @changes_session_data
     def logout(self):
         """Logout of the current account and reset the session"""
         common.debug('Logging out of current account')
@@ -10,6 +10,8 @@
 """
 from __future__ import absolute_import, division, unicode_literals
 
+import threading
+from contextlib import contextmanager
 from functools import wraps
 
 import resources.lib.common as common
@@ -30,12 +32,78 @@ def needs_login(func):
         if not common.is_internet_connected():
             raise NotConnected('Internet connection not available')
         # ..this check verifies only if locally there are the data to correctly perform the login
-        if not session.is_logged_in():
-            raise NotLoggedInError
+        with session.session_data_lock:
+            if not session.is_logged_in():
+                raise NotLoggedInError
         return func(*args, **kwargs)
     return ensure_login
 
 
+def changes_session_data(func):
+    """
+    Decorator to ensure that the session data (login, refresh, cookies) are changed by one thread at a time
+    """
+    # pylint: disable=missing-docstring
+    @wraps(func)
+    def session_data_lock_wrapper(*args, **kwargs):
+        with args[0].session_data_lock:
+            return func(*args, **kwargs)
+    return session_data_lock_wrapper
+
+
+class SessionCallsLock(object):
+    """
+    Lock for the calls to the netflix session: the calls are executed concurrently (shared mode),
+    except the calls that change the active profile, which are executed alone (exclusive mode)
+    to avoid that the other calls make the requests or cache their results with a wrong profile.
+    A thread that holds the lock in exclusive mode can acquire it again in both modes
+    """
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._shared_count = 0
+        self._exclusive_thread = None
+        self._exclusive_count = 0
+
+    @contextmanager
+    def shared(self):
+        with self._condition:
+            if self._exclusive_thread == threading.current_thread():
+                self._exclusive_count += 1
+                is_exclusive = True
+            else:
+                while self._exclusive_thread is not None:
+                    self._condition.wait()
+                self._shared_count += 1
+                is_exclusive = False
+        try:
+            yield
+        finally:
+            self._release(is_exclusive)
+
+    @contextmanager
+    def exclusive(self):
+        with self._condition:
+            if self._exclusive_thread != threading.current_thread():
+                while self._exclusive_thread is not None or self._shared_count:
+                    self._condition.wait()
+                self._exclusive_thread = threading.current_thread()
+            self._exclusive_count += 1
+        try:
+            yield
+        finally:
+            self._release(True)
+
+    def _release(self, is_exclusive):
+        with self._condition:
+            if is_exclusive:
+                self._exclusive_count -= 1
+                if not self._exclusive_count:
+                    self._exclusive_thread = None
+            else:
+                self._shared_count -= 1
+            self._condition.notify_all()
+
+
 class NFSessionBase(object):
     """Initialize the netflix session"""
 
@@ -48,9 +116,17 @@ class NFSessionBase(object):
     verify_ssl = True
     """Use SSL verification when performing requests"""
 
+    session_data_lock = None
+    """Lock to change the session data (login, refresh, cookies) one thread at a time"""
+
+    session_data_version = 0
+    """Incremented at each refresh of the session data, to know if the data are changed during a request"""
+
     def __init__(self):
         self.verify_ssl = bool(g.ADDON.getSettingBool('ssl_verification'))
         self.is_prefetch_login = False
+        self.session_data_lock = threading.RLock()
+        self.session_data_version = 0
         self._init_session()
 
     @common.time_execution(immediate=True)
@@ -16,7 +16,7 @@ import resources.lib.common as common
 import resources.lib.api.website as website
 from resources.lib.common import cookies
 from resources.lib.globals import g
-from resources.lib.services.nfsession.nfsession_base import NFSessionBase, needs_login
+from resources.lib.services.nfsession.nfsession_base import NFSessionBase, needs_login, changes_session_data
 from resources.lib.database.db_utils import TABLE_SESSION
 from resources.lib.api.exceptions import (APIError, WebsiteParsingError,
                                           InvalidMembershipStatusError, InvalidMembershipStatusAnonymous,
@@ -27,6 +27,9 @@ from resources.lib.services.nfsession.nfsession_endpoints import ENDPOINTS, BASE
 class NFSessionRequests(NFSessionBase):
     """Handle the http requests"""
 
+    _session_data_refreshed = False
+    """The result of the last refresh of the session data"""
+
     @common.addonsignals_return_call
     @needs_login
     def get(self, endpoint, **kwargs):
@@ -63,6 +66,7 @@ class NFSessionRequests(NFSessionBase):
         common.debug('Executing {verb} request to {url}',
                      verb='GET' if method == self.session.get else 'POST', url=url)
         data, headers, params = self._prepare_request_properties(endpoint_conf, kwargs)
+        session_data_version = self.session_data_version
         start = common.perf_clock()
         response = method(
             url=url,
@@ -77,7 +81,7 @@ class NFSessionRequests(NFSessionBase):
             # 401 - It may happen when authURL is not more valid (Unauthorized for url)
             # So let's try refreshing the session data (just once)
             common.warn('Try refresh session data due to {} http error', response.status_code)
-            if self.try_refresh_session_data():
+            if self._refresh_session_data_once(session_data_version):
                 return self._request(method, endpoint, True, **kwargs)
         if response.status_code == 401:
             # 30/04/2020: first signal of http error 401 issues
@@ -95,6 +99,23 @@ class NFSessionRequests(NFSessionBase):
                 if endpoint_conf['is_api_call']
                 else response.content)
 
+    def _refresh_session_data_once(self, session_data_version):
+        """
+        Refresh the session data for a failed request, when concurrent requests fail at same time
+        only the first one refresh the session data (and login if needed), the others wait the end
+        of the refresh and then use its result, so that the requests do not overwrite the cookies each other
+
+        :param session_data_version: the version of the session data used by the failed request
+        """
+        with self.session_data_lock:
+            if self.session_data_version == session_data_version:
+                self._session_data_refreshed = self.try_refresh_session_data()
+                self.session_data_version += 1
+            else:
+                common.debug('Session data already refreshed by a concurrent request')
+            return self._session_data_refreshed
+
+    @changes_session_data
     def try_refresh_session_data(self, raise_exception=False):
         """Refresh session_data from the Netflix website"""
         from requests import exceptions
@@ -253,7 +253,7 @@ class AMStreamContinuity(ActionManager):
             # so the only possible way is to read the data from the manifest file
             audio_language = common.get_kodi_audio_language()
             cache_identifier = g.get_esn() + '_' + self.videoid.value
-            manifest_data = g.CACHE.get(CACHE_MANIFESTS, cache_identifier)
+            manifest_data = g.CACHE.get(CACHE_MANIFESTS, cache_identifier, copy=True)
             common.fix_locale_languages(manifest_data['timedtexttracks'])
             if not any(text_track.get('isForcedNarrative', False) is True and
                        text_track['language'] == audio_language
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+    Copyright (C) 2017 Sebastian Golasch (plugin.video.netflix)
+    Common facilities for the IPC TCP servers
+
+    SPDX-License-Identifier: MIT
+    See LICENSES/MIT.md for more information.
+"""
+from __future__ import absolute_import, division, unicode_literals
+
+import threading
+import time
+
+from resources.lib.database.db_base_sqlite import close_thread_connections
+
+try:  # Python 3
+    from queue import Queue
+except ImportError:  # Python 2
+    from Queue import Queue
+
+# Seconds after which an idle keep-alive connection is closed by the server,
+# should be short because each open connection keeps busy a worker thread
+IPC_KEEP_ALIVE_TIMEOUT = 2
+# Max seconds to wait for the worker threads at the server stop, the workers still busy with a long request
+# are not waited further, they are daemon threads so they do not prevent the service to stop
+WORKERS_STOP_TIMEOUT = 5
+
+
+class ThreadPoolMixIn(object):
+    """
+    Mix-in class to handle each request with a bounded pool of worker threads,
+    the workers live as long as the server is serving, so the per-thread resources
+    (e.g. the database connections) are reused between the requests
+    """
+    pool_size = 4
+    """Number of worker threads"""
+
+    _requests_queue = None
+    _workers = None
+
+    def serve_forever(self, *args, **kwargs):
+        self._start_workers()
+        try:
+            super(ThreadPoolMixIn, self).serve_forever(*args, **kwargs)  # pylint: disable=no-member
+        finally:
+            self._stop_workers()
+
+    def process_request(self, request, client_address):
+        """Queue the request to be processed by a worker thread"""
+        self._requests_queue.put((request, client_address))
+
+    def _start_workers(self):
+        self._requests_queue = Queue()
+        self._workers = []
+        for _ in range(self.pool_size):
+            worker = threading.Thread(target=self._process_requests)
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+
+    def _stop_workers(self):
+        for _ in self._workers:
+            self._requests_queue.put(None)
+        stop_deadline = time.time() + WORKERS_STOP_TIMEOUT
+        for worker in self._workers:
+            worker.join(max(stop_deadline - time.time(), 0))
+        self._workers = None
+
+    def _process_requests(self):
+        # The request methods are provided by the server class (e.g. TCPServer) used with the mix-in
+        # pylint: disable=no-member
+        try:
+            while True:
+                item = self._requests_queue.get()
+                if item is None:
+                    break
+                request, client_address = item
+                try:
+                    self.finish_request(request, client_address)
+                except Exception:  # pylint: disable=broad-except
+                    self.handle_error(request, client_address)
+                finally:
+                    self.shutdown_request(request)
+        finally:
+            # The database connections opened by the worker are kept open until the worker stops
+            close_thread_connections()
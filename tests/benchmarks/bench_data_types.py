@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+    Copyright (C) 2017 Sebastian Golasch (plugin.video.netflix)
+    Benchmark: memory, pickle size and times of a LoLoMo of 40 rows (4 videos per row, like the root LoLoMo request),
+    the lists are used as the directory builder does, previous implementation compared with the current one
+
+    SPDX-License-Identifier: MIT
+    See LICENSES/MIT.md for more information.
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import copy
+import pickle
+import timeit
+from collections import OrderedDict
+
+from future.utils import iteritems, listvalues
+
+import resources.lib.common as common
+from resources.lib.api import data_types
+from resources.lib.api.paths import resolve_refs
+from tests.benchmarks.falcor_responses import build_lolomo_response
+from tests.helpers import init_test_globals
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+RUNS = 200
+
+
+# Previous implementation, the data types resolved everything in the constructors
+# (the references are resolved with the current resolve_refs, to compare only the data types)
+class OldLoLoMo(object):
+    def __init__(self, path_response, lolomoid=None):
+        self.data = path_response
+        data_types._filterout_contexts(self.data, ['billboard', 'showAsARow'])  # pylint: disable=protected-access
+        self.id = lolomoid if lolomoid else next(iter(self.data['lolomos']))
+        self.lists = OrderedDict(
+            (key, OldVideoList(self.data, key))
+            for key, _
+            in resolve_refs(self.data['lolomos'][self.id], self.data))
+
+
+class OldVideoList(object):
+    def __init__(self, path_response, list_id=None):
+        self.perpetual_range_selector = path_response.get('_perpetual_range_selector')
+        self.data = path_response
+        self.videos = OrderedDict()
+        self.artitem = None
+        self.contained_titles = None
+        self.videoids = None
+        if path_response.get('lists'):
+            self.videoid = common.VideoId(videoid=list_id if list_id else next(iter(self.data['lists'])))
+            self.videos = OrderedDict(resolve_refs(self.data['lists'][self.videoid.value], self.data))
+            if self.videos:
+                self.artitem = listvalues(self.videos)[0]
+                self.contained_titles = data_types._get_titles(self.videos)  # pylint: disable=protected-access
+                self.videoids = data_types._get_videoids(self.videos)  # pylint: disable=protected-access
+
+    def __getitem__(self, key):
+        return self.data['lists'][self.videoid.value][key]
+
+
+def _use_lists(lolomo):
+    """Read the data of the lists, as the directory builder does to create the list items"""
+    for _, video_list in iteritems(lolomo.lists):
+        _ = (video_list['context'], video_list['displayName'], video_list.videoid.value,
+             video_list.artitem, video_list.contained_titles, video_list.videoids)
+
+
+def _build_and_use(lolomo_class, response):
+    lolomo = lolomo_class(copy.deepcopy(response))
+    _use_lists(lolomo)
+    return lolomo
+
+
+def _measure_memory(lolomo_class, response):
+    """Memory allocated by the data type and by the used lists, over the raw response"""
+    data = copy.deepcopy(response)
+    tracemalloc.start()
+    lolomo = lolomo_class(data)
+    _use_lists(lolomo)
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return allocated
+
+
+def _measure(title, lolomo_class, response):
+    lolomo = _build_and_use(lolomo_class, response)
+    dumped = pickle.dumps(lolomo, protocol=pickle.HIGHEST_PROTOCOL)
+    build_time = min(timeit.repeat(lambda: _build_and_use(lolomo_class, response), number=1, repeat=RUNS))
+    copy_time = min(timeit.repeat(lambda: copy.deepcopy(response), number=1, repeat=RUNS))
+    dump_time = min(timeit.repeat(lambda: pickle.dumps(lolomo, protocol=pickle.HIGHEST_PROTOCOL),
+                                  number=1, repeat=RUNS))
+    load_time = min(timeit.repeat(lambda: _use_lists(pickle.loads(dumped)), number=1, repeat=RUNS))
+    memory = '{:7d} bytes'.format(_measure_memory(lolomo_class, response)) if tracemalloc else 'n/a'
+    print('{:<8}: pickle {:6d} bytes, memory over the response {}, build + use {:5.2f} ms, '
+          'dump {:5.2f} ms, load + use {:5.2f} ms'.format(title, len(dumped), memory,
+                                                         (build_time - copy_time) * 1000,
+                                                         dump_time * 1000, load_time * 1000))
+
+
+def main():
+    init_test_globals()
+    response = build_lolomo_response(lists_count=40, list_length=4, videos_count=160, people_count=100)
+    print('LoLoMo of 40 rows, 4 videos per row, raw response pickle {} bytes, best of {} runs'.format(
+        len(pickle.dumps(response, protocol=pickle.HIGHEST_PROTOCOL)), RUNS))
+    _measure('previous', OldLoLoMo, response)
+    _measure('current', data_types.LoLoMo, response)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+    Copyright (C) 2017 Sebastian Golasch (plugin.video.netflix)
+    Benchmark: build of a LoLoMo listing of 40 rows with its debug log calls, with the debug log disabled and enabled,
+    the data converted to text for each debug call (previous behaviour) compared with LogDump
+
+    SPDX-License-Identifier: MIT
+    See LICENSES/MIT.md for more information.
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import copy
+import json
+import timeit
+
+import resources.lib.common.logging as logging
+from resources.lib.api import data_types
+from resources.lib.api.paths import build_paths, VIDEO_LIST_PARTIAL_PATHS
+from tests.benchmarks.bench_data_types import _use_lists
+from tests.benchmarks.falcor_responses import build_lolomo_response
+from tests.helpers import init_test_globals
+
+RUNS = 200
+
+
+def _build_listing(data, paths, use_log_dump):
+    if use_log_dump:
+        logging.debug('Executing path request: {}', logging.LogDump(paths, json.dumps))
+    else:
+        logging.debug('Executing path request: {}', json.dumps(paths))
+    if not use_log_dump:
+        # The LoLoMo data was formatted by the previous LoLoMo debug call, now it is a LogDump
+        logging.debug('LoLoMo data: {}', data)
+    _use_lists(data_types.LoLoMo(data))
+
+
+def _measure(response, paths, log_level, log_modules, use_log_dump):
+    logging.__LOG_LEVEL__ = log_level
+    logging.__LOG_MODULES__ = log_modules
+    logging._MODULES_ENABLED.clear()  # pylint: disable=protected-access
+    logged = []
+    logging.xbmc.log = lambda msg, level: logged.append(len(msg))
+    _build_listing(copy.deepcopy(response), paths, use_log_dump)
+    logged_chars = sum(logged)
+    # The LoLoMo changes the data, so each run uses a copy of the response
+    responses = iter([copy.deepcopy(response) for _ in range(RUNS)])
+    elapsed = min(timeit.repeat(lambda: _build_listing(next(responses), paths, use_log_dump),
+                                number=1, repeat=RUNS))
+    return elapsed, logged_chars
+
+
+def main():
+    init_test_globals()
+    response = build_lolomo_response(lists_count=40, list_length=4, videos_count=160, people_count=100)
+    paths = build_paths(['lolomo', {'from': 0, 'to': 40}, {'from': 0, 'to': 3}, 'reference'],
+                        VIDEO_LIST_PARTIAL_PATHS)
+    xbmc_log = logging.xbmc.log
+    print('LoLoMo listing of 40 rows with a path request debug call, xbmc.log is a no-op, best of {} runs'.format(RUNS))
+    try:
+        for title, log_level, log_modules in (('disabled', 'Disabled', ()),
+                                              ('verbose', 'Verbose', ()),
+                                              ('verbose, "services" only', 'Verbose', ('services',))):
+            results = [_measure(response, paths, log_level, log_modules, use_log_dump)
+                       for use_log_dump in (False, True)]
+            print('{:<26}: {:5.2f} ms -> {:5.2f} ms, {:6d} -> {:6d} log characters'.format(
+                title, results[0][0] * 1000, results[1][0] * 1000, results[0][1], results[1][1]))
+    finally:
+        logging.xbmc.log = xbmc_log
+
+
+if __name__ == '__main__':
+    main()
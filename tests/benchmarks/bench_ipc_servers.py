@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+    Copyright (C) 2017 Sebastian Golasch (plugin.video.netflix)
+    Benchmark: latency of parallel cache GETs while a long NS call is in flight,
+    single-threaded TCPServer compared with the thread pool of the IPC servers
+
+    SPDX-License-Identifier: MIT
+    See LICENSES/MIT.md for more information.
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import threading
+import time
+
+try:  # Python 3
+    from socketserver import TCPServer
+except ImportError:  # Python 2
+    from SocketServer import TCPServer
+
+from tests.test_tcp_server import StandInTCPServer, StandInRequestHandler, SLOW_CALL_SECS, _http_get
+
+PARALLEL_GETS = 20
+
+
+class SingleThreadTCPServer(TCPServer):
+    def __init__(self):
+        TCPServer.__init__(self, ('127.0.0.1', 0), StandInRequestHandler)
+        self.slow_call_secs = SLOW_CALL_SECS
+        self.slow_call_started = threading.Event()
+        self.release_slow_call = threading.Event()
+
+
+def _measure(server):
+    port = server.server_address[1]
+    server_thread = threading.Thread(target=server.serve_forever, args=(0.05,))
+    server_thread.start()
+    slow_thread = threading.Thread(target=_http_get, args=(port, '/slow'))
+    slow_thread.start()
+    server.slow_call_started.wait(SLOW_CALL_SECS)
+    latencies = []
+
+    def _timed_get():
+        start_time = time.time()
+        _http_get(port, '/cache_get')
+        latencies.append(time.time() - start_time)
+
+    threads = [threading.Thread(target=_timed_get) for _ in range(PARALLEL_GETS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    slow_thread.join()
+    server.shutdown()
+    server.server_close()
+    server_thread.join()
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[-1]
+
+
+def main():
+    print('{} parallel cache GETs during a {} s NS call'.format(PARALLEL_GETS, SLOW_CALL_SECS))
+    for name, server in (('single thread', SingleThreadTCPServer()), ('thread pool', StandInTCPServer())):
+        median, worst = _measure(server)
+        print('{:>14}: median {:7.1f} ms, max {:7.1f} ms'.format(name, median * 1000, worst * 1000))
+
+
+if __name__ == '__main__':
+    main()
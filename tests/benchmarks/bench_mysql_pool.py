@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+    Copyright (C) 2017 Sebastian Golasch (plugin.video.netflix)
+    Benchmark: MySQL connections with a stand-in server that takes a fixed time to open a connection,
+    - a new connection for each call (before the pool) compared with the pool
+    - calls made while all the pooled connections are in use, with the not pooled connections opened
+      while holding the pool lock (previous pool) compared with opened without holding it
+
+    SPDX-License-Identifier: MIT
+    See LICENSES/MIT.md for more information.
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import threading
+import time
+
+import mysql.connector
+
+import resources.lib.database.db_base_mysql as db_base_mysql
+from tests.helpers import init_test_globals
+from tests.test_db_base_mysql import StandInMySQLServer, StandInMySQLConnection
+
+CONNECT_SECS = 0.02
+QUERY_SECS = 0.002
+THREADS = 8
+CALLS_PER_THREAD = 50
+EXHAUSTED_CONNECT_SECS = 0.1
+EXHAUSTED_HOLD_SECS = 0.15
+EXHAUSTED_CALLS = 5
+
+
+class PreviousConnectionPool(db_base_mysql._ConnectionPool):  # pylint: disable=protected-access
+    """The previous pool, the not pooled connections were opened while holding the pool lock"""
+    def get_connection(self):
+        with self.lock:
+            try:
+                return self.pool.get_connection()
+            except mysql.connector.errors.PoolError:
+                if self.connections_count >= db_base_mysql.POOL_SIZE:
+                    return mysql.connector.connect(**self.config)
+                self.pool.add_connection()
+                self.connections_count += 1
+                return self.pool.get_connection()
+
+
+def _run_threads(target, threads_count):
+    threads = [threading.Thread(target=target) for _ in range(threads_count)]
+    start_time = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.time() - start_time
+
+
+def _make_calls(get_connection):
+    def _calls():
+        for _ in range(CALLS_PER_THREAD):
+            conn = get_connection()
+            time.sleep(QUERY_SECS)
+            conn.close()
+    return _calls
+
+
+def _measure_calls(title, get_connection_factory):
+    with StandInMySQLServer(connect_secs=CONNECT_SECS):
+        elapsed = _run_threads(_make_calls(get_connection_factory()), THREADS)
+        print('{:<28}: {:7.1f} ms, {:3d} connections opened'.format(title, elapsed * 1000,
+                                                                     StandInMySQLConnection.opened_count))
+
+
+def _measure_exhausted_pool(title, pool_class):
+    """Time to get a connection for the calls made while all the pooled connections are in use,
+    the pooled connections are given back after EXHAUSTED_HOLD_SECS"""
+    pool = pool_class({'database': 'netflix_addon'})
+    with StandInMySQLServer(connect_secs=0):
+        conns = [pool.get_connection() for _ in range(db_base_mysql.POOL_SIZE)]
+    with StandInMySQLServer(connect_secs=EXHAUSTED_CONNECT_SECS):
+        latencies = []
+
+        def _call():
+            start_time = time.time()
+            conn = pool.get_connection()
+            latencies.append(time.time() - start_time)
+            conn.close()
+
+        def _give_back():
+            time.sleep(EXHAUSTED_HOLD_SECS)
+            for conn in conns:
+                conn.close()
+
+        give_back_thread = threading.Thread(target=_give_back)
+        give_back_thread.start()
+        # The calls arrive while the not pooled connections of the previous calls are being opened
+        threads = []
+        for _ in range(EXHAUSTED_CALLS * 2):
+            thread = threading.Thread(target=_call)
+            thread.start()
+            threads.append(thread)
+            time.sleep(EXHAUSTED_HOLD_SECS / EXHAUSTED_CALLS)
+        for thread in threads:
+            thread.join()
+        give_back_thread.join()
+        latencies.sort()
+        print('{:<28}: median {:7.1f} ms, max {:7.1f} ms, {} not pooled connections'.format(
+            title, latencies[len(latencies) // 2] * 1000, latencies[-1] * 1000,
+            StandInMySQLConnection.opened_count))
+
+
+def main():
+    init_test_globals()
+    config = {'database': 'netflix_addon'}
+    print('{} threads x {} calls, {} ms to connect, {} ms for each call'.format(
+        THREADS, CALLS_PER_THREAD, int(CONNECT_SECS * 1000), int(QUERY_SECS * 1000)))
+    _measure_calls('connection for each call', lambda: lambda: mysql.connector.connect(**config))
+    _measure_calls('pool', lambda: db_base_mysql._ConnectionPool(config).get_connection)  # pylint: disable=protected-access
+    print('{} calls, one every {} ms, while the {} pooled connections are in use for {} ms, {} ms to connect'.format(
+        EXHAUSTED_CALLS * 2, int(EXHAUSTED_HOLD_SECS / EXHAUSTED_CALLS * 1000), db_base_mysql.POOL_SIZE,
+        int(EXHAUSTED_HOLD_SECS * 1000), int(EXHAUSTED_CONNECT_SECS * 1000)))
+    _measure_exhausted_pool('connect holding the lock', PreviousConnectionPool)
+    _measure_exhausted_pool('connect without the lock', db_base_mysql._ConnectionPool)  # pylint: disable=protected-access
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+    Copyright (C) 2017 Sebastian Golasch (plugin.video.netflix)
+    Benchmark: resolution of the references of the Falcor responses, previous implementation compared
+    with the current one, the results of both are compared for equality.
+    Uses synthetic responses, a recorded response can be passed as argument:
+    python tests/benchmarks/bench_path_references.py path_response.json
+
+    SPDX-License-Identifier: MIT
+    See LICENSES/MIT.md for more information.
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import sys
+import timeit
+
+from future.utils import iteritems
+
+import resources.lib.api.paths as paths
+from resources.lib.common.pathops import get_path
+from tests.benchmarks.falcor_responses import build_lolomo_response, build_falcor_cache, load_recorded_response
+
+RUNS = 20
+
+
+# Previous implementation, before the speed up of the references resolution
+def _is_numeric(string):
+    try:
+        int(string)
+    except ValueError:
+        return False
+    return True
+
+
+def old_iterate_references(source):
+    for index, ref in sorted({int(k): v
+                              for k, v in iteritems(source)
+                              if _is_numeric(k)}.items()):
+        path = paths.reference_path(ref)
+        if path is None:
+            break
+        if path[0] == 'characters':
+            continue
+        yield (index, path)
+
+
+def old_resolve_refs(references, targets):
+    return (get_path(ref, targets, include_key=True)
+            for index, ref in old_iterate_references(references))
+
+
+def old_jgraph_get(key, data, full_data=None):
+    return old_resolve_type(data.get(key), full_data or data)
+
+
+def old_jgraph_get_path(path, data, full_data=None):
+    current_value = old_jgraph_get(path[0], data, full_data or data)
+    if len(path) == 1:
+        return current_value
+    return old_jgraph_get_path(path[1:], current_value, full_data or data)
+
+
+def old_resolve_type(return_data, full_data):
+    if isinstance(return_data, dict):
+        primitive_type = return_data.get('$type')
+        if primitive_type == 'ref':
+            return_data = old_jgraph_get_path(return_data['value'], full_data)
+            return old_resolve_type(return_data, full_data)
+        if primitive_type == 'atom':
+            return return_data.get('value')
+    return return_data
+
+
+def _find_reference_lists(data):
+    """Find the dicts that contain index=>reference pairs"""
+    found = []
+    stack = [data]
+    while stack:
+        item = stack.pop()
+        if not isinstance(item, dict):
+            continue
+        if '0' in item and not item.get('$type'):
+            found.append(item)
+        stack.extend(item.values())
+    return found
+
+
+def _find_ref_paths(data):
+    """Find the paths of the values that are a 'ref' primitive type"""
+    found = []
+    stack = [([], data)]
+    while stack:
+        path, item = stack.pop()
+        if not isinstance(item, dict):
+            continue
+        if item.get('$type') == 'ref':
+            found.append(path)
+            continue
+        stack.extend((path + [key], value) for key, value in iteritems(item))
+    return found
+
+
+def _resolve_all_lists(resolve_refs_func, reference_lists, data):
+    results = []
+    for references in reference_lists:
+        try:
+            results.append(list(resolve_refs_func(references, data)))
+        except (KeyError, TypeError, paths.InvalidReferenceError):
+            results.append(None)
+    return results
+
+
+def _resolve_all_refs(jgraph_get_path_func, ref_paths, data):
+    return [jgraph_get_path_func(path, data) for path in ref_paths]
+
+
+def _compare(title, old_func, new_func):
+    old_result, new_result = old_func(), new_func()
+    assert old_result == new_result, 'Different results: ' + title
+    old_time = min(timeit.repeat(old_func, number=1, repeat=RUNS))
+    new_time = min(timeit.repeat(new_func, number=1, repeat=RUNS))
+    print('{:<48}: {:8.2f} ms -> {:8.2f} ms'.format(title, old_time * 1000, new_time * 1000))
+
+
+def _bench_references(title, data):
+    reference_lists = _find_reference_lists(data)
+    _compare('{} ({} lists)'.format(title, len(reference_lists)),
+             lambda: _resolve_all_lists(old_resolve_refs, reference_lists, data),
+             lambda: _resolve_all_lists(paths.resolve_refs, reference_lists, data))
+
+
+def _bench_jgraph(title, data, repeat=1):
+    ref_paths = _find_ref_paths(data) * repeat
+    _compare('{} ({} refs)'.format(title, len(ref_paths)),
+             lambda: _resolve_all_refs(old_jgraph_get_path, ref_paths, data),
+             lambda: _resolve_all_refs(paths.jgraph_get_path, ref_paths, data))
+
+
+def main():
+    print('Best of {} runs, previous -> current implementation'.format(RUNS))
+    _bench_references('LoLoMo references', build_lolomo_response())
+    _bench_jgraph('falcorCache references', build_falcor_cache(), repeat=200)
+    for file_path in sys.argv[1:]:
+        data = load_recorded_response(file_path)
+        _bench_references('Recorded references', data)
+        _bench_jgraph('Recorded JSON Graph references', data)
+
+
+if __name__ == '__main__':
+    main()
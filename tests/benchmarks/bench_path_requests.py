@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+    Copyright (C) 2017 Sebastian Golasch (plugin.video.netflix)
+    Benchmark: time to get a full list with the perpetual path requests (e.g. My List for the library sync)
+    from a fake Shakti endpoint with a fixed latency, sequential pages compared with the pages requested in advance
+
+    SPDX-License-Identifier: MIT
+    See LICENSES/MIT.md for more information.
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import time
+
+import resources.lib.services.nfsession.nfsession as nfsession
+from tests.helpers import init_test_globals
+from tests.test_nfsession_path_requests import StandInNetflixSession, PerpetualPathRequestTests
+
+LATENCY_SECS = 0.2
+LIST_LENGTH = 400
+REQUEST_SIZE = 44  # Pages of 45 items
+
+
+class FakeShaktiSession(StandInNetflixSession):  # pylint: disable=too-many-ancestors
+    def _get_response_delay(self, request_number):
+        return LATENCY_SECS
+
+
+def _measure(concurrency):
+    nfsession.PATH_REQUESTS_CONCURRENCY = concurrency
+    session = FakeShaktiSession(list_length=LIST_LENGTH)
+    start_time = time.time()
+    response = session._perpetual_path_request(  # pylint: disable=protected-access
+        PerpetualPathRequestTests.PATHS, ['stdlist', ['lists', 'list_id']],
+        no_limit_req=True, request_size=REQUEST_SIZE)
+    assert len(response['lists']['list_id']) == LIST_LENGTH
+    return time.time() - start_time, len(session.requested_paths), session.max_concurrent_requests
+
+
+def main():
+    init_test_globals()
+    print('List of {} items in pages of {} items, {} ms latency'.format(LIST_LENGTH, REQUEST_SIZE + 1,
+                                                                        int(LATENCY_SECS * 1000)))
+    default_concurrency = nfsession.PATH_REQUESTS_CONCURRENCY
+    try:
+        for concurrency in (1, default_concurrency):
+            elapsed, requests_count, max_concurrent = _measure(concurrency)
+            print('concurrency {}: {:7.1f} ms, {} requests, max {} at same time'.format(
+                concurrency, elapsed * 1000, requests_count, max_concurrent))
+    finally:
+        nfsession.PATH_REQUESTS_CONCURRENCY = default_concurrency
+
+
+if __name__ == '__main__':
+    main()
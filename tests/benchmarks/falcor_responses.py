@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+    Copyright (C) 2017 Sebastian Golasch (plugin.video.netflix)
+    Synthetic Falcor responses for the benchmarks, with the same structure of the recorded responses
+    of the Shakti path requests and of the falcorCache of the website pages
+
+    SPDX-License-Identifier: MIT
+    See LICENSES/MIT.md for more information.
+"""
+from __future__ import absolute_import, division, unicode_literals
+
+import json
+
+CONTEXTS = ['continueWatching', 'trendingNow', 'popularTitles', 'newRelease', 'genre', 'similars']
+
+
+def build_lolomo_response(lists_count=40, list_length=48, videos_count=1500, people_count=3000):
+    """Path response of a LoLoMo request, the lists contain references to the videos,
+    the videos contain references to the people and to the genres"""
+    lolomo_id = 'a1b2c3d4-lolomo'
+    lolomo = {'trackIds': {'trackId': 14170286}}
+    lists = {}
+    for list_index in range(lists_count):
+        list_id = '{}_{}X3XX1590000000000'.format(lolomo_id, list_index)
+        lolomo[str(list_index)] = ['lists', list_id]
+        list_data = {'context': CONTEXTS[list_index % len(CONTEXTS)],
+                     'displayName': 'List {}'.format(list_index),
+                     'length': list_length,
+                     'trackIds': {'trackId': 14170287 + list_index}}
+        for index in range(list_length):
+            videoid = str(80000000 + (list_index * 37 + index * 11) % videos_count)
+            list_data[str(index)] = {'reference': ['videos', videoid]}
+        # The empty reference at the end of the list
+        list_data[str(list_length)] = {'$type': 'sentinel'}
+        lists[list_id] = list_data
+    videos = {}
+    for index in range(videos_count):
+        videoid = str(80000000 + index)
+        video = {'title': 'Title {}'.format(index),
+                 'summary': {'type': 'show' if index % 3 else 'movie', 'id': int(videoid)},
+                 'releaseYear': 2000 + index % 20,
+                 'runtime': 3600 + index,
+                 'maturity': {'rating': {'value': 'TV-14', 'maturityLevel': 100}}}
+        for attribute, count in (('cast', 10), ('directors', 2), ('creators', 2)):
+            video[attribute] = {str(n): ['person', str((index * 7 + n) % people_count)] for n in range(count)}
+            video[attribute]['summary'] = {'length': count}
+        video['genres'] = {str(n): ['genres', str(index % 50 + n)] for n in range(3)}
+        videos[videoid] = video
+    return {
+        'lolomos': {lolomo_id: lolomo},
+        'lists': lists,
+        'videos': videos,
+        'person': {str(index): {'id': index, 'name': 'Person {}'.format(index)} for index in range(people_count)},
+        'genres': {str(index): {'id': index, 'name': 'Genre {}'.format(index)} for index in range(60)}
+    }
+
+
+def build_falcor_cache(profiles_count=5):
+    """JSON Graph of the falcorCache of a website page, with 'ref' and 'atom' primitive types"""
+    profiles_list = {'summary': {'$type': 'atom', 'value': {'length': profiles_count}}}
+    profiles = {}
+    for index in range(profiles_count):
+        guid = 'PROFILEGUID{}'.format(index)
+        profiles_list[str(index)] = {'$type': 'ref', 'value': ['profiles', guid]}
+        profiles[guid] = {
+            'summary': {'$type': 'atom', 'value': {'guid': guid, 'profileName': 'Profile {}'.format(index),
+                                                   'isAccountOwner': index == 0, 'isKids': False}},
+            'avatar': {'$type': 'ref', 'value': ['avatars', 'nf', 'icon{}'.format(index)]}
+        }
+    # A reference to a reference
+    profiles_list['current'] = {'$type': 'ref', 'value': ['profilesList', '0']}
+    return {
+        'profilesList': profiles_list,
+        'profiles': profiles,
+        'avatars': {'nf': {'icon{}'.format(index): {'images': {'byWidth': {
+            '320': {'$type': 'atom', 'value': 'https://occ.nflxso.net/icon{}.png'.format(index)}}}}
+            for index in range(profiles_count)}}
+    }
+
+
+def load_recorded_response(file_path):
+    """Load a path response recorded as JSON (the 'value' or the 'jsonGraph' of the Shakti response,
+    or the full response)"""
+    with open(file_path, 'rb') as file_handle:
+        data = json.loads(file_handle.read().decode('utf-8'))
+    return data.get('value') or data.get('jsonGraph') or data
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+"""
+    Copyright (C) 2017 Sebastian Golasch (plugin.video.netflix)
+    Helper functions for the tests
+
+    SPDX-License-Identifier: MIT
+    See LICENSES/MIT.md for more information.
+"""
+from __future__ import absolute_import, division, unicode_literals
+
+import sys
+
+from resources.lib.globals import g
+
+
+def init_test_globals():
+    """Set the global variables used by the tested modules, without the add-on initialization of init_globals
+    (that would create the database and the settings in the test userdata)"""
+    g.PY_IS_VER2 = sys.version_info.major == 2
+    g.ADDON_ID = 'plugin.video.netflix'
+    g.PLUGIN_HANDLE = 0
+    g.TIME_TRACE_ENABLED = False
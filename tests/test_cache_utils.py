@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+    Copyright (C) 2017 Sebastian Golasch (plugin.video.netflix)
+    Tests for the compression of the cache data
+
+    SPDX-License-Identifier: MIT
+    See LICENSES/MIT.md for more information.
+"""
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, division, unicode_literals
+
+import unittest
+
+from resources.lib.api.exceptions import CacheMiss
+from resources.lib.common.cache_utils import compress_data, decompress_data
+from helpers import init_test_globals
+
+
+class CompressDataTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        init_test_globals()
+
+    def test_round_trip(self):
+        value = b'\x80\x04' + b'serialized data' * 100
+        self.assertEqual(decompress_data(compress_data(value)), value)
+
+    def test_not_compressed_data(self):
+        # The data stored by previous add-on versions are not compressed
+        value = b'\x80\x04serialized data'
+        self.assertEqual(decompress_data(value), value)
+
+    def test_invalid_compressed_data(self):
+        with self.assertRaises(CacheMiss):
+            decompress_data(compress_data(b'serialized data' * 100)[:20])
+        with self.assertRaises(CacheMiss):
+            decompress_data(b'xnot compressed data')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+    Copyright (C) 2017 Sebastian Golasch (plugin.video.netflix)
+    Tests for the data types of the path responses
+
+    SPDX-License-Identifier: MIT
+    See LICENSES/MIT.md for more information.
+"""
+# pylint: disable=missing-docstring,protected-access
+from __future__ import absolute_import, division, unicode_literals
+
+import copy
+import pickle
+import unittest
+
+import resources.lib.api.data_types as data_types
+from resources.lib.common.videoid import VideoId
+from tests.benchmarks.falcor_responses import build_lolomo_response
+from helpers import init_test_globals
+
+
+class DataTypesTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        init_test_globals()
+        cls.response = build_lolomo_response(lists_count=4, list_length=3, videos_count=20, people_count=10)
+
+    def setUp(self):
+        self.data = copy.deepcopy(self.response)
+
+    def _pickle_round_trip(self, obj):
+        return pickle.loads(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def test_lolomo_lists(self):
+        lolomo = data_types.LoLoMo(self.data)
+        self.assertEqual(len(lolomo.lists), 4)
+        list_id, video_list = next(iter(lolomo.lists.items()))
+        self.assertEqual(video_list['displayName'], 'List 0')
+        self.assertEqual(video_list.videoid, VideoId(videoid=list_id))
+        self.assertEqual(video_list.contained_titles, ['Title 0', 'Title 11', 'Title 2'])
+        self.assertEqual(video_list.videoids, [VideoId(movieid=80000000), VideoId(tvshowid=80000011),
+                                               VideoId(tvshowid=80000002)])
+        self.assertIs(video_list.artitem, self.data['videos']['80000000'])
+        self.assertEqual(lolomo.find_by_context('trendingNow')[1]['displayName'], 'List 1')
+
+    def test_lolomo_pickle(self):
+        lolomo = data_types.LoLoMo(self.data)
+        lists_count = len(lolomo.lists)
+        state = lolomo.__getstate__()
+        # The lists and the index are obtained from the data, so they are not saved
+        self.assertEqual(sorted(state), ['data', 'id'])
+        loaded_lolomo = self._pickle_round_trip(lolomo)
+        self.assertIsNone(loaded_lolomo._lists)
+        self.assertEqual(len(loaded_lolomo.lists), lists_count)
+
+    def test_lazy_videos_pickle(self):
+        video_list = data_types.VideoList(self.data)
+        self.assertEqual(sorted(video_list.__getstate__()), ['data', 'list_id'])
+        loaded_list = self._pickle_round_trip(video_list)
+        self.assertEqual(list(loaded_list.videos), list(video_list.videos))
+        # The videos accessed are saved, so their changes are kept
+        del video_list.videos['80000000']
+        self.assertEqual(sorted(video_list.__getstate__()), ['_videos', 'data', 'list_id'])
+        loaded_list = self._pickle_round_trip(video_list)
+        self.assertNotIn('80000000', loaded_list.videos)
+        self.assertNotIn('_jgraph_index', loaded_list.__getstate__())
+
+    def test_perpetual_range_selector(self):
+        self.data['_perpetual_range_selector'] = {'next_start': 50}
+        self.assertEqual(data_types.LoLoMo(self.data).perpetual_range_selector, {'next_start': 50})
+        self.assertEqual(data_types.CustomVideoList(self.data).perpetual_range_selector, {'next_start': 50})
+        self.assertIsNone(data_types.VideoList(self.response).perpetual_range_selector)
+
+    def test_videos_data_type_abstract(self):
+        with self.assertRaises(TypeError):
+            data_types.VideosDataType(self.data)  # pylint: disable=abstract-class-instantiated
+
+    def test_slots_only(self):
+        for obj in (data_types.LoLoMo(self.data), data_types.VideoList(self.data),
+                    data_types.CustomVideoList(self.data)):
+            self.assertFalse(hasattr(obj, '__dict__'))
+
+    def test_merge_data_type(self):
+        video_list = data_types.CustomVideoList({'videos': {'1': {'title': 'A', 'summary': {'type': 'movie', 'id': 1}}}})
+        data_types.merge_data_type(video_list,
+                                   data_types.CustomVideoList({'videos': {'2': {'title': 'B',
+                                                                                'summary': {'type': 'show', 'id': 2}}}}))
+        self.assertEqual(video_list.contained_titles, ['A', 'B'])
+        self.assertEqual(video_list.videoids, [VideoId(movieid=1), VideoId(tvshowid=2)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+    Copyright (C) 2017 Sebastian Golasch (plugin.video.netflix)
+    Tests for the pool of the MySQL connections
+
+    SPDX-License-Identifier: MIT
+    See LICENSES/MIT.md for more information.
+"""
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, division, unicode_literals
+
+import threading
+import time
+import unittest
+
+import mysql.connector
+import mysql.connector.pooling as pooling
+from mysql.connector.connection import MySQLConnection
+
+import resources.lib.database.db_base_mysql as db_base_mysql
+from helpers import init_test_globals
+
+WAIT_TIMEOUT = 5
+
+
+class StandInMySQLConnection(MySQLConnection):
+    """Stand-in of a connection to the MySQL server, opening the connection takes 'connect_secs' seconds"""
+    # pylint: disable=arguments-differ
+    connect_secs = 0
+    lock = threading.Lock()
+    opened_count = 0
+    open_count = 0
+    max_open_count = 0
+
+    def __init__(self, **kwargs):
+        # Without arguments the connection is not opened, e.g. when the pool checks the configuration
+        super(StandInMySQLConnection, self).__init__()
+        self.is_open = False
+        if not kwargs:
+            return
+        self.config(**kwargs)
+        time.sleep(self.connect_secs)
+        with self.lock:
+            StandInMySQLConnection.opened_count += 1
+            StandInMySQLConnection.open_count += 1
+            StandInMySQLConnection.max_open_count = max(self.max_open_count, self.open_count)
+        self.is_open = True
+
+    def is_connected(self):
+        return self.is_open
+
+    def close(self):
+        with self.lock:
+            StandInMySQLConnection.open_count -= 1
+        self.is_open = False
+
+    @classmethod
+    def reset_counters(cls):
+        cls.opened_count = 0
+        cls.open_count = 0
+        cls.max_open_count = 0
+
+
+class StandInMySQLServer(object):
+    """Replace the connections to the MySQL server with StandInMySQLConnection"""
+    def __init__(self, connect_secs=0):
+        StandInMySQLConnection.connect_secs = connect_secs
+        StandInMySQLConnection.reset_counters()
+        self.pool_connection_class = pooling.MySQLConnection
+        self.connect_func = mysql.connector.connect
+
+    def __enter__(self):
+        pooling.MySQLConnection = StandInMySQLConnection
+        mysql.connector.connect = StandInMySQLConnection
+        return self
+
+    def __exit__(self, *args):
+        pooling.MySQLConnection = self.pool_connection_class
+        mysql.connector.connect = self.connect_func
+
+
+class ConnectionPoolTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        init_test_globals()
+
+    def _hold_connections(self, pool, count, release):
+        """Take 'count' connections from the pool in separate threads, the connections are kept until released"""
+        taken = threading.Semaphore(0)
+
+        def _hold_connection():
+            conn = pool.get_connection()
+            taken.release()
+            release.wait(WAIT_TIMEOUT)
+            conn.close()
+
+        threads = [threading.Thread(target=_hold_connection) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for _ in range(count):
+            self.assertTrue(taken.acquire(timeout=WAIT_TIMEOUT))  # pylint: disable=unexpected-keyword-arg
+        return threads
+
+    def test_connections_reused(self):
+        with StandInMySQLServer():
+            pool = db_base_mysql._ConnectionPool({'database': 'test'})  # pylint: disable=protected-access
+            for _ in range(10):
+                pool.get_connection().close()
+            self.assertEqual(StandInMySQLConnection.opened_count, 1)
+
+    def test_not_pooled_connections_when_exhausted(self):
+        with StandInMySQLServer():
+            pool = db_base_mysql._ConnectionPool({'database': 'test'})  # pylint: disable=protected-access
+            release = threading.Event()
+            threads = self._hold_connections(pool, db_base_mysql.POOL_SIZE + 2, release)
+            self.assertEqual(pool.connections_count, db_base_mysql.POOL_SIZE)
+            self.assertEqual(StandInMySQLConnection.open_count, db_base_mysql.POOL_SIZE + 2)
+            release.set()
+            for thread in threads:
+                thread.join()
+            # The not pooled connections are closed, the pooled connections are kept open
+            self.assertEqual(StandInMySQLConnection.open_count, db_base_mysql.POOL_SIZE)
+
+    def test_connect_without_holding_lock(self):
+        with StandInMySQLServer(connect_secs=0.2):
+            pool = db_base_mysql._ConnectionPool({'database': 'test'})  # pylint: disable=protected-access
+            release = threading.Event()
+            threads = self._hold_connections(pool, db_base_mysql.POOL_SIZE, release)
+            # While the not pooled connections are being opened, the connections given back are taken at once
+            start_time = time.time()
+            fallback_threads = [threading.Thread(target=lambda: pool.get_connection().close()) for _ in range(3)]
+            for thread in fallback_threads:
+                thread.start()
+            time.sleep(0.05)
+            release.set()
+            for thread in threads:
+                thread.join()
+            pool.get_connection().close()
+            self.assertLess(time.time() - start_time, 0.15)
+            for thread in fallback_threads:
+                thread.join()
+
+
+if __name__ == '__main__':
+    unittest.main()
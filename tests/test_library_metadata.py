@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+    Copyright (C) 2017 Sebastian Golasch (plugin.video.netflix)
+    Tests for the metadata prefetch of the library exports
+
+    SPDX-License-Identifier: MIT
+    See LICENSES/MIT.md for more information.
+"""
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, division, unicode_literals
+
+import threading
+import time
+import unittest
+
+import resources.lib.kodi.library_metadata as library_metadata
+from resources.lib.api.exceptions import MetadataNotAvailable
+from resources.lib.globals import g
+from helpers import init_test_globals
+
+RESPONSE_DELAY_SECS = 0.05
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeMetadataBackend(object):
+    """Stand-in of api.get_metadata, fails for the videoids in 'failing_videoids'"""
+    def __init__(self, failing_videoids=None):
+        self.failing_videoids = failing_videoids or {}
+        self.lock = threading.Lock()
+        self.concurrent_calls = 0
+        self.max_concurrent_calls = 0
+        self.calls = []
+
+    def __call__(self, videoid, refresh):
+        with self.lock:
+            self.calls.append((videoid, refresh))
+            self.concurrent_calls += 1
+            self.max_concurrent_calls = max(self.max_concurrent_calls, self.concurrent_calls)
+        try:
+            time.sleep(RESPONSE_DELAY_SECS)
+            if videoid in self.failing_videoids:
+                raise self.failing_videoids[videoid]
+            return {'videoid': videoid}
+        finally:
+            with self.lock:
+                self.concurrent_calls -= 1
+
+
+class TokenBucketTests(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.rate_limiter = library_metadata.TokenBucket(0.5, 3, clock=self.clock)
+
+    def test_burst(self):
+        self.assertEqual([self.rate_limiter.reserve() for _ in range(3)], [0, 0, 0])
+
+    def test_rate(self):
+        for _ in range(3):
+            self.rate_limiter.reserve()
+        # Without tokens the next tokens are taken in advance, one every 1 / rate seconds
+        self.assertEqual([self.rate_limiter.reserve() for _ in range(3)], [2, 4, 6])
+        self.clock.now += 6
+        self.assertEqual(self.rate_limiter.reserve(), 2)
+
+    def test_refill_limited_to_capacity(self):
+        for _ in range(3):
+            self.rate_limiter.reserve()
+        self.clock.now += 100
+        self.assertEqual([self.rate_limiter.reserve() for _ in range(4)], [0, 0, 0, 2])
+
+
+class PrefetchMetadataTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        init_test_globals()
+
+    def setUp(self):
+        self.ipc_over_http = getattr(g, 'IPC_OVER_HTTP', None)
+        self.is_service = getattr(g, 'IS_SERVICE', None)
+        # No rate limit
+        self.rate_limiter = library_metadata.TokenBucket(1000, 1000)
+
+    def tearDown(self):
+        g.IPC_OVER_HTTP = self.ipc_over_http
+        g.IS_SERVICE = self.is_service
+
+    def _prefetch(self, backend, videoids, **kwargs):
+        return dict(library_metadata.prefetch_metadata(videoids, rate_limiter=self.rate_limiter,
+                                                       get_metadata_func=backend, **kwargs))
+
+    def test_single_worker_with_addonsignals(self):
+        g.IPC_OVER_HTTP = False
+        g.IS_SERVICE = False
+        backend = FakeMetadataBackend()
+        results = self._prefetch(backend, list(range(6)))
+        self.assertEqual(results, {videoid: {'videoid': videoid} for videoid in range(6)})
+        self.assertEqual(backend.max_concurrent_calls, 1)
+
+    def test_workers_with_ipc_over_http(self):
+        g.IPC_OVER_HTTP = True
+        g.IS_SERVICE = False
+        backend = FakeMetadataBackend()
+        self._prefetch(backend, list(range(6)))
+        self.assertEqual(backend.max_concurrent_calls, library_metadata.METADATA_WORKERS)
+
+    def test_workers_within_service(self):
+        g.IPC_OVER_HTTP = False
+        g.IS_SERVICE = True
+        backend = FakeMetadataBackend()
+        self._prefetch(backend, list(range(6)))
+        self.assertEqual(backend.max_concurrent_calls, library_metadata.METADATA_WORKERS)
+
+    def test_failing_backend(self):
+        backend = FakeMetadataBackend({1: MetadataNotAvailable(), 3: ValueError('Backend error')})
+        results = self._prefetch(backend, list(range(5)), workers=2)
+        # The metadata of the failed requests are None, the other requests are not affected
+        self.assertEqual(results, {0: {'videoid': 0}, 1: None, 2: {'videoid': 2}, 3: None, 4: {'videoid': 4}})
+
+    def test_refresh_function(self):
+        backend = FakeMetadataBackend()
+        self._prefetch(backend, list(range(4)), workers=1, refresh=lambda videoid: videoid % 2 == 0)
+        self.assertEqual(sorted(backend.calls), [(0, True), (1, False), (2, True), (3, False)])
+
+    def test_stop_iteration_stops_workers(self):
+        backend = FakeMetadataBackend()
+        results = library_metadata.prefetch_metadata(list(range(20)), workers=2, rate_limiter=self.rate_limiter,
+                                                     get_metadata_func=backend)
+        next(results)
+        results.close()
+        # Wait the end of the requests in progress
+        time.sleep(RESPONSE_DELAY_SECS * 2)
+        calls_count = len(backend.calls)
+        time.sleep(RESPONSE_DELAY_SECS * 4)
+        self.assertEqual(len(backend.calls), calls_count)
+        self.assertLess(calls_count, 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
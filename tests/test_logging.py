@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+    Copyright (C) 2017 Sebastian Golasch (plugin.video.netflix)
+    Tests for the debug logging
+
+    SPDX-License-Identifier: MIT
+    See LICENSES/MIT.md for more information.
+"""
+# pylint: disable=missing-docstring,protected-access
+from __future__ import absolute_import, division, unicode_literals
+
+import unittest
+
+import resources.lib.common.logging as logging
+from resources.lib.globals import g
+from helpers import init_test_globals
+
+
+def _create_timed_function(module_name):
+    def timed_function():
+        return 'result'
+    timed_function.__module__ = module_name
+    return logging.time_execution(immediate=True)(timed_function)
+
+
+class LoggingTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        init_test_globals()
+
+    def setUp(self):
+        self.messages = []
+        self.xbmc_log = logging.xbmc.log
+        logging.xbmc.log = lambda msg, level: self.messages.append(msg)
+        self.to_text_calls = 0
+        g.reset_time_trace()
+
+    def tearDown(self):
+        logging.xbmc.log = self.xbmc_log
+        self._set_log_level(None, None)
+
+    @staticmethod
+    def _set_log_level(log_level, log_modules):
+        logging.__LOG_LEVEL__ = log_level
+        logging.__LOG_MODULES__ = log_modules
+        logging._MODULES_ENABLED.clear()
+
+    def _to_text(self, data):
+        self.to_text_calls += 1
+        return 'data: {}'.format(data)
+
+    def test_log_dump_not_formatted_without_debug(self):
+        for log_level in ('Disabled', 'Info'):
+            self._set_log_level(log_level, ())
+            logging.debug('Response: {}', logging.LogDump([1, 2, 3], self._to_text))
+        self.assertEqual(self.to_text_calls, 0)
+        self.assertEqual(self.messages, [])
+
+    def test_log_dump_formatted_with_debug(self):
+        self._set_log_level('Verbose', ())
+        logging.debug('Response: {}', logging.LogDump([1, 2, 3], self._to_text))
+        self.assertEqual(self.to_text_calls, 1)
+        self.assertTrue(self.messages[0].endswith('Response: data: [1, 2, 3]'))
+
+    def test_log_dump_max_length(self):
+        self._set_log_level('Verbose', ())
+        logging.debug('{}', logging.LogDump('x' * 30, max_length=10))
+        self.assertTrue(self.messages[0].endswith('xxxxxxxxxx... (20 characters truncated)'))
+
+    def test_debug_modules_filter(self):
+        # The module of this test is not enabled
+        self._set_log_level('Verbose', ('services.msl',))
+        logging.debug('Response: {}', logging.LogDump([1, 2, 3], self._to_text))
+        self.assertEqual(self.to_text_calls, 0)
+        self.assertEqual(self.messages, [])
+
+    def test_time_execution_modules_filter(self):
+        self._set_log_level('Verbose', ('services.msl', 'paths'))
+        enabled_modules = ['resources.lib.services.msl.msl_handler', 'resources.lib.api.paths']
+        disabled_modules = ['resources.lib.services.nfsession.nfsession', 'resources.lib.api.data_types']
+        for module_name in enabled_modules + disabled_modules:
+            self.assertEqual(_create_timed_function(module_name)(), 'result')
+        self.assertEqual(len(self.messages), len(enabled_modules))
+        self.assertTrue(all('Call to timed_function took' in message for message in self.messages))
+        self.assertEqual(logging._MODULES_ENABLED, {module_name: module_name in enabled_modules
+                                                    for module_name in enabled_modules + disabled_modules})
+
+    def test_time_execution_all_modules(self):
+        self._set_log_level('Verbose', ())
+        _create_timed_function('resources.lib.api.data_types')()
+        self.assertEqual(len(self.messages), 1)
+
+    def test_time_execution_without_debug(self):
+        self._set_log_level('Info', ())
+        self.assertEqual(_create_timed_function('resources.lib.api.paths')(), 'result')
+        self.assertEqual(self.messages, [])
+        self.assertEqual(g.time_trace_level, -2)
+
+
+if __name__ == '__main__':
+    unittest.main()
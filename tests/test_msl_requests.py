@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+    Copyright (C) 2017 Sebastian Golasch (plugin.video.netflix)
+    Tests for the parsing and the decryption of the MSL chunked responses
+
+    SPDX-License-Identifier: MIT
+    See LICENSES/MIT.md for more information.
+"""
+# pylint: disable=missing-docstring,protected-access
+from __future__ import absolute_import, division, unicode_literals
+
+import base64
+import json
+import os
+import re
+import unittest
+import zlib
+
+try:  # The crypto package depends on the library installed (see Wiki)
+    from Crypto.Cipher import AES
+    from Crypto.Util import Padding
+except ImportError:
+    from Cryptodome.Cipher import AES
+    from Cryptodome.Util import Padding
+
+import resources.lib.services.msl.msl_requests as msl_requests
+from resources.lib.services.msl.default_crypto import DefaultMSLCrypto
+from helpers import init_test_globals
+
+ENCRYPTION_KEY = b'0123456789abcdef'
+SIGNATURE = 'U2lnbmF0dXJlK0RhdGE9'
+
+# The data of a response, the multi-byte characters are in the middle of the strings
+RESPONSE_DATA = {
+    'result': {
+        'movieId': 80000001,
+        'title': 'La città incantata – 千と千尋の神隠し',
+        'audio_tracks': [{'language': 'it', 'languageDescription': 'Italiano'},
+                         {'language': 'ja', 'languageDescription': '日本語'}],
+        'video_tracks': [{'streams': [{'bitrate': bitrate, 'downloadable_id': 'dl_{}'.format(bitrate)}
+                                      for bitrate in range(100, 5000, 100)]}]
+    }
+}
+
+
+def _b64encode(data):
+    return base64.standard_b64encode(data).decode('ascii')
+
+
+def _encrypt_chunk(data, sequence_number, end_of_msg, compressed):
+    if compressed:
+        compressor = zlib.compressobj(9, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        data = compressor.compress(data) + compressor.flush()
+    plaintext = {'sequencenumber': sequence_number, 'messageid': 1234, 'data': _b64encode(data)}
+    if compressed:
+        plaintext['compressionalgo'] = 'GZIP'
+    if end_of_msg:
+        plaintext['endofmsg'] = True
+    init_vector = os.urandom(16)
+    cipher = AES.new(ENCRYPTION_KEY, AES.MODE_CBC, init_vector)
+    ciphertext = cipher.encrypt(Padding.pad(json.dumps(plaintext).encode('utf-8'), 16))
+    encryption_envelope = {'keyid': 'ESN_KEY_ID', 'iv': _b64encode(init_vector),
+                           'ciphertext': _b64encode(ciphertext), 'sha256': 'AA=='}
+    return '{{"payload":"{}","signature":"{}"}}'.format(
+        _b64encode(json.dumps(encryption_envelope).encode('utf-8')), SIGNATURE)
+
+
+def _build_chunked_message(data, boundaries):
+    """Build a chunked response, the data are split in chunks at the boundaries positions (in bytes)"""
+    header = ('{{"headerdata":"{headerdata}","signature":"{signature}","mastertoken":{{"tokendata":"VG9rZW5EYXRh",'
+              '"signature":"{signature}"}}}}').format(headerdata=_b64encode(b'{"messageid":1234}'),
+                                                      signature=SIGNATURE)
+    positions = [0] + boundaries + [len(data)]
+    chunks = [_encrypt_chunk(data[start:end], index + 1, end == len(data), compressed=index % 2 == 1)
+              for index, (start, end) in enumerate(zip(positions, positions[1:]))]
+    return header + ''.join(chunks)
+
+
+def _previous_parse_chunks(message):
+    """The parsing of the chunks as it was before the single scan of the message"""
+    header = json.loads(message.split('}}')[0] + '}}')
+    payloads = re.split(',\"signature\":\"[0-9A-Za-z=/+]+\"}', message.split('}}')[1])
+    payloads = [x + '}' for x in payloads][:-1]
+    return {'header': header, 'payloads': payloads}
+
+
+def _previous_decrypt_chunks(chunks, crypto):
+    """The decryption of the chunks as it was before the data were decoded only once at the end"""
+    decrypted_payload = ''
+    for chunk in chunks:
+        payloadchunk = json.loads(chunk)
+        payload = payloadchunk.get('payload')
+        decoded_payload = base64.standard_b64decode(payload)
+        encryption_envelope = json.loads(decoded_payload)
+        plaintext = crypto.decrypt(
+            base64.standard_b64decode(encryption_envelope['iv']),
+            base64.standard_b64decode(encryption_envelope.get('ciphertext')))
+        plaintext = json.loads(plaintext)
+        data = plaintext.get('data')
+        if plaintext.get('compressionalgo') == 'GZIP':
+            decoded_data = base64.standard_b64decode(data)
+            data = zlib.decompress(decoded_data, 16 + zlib.MAX_WBITS).decode('utf-8')
+        else:
+            data = base64.standard_b64decode(data).decode('utf-8')
+        decrypted_payload += data
+    return json.loads(decrypted_payload)
+
+
+class ChunkedResponseTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        init_test_globals()
+        cls.crypto = DefaultMSLCrypto()
+        cls.crypto.encryption_key = ENCRYPTION_KEY
+        cls.data = json.dumps(RESPONSE_DATA, ensure_ascii=False).encode('utf-8')
+
+    def _boundary_in_string(self, text):
+        """Get a position (in bytes) in the middle of a JSON string, between two ascii characters"""
+        return self.data.index(text.encode('utf-8')) + len(text) // 2
+
+    def test_same_data_of_previous_parsing(self):
+        boundaries = [self._boundary_in_string('La citt'),
+                      self._boundary_in_string('languageDescription'),
+                      self._boundary_in_string('dl_2500'),
+                      self._boundary_in_string('dl_4900')]
+        message = _build_chunked_message(self.data, boundaries)
+        response = msl_requests._parse_chunks(message)
+        previous_response = _previous_parse_chunks(message)
+        self.assertEqual(response['header'], previous_response['header'])
+        decrypted_response = msl_requests._decrypt_chunks(response['payloads'], self.crypto)
+        self.assertEqual(decrypted_response, _previous_decrypt_chunks(previous_response['payloads'], self.crypto))
+        self.assertEqual(decrypted_response, RESPONSE_DATA)
+
+    def test_single_chunk(self):
+        message = _build_chunked_message(self.data, [])
+        response = msl_requests._parse_chunks(message)
+        self.assertEqual(len(_previous_parse_chunks(message)['payloads']), 1)
+        self.assertEqual(msl_requests._decrypt_chunks(response['payloads'], self.crypto), RESPONSE_DATA)
+
+    def test_whitespaces_between_chunks(self):
+        message = _build_chunked_message(self.data, [self._boundary_in_string('dl_2500')])
+        message = message.replace('}{', '}\r\n{') + '\n'
+        response = msl_requests._parse_chunks(message)
+        self.assertEqual(msl_requests._decrypt_chunks(response['payloads'], self.crypto), RESPONSE_DATA)
+
+    def test_multi_byte_character_split_between_chunks(self):
+        # The first byte of the two bytes of 'à' is in a chunk, the second byte in the next chunk
+        boundary = self.data.index('à'.encode('utf-8')) + 1
+        message = _build_chunked_message(self.data, [boundary])
+        response = msl_requests._parse_chunks(message)
+        self.assertEqual(msl_requests._decrypt_chunks(response['payloads'], self.crypto), RESPONSE_DATA)
+        # The previous decryption decoded each chunk separately
+        self.assertRaises(UnicodeDecodeError, _previous_decrypt_chunks,
+                          _previous_parse_chunks(message)['payloads'], self.crypto)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+    Copyright (C) 2017 Sebastian Golasch (plugin.video.netflix)
+    Tests for the lock of the calls to the netflix session
+
+    SPDX-License-Identifier: MIT
+    See LICENSES/MIT.md for more information.
+"""
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, division, unicode_literals
+
+import threading
+import unittest
+
+from resources.lib.services.nfsession.nfsession_base import SessionCallsLock
+
+WAIT_TIMEOUT = 5
+
+
+class SessionCallsLockTests(unittest.TestCase):
+
+    def setUp(self):
+        self.lock = SessionCallsLock()
+        self.events = []
+
+    def _run_in_thread(self, mode, name, started=None, release=None):
+        def _call():
+            with getattr(self.lock, mode)():
+                self.events.append(name + '_start')
+                if started:
+                    started.set()
+                if release:
+                    release.wait(WAIT_TIMEOUT)
+                self.events.append(name + '_end')
+        thread = threading.Thread(target=_call)
+        thread.start()
+        return thread
+
+    def test_shared_calls_run_concurrently(self):
+        started_1, started_2 = threading.Event(), threading.Event()
+        release = threading.Event()
+        thread_1 = self._run_in_thread('shared', 'call1', started_1, release)
+        thread_2 = self._run_in_thread('shared', 'call2', started_2, release)
+        # Both calls are started while the other one is still in progress
+        self.assertTrue(started_1.wait(WAIT_TIMEOUT))
+        self.assertTrue(started_2.wait(WAIT_TIMEOUT))
+        release.set()
+        thread_1.join()
+        thread_2.join()
+
+    def test_exclusive_call_waits_shared_calls(self):
+        started, release = threading.Event(), threading.Event()
+        shared_thread = self._run_in_thread('shared', 'shared', started, release)
+        self.assertTrue(started.wait(WAIT_TIMEOUT))
+        exclusive_thread = self._run_in_thread('exclusive', 'exclusive')
+        exclusive_thread.join(0.2)
+        self.assertTrue(exclusive_thread.is_alive())
+        release.set()
+        shared_thread.join()
+        exclusive_thread.join()
+        self.assertEqual(self.events, ['shared_start', 'shared_end', 'exclusive_start', 'exclusive_end'])
+
+    def test_shared_calls_wait_exclusive_call(self):
+        started, release = threading.Event(), threading.Event()
+        exclusive_thread = self._run_in_thread('exclusive', 'exclusive', started, release)
+        self.assertTrue(started.wait(WAIT_TIMEOUT))
+        shared_thread = self._run_in_thread('shared', 'shared')
+        shared_thread.join(0.2)
+        self.assertTrue(shared_thread.is_alive())
+        release.set()
+        exclusive_thread.join()
+        shared_thread.join()
+        self.assertEqual(self.events, ['exclusive_start', 'exclusive_end', 'shared_start', 'shared_end'])
+
+    def test_exclusive_holder_can_acquire_again(self):
+        with self.lock.exclusive():
+            with self.lock.shared():
+                with self.lock.exclusive():
+                    pass
+        # The lock is fully released
+        thread = self._run_in_thread('exclusive', 'exclusive')
+        thread.join(WAIT_TIMEOUT)
+        self.assertFalse(thread.is_alive())
+
+
+if __name__ == '__main__':
+    unittest.main()
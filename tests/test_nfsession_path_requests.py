@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+    Copyright (C) 2017 Sebastian Golasch (plugin.video.netflix)
+    Tests for the concurrent path requests of the netflix session
+
+    SPDX-License-Identifier: MIT
+    See LICENSES/MIT.md for more information.
+"""
+# pylint: disable=missing-docstring,protected-access
+from __future__ import absolute_import, division, unicode_literals
+
+import json
+import threading
+import time
+import unittest
+
+import resources.lib.api.paths as apipaths
+from resources.lib.api.exceptions import CacheMiss
+from resources.lib.globals import g
+from resources.lib.services.nfsession.nfsession import NetflixSession, PATH_REQUESTS_CONCURRENCY
+from helpers import init_test_globals
+
+WAIT_TIMEOUT = 5
+# Delay of the responses of the stand-in, the later requests are answered earlier
+RESPONSE_DELAY_SECS = 0.05
+
+
+class StandInNetflixSession(NetflixSession):
+    """
+    Netflix session with a local stand-in of the Shakti endpoint, the stand-in answers with
+    the 'list_length' items of the list 'lists' > 'list_id', the items are the range indexes
+    """
+    # pylint: disable=super-init-not-called,arguments-differ
+    def __init__(self, list_length=0):
+        self.session_data_lock = threading.RLock()
+        self.session_data_version = 0
+        self.list_length = list_length
+        self.stats_lock = threading.Lock()
+        self.requested_paths = []
+        self.completed_ranges = []
+        self.concurrent_requests = 0
+        self.max_concurrent_requests = 0
+
+    def is_logged_in(self):
+        return True
+
+    def _post(self, endpoint, **kwargs):
+        paths = [json.loads(path) for path in kwargs['data'][len('path='):].split('&path=')]
+        with self.stats_lock:
+            self.requested_paths.append(paths)
+            self.concurrent_requests += 1
+            self.max_concurrent_requests = max(self.max_concurrent_requests, self.concurrent_requests)
+        try:
+            return {'value': self._get_response(paths)}
+        finally:
+            with self.stats_lock:
+                self.concurrent_requests -= 1
+
+    def _get_response(self, paths):
+        range_selector = paths[0][2]
+        time.sleep(self._get_response_delay(len(self.requested_paths)))
+        with self.stats_lock:
+            self.completed_ranges.append(range_selector['from'])
+        items = range(range_selector['from'], min(range_selector['to'] + 1, self.list_length))
+        return {'lists': {'list_id': {str(index): {'index': index} for index in items}}} if items else {}
+
+    def _get_response_delay(self, request_number):  # pylint: disable=no-self-use
+        # The requests started later complete earlier
+        return RESPONSE_DELAY_SECS * (PATH_REQUESTS_CONCURRENCY - request_number % PATH_REQUESTS_CONCURRENCY)
+
+
+class StandInChunkedListSession(StandInNetflixSession):
+    """
+    Netflix session with a local stand-in of the Shakti endpoint for the chunked video lists,
+    the stand-in answers with the requested videos and the first videoid of the chunk as 'chunk_id'
+    """
+    # pylint: disable=too-many-ancestors
+    def __init__(self):
+        super(StandInChunkedListSession, self).__init__()
+        self.netflix_session = self
+        self.events = []
+
+    def _get_response(self, paths):
+        videoids = paths[0][1]
+        with self.stats_lock:
+            self.events.append(('start', videoids[0]))
+        time.sleep(self._get_response_delay(len(self.requested_paths)))
+        with self.stats_lock:
+            self.events.append(('end', videoids[0]))
+        return {'videos': {str(videoid): {'summary': {'type': 'movie', 'id': videoid},
+                                          'title': 'Title {}'.format(videoid)}
+                           for videoid in videoids},
+                'chunk_id': videoids[0]}
+
+
+class NoCache(object):
+    """Cache that does not contain any data"""
+    def get(self, bucket, identifier):  # pylint: disable=no-self-use,unused-argument
+        raise CacheMiss()
+
+    def add(self, bucket, identifier, data, ttl=None):  # pylint: disable=no-self-use,unused-argument
+        return
+
+
+class VideoListChunkedTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        init_test_globals()
+
+    def setUp(self):
+        self.cache = g.CACHE
+        g.CACHE = NoCache()
+        self.session = StandInChunkedListSession()
+        self.chunked_video_list = [list(range(start, start + 5)) for start in range(1, 46, 5)]
+
+    def tearDown(self):
+        g.CACHE = self.cache
+
+    def test_chunks_merged_in_order(self):
+        video_list = self.session.req_video_list_chunked(self.chunked_video_list)
+        self.assertEqual(sorted(int(videoid) for videoid in video_list.videos), list(range(1, 46)))
+        self.assertEqual(video_list.videos['45']['title'], 'Title 45')
+        # The values of the later chunks overwrite the values of the previous chunks
+        self.assertEqual(video_list['chunk_id'], 41)
+        # The chunks requested concurrently have completed out of order
+        completed = [chunk_id for event, chunk_id in self.session.events if event == 'end']
+        self.assertNotEqual(completed, sorted(completed))
+        self.assertEqual(self.session.max_concurrent_requests, PATH_REQUESTS_CONCURRENCY)
+
+    def test_first_chunk_requested_alone(self):
+        self.session.req_video_list_chunked(self.chunked_video_list)
+        self.assertEqual(self.session.events[:2], [('start', 1), ('end', 1)])
+        self.assertEqual(len(self.session.requested_paths), len(self.chunked_video_list))
+
+    def test_perpetual_range_selector_added(self):
+        range_selector = {'_perpetual_range_selector': {'next_start': 45}}
+        video_list = self.session.req_video_list_chunked(self.chunked_video_list,
+                                                         perpetual_range_selector=range_selector)
+        self.assertEqual(video_list['_perpetual_range_selector'], {'next_start': 45})
+
+
+class PerpetualPathRequestTests(unittest.TestCase):
+
+    PATHS = [['lists', 'list_id', apipaths.RANGE_PLACEHOLDER, 'index']]
+    REQUEST_SIZE = 9  # The ranges include the last index, so the responses have up to 10 items
+
+    @classmethod
+    def setUpClass(cls):
+        init_test_globals()
+
+    def test_pages_yielded_in_order(self):
+        session = StandInNetflixSession(list_length=100)
+        ranges_start = list(range(0, 100, 10))
+        pages = session._iter_path_request_pages(self.PATHS, ranges_start, self.REQUEST_SIZE,
+                                                 PATH_REQUESTS_CONCURRENCY)
+        pages_items = [sorted(int(index) for index in page['lists']['list_id']) for page in pages]
+        self.assertEqual(pages_items, [list(range(start, start + 10)) for start in ranges_start])
+        # The pages requested in advance have completed out of order
+        self.assertNotEqual(session.completed_ranges, sorted(session.completed_ranges))
+        self.assertEqual(session.max_concurrent_requests, PATH_REQUESTS_CONCURRENCY)
+
+    def test_first_page_requested_alone(self):
+        session = StandInNetflixSession(list_length=100)
+        pages = session._iter_path_request_pages(self.PATHS, list(range(0, 100, 10)), self.REQUEST_SIZE,
+                                                 PATH_REQUESTS_CONCURRENCY)
+        next(pages)
+        self.assertEqual(len(session.requested_paths), 1)
+        pages.close()
+
+    def test_full_list_merged(self):
+        session = StandInNetflixSession(list_length=45)
+        response = session._perpetual_path_request(self.PATHS, ['stdlist', ['lists', 'list_id']],
+                                                   no_limit_req=True, request_size=self.REQUEST_SIZE)
+        self.assertEqual(response['lists']['list_id'], {str(index): {'index': index} for index in range(45)})
+        self.assertNotIn('_perpetual_range_selector', response)
+        # The requests in advance are stopped after the last page, and no more than one round is wasted
+        self.assertLessEqual(len(session.requested_paths), 5 + PATH_REQUESTS_CONCURRENCY)
+
+    def test_limited_list_requested_sequentially(self):
+        session = StandInNetflixSession(list_length=100)
+        response = session._perpetual_path_request(self.PATHS, ['stdlist', ['lists', 'list_id']],
+                                                   request_size=self.REQUEST_SIZE)
+        self.assertEqual(len(response['lists']['list_id']), 20)
+        self.assertEqual(response['_perpetual_range_selector'], {'next_start': 20})
+        self.assertEqual(session.max_concurrent_requests, 1)
+
+
+class RefreshSessionDataOnceTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        init_test_globals()
+
+    def setUp(self):
+        self.session = StandInNetflixSession()
+        self.refresh_count = 0
+        self.refresh_started = threading.Event()
+        self.release_refresh = threading.Event()
+        self.session.try_refresh_session_data = self._try_refresh_session_data
+
+    def _try_refresh_session_data(self):
+        self.refresh_count += 1
+        self.refresh_started.set()
+        self.release_refresh.wait(WAIT_TIMEOUT)
+        return True
+
+    def test_concurrent_failed_requests_refresh_once(self):
+        results = []
+        failed_version = self.session.session_data_version
+        threads = [threading.Thread(target=lambda: results.append(
+            self.session._refresh_session_data_once(failed_version))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        self.assertTrue(self.refresh_started.wait(WAIT_TIMEOUT))
+        self.release_refresh.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.refresh_count, 1)
+        self.assertEqual(results, [True] * 4)
+        self.assertEqual(self.session.session_data_version, failed_version + 1)
+
+    def test_new_failure_refresh_again(self):
+        self.release_refresh.set()
+        self.assertTrue(self.session._refresh_session_data_once(self.session.session_data_version))
+        self.assertTrue(self.session._refresh_session_data_once(self.session.session_data_version))
+        self.assertEqual(self.refresh_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
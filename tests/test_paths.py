@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+    Copyright (C) 2017 Sebastian Golasch (plugin.video.netflix)
+    Tests for the resolution of the references of the path responses
+
+    SPDX-License-Identifier: MIT
+    See LICENSES/MIT.md for more information.
+"""
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, division, unicode_literals
+
+import unittest
+
+import resources.lib.api.paths as paths
+from resources.lib.api.exceptions import InvalidReferenceError
+
+
+class ResolveRefsTests(unittest.TestCase):
+
+    def test_sorted_until_empty_reference(self):
+        references = {'10': ['videos', '3'], '2': {'reference': ['videos', '2']}, '1': ['videos', '1'],
+                      '11': {'$type': 'sentinel'}, '12': ['videos', '4'], 'length': 3, '²': ['videos', '5']}
+        targets = {'videos': {str(videoid): {'id': videoid} for videoid in range(1, 6)}}
+        self.assertEqual(list(paths.resolve_refs(references, targets)),
+                         [('1', {'id': 1}), ('2', {'id': 2}), ('3', {'id': 3})])
+        self.assertEqual(paths.count_references(references), 4)
+
+    def test_index_same_results(self):
+        targets = {'videos': {'1': {'id': 1}, '2': {'id': 2}},
+                   'lists': {'list1': {'0': ['videos', '2'], '1': ['videos', '1']}}}
+        index = paths.JsonGraphIndex(targets)
+        for _ in range(2):
+            self.assertEqual(list(index.resolve_refs(targets['lists']['list1'])),
+                             list(paths.resolve_refs(targets['lists']['list1'], targets)))
+
+
+class JsonGraphTests(unittest.TestCase):
+
+    DATA = {
+        'profilesList': {
+            'summary': {'$type': 'atom', 'value': {'length': 2}},
+            '0': {'$type': 'ref', 'value': ['profiles', 'GUID0']},
+            '1': {'$type': 'ref', 'value': ['profiles', 'GUID1']},
+            'current': {'$type': 'ref', 'value': ['profilesList', '1']}
+        },
+        'profiles': {
+            'GUID0': {'summary': {'$type': 'atom', 'value': {'guid': 'GUID0'}}},
+            'GUID1': {'summary': {'$type': 'atom', 'value': {'guid': 'GUID1'}}}
+        }
+    }
+
+    def test_atom(self):
+        self.assertEqual(paths.jgraph_get_path(['profilesList', 'summary', 'length'], self.DATA), 2)
+
+    def test_reference_chain(self):
+        self.assertEqual(paths.jgraph_get_path(['profilesList', 'current', 'summary'], self.DATA), {'guid': 'GUID1'})
+        profile = paths.jgraph_get('current', self.DATA['profilesList'], self.DATA)
+        self.assertEqual(paths.jgraph_get('summary', profile), {'guid': 'GUID1'})
+
+    def test_list(self):
+        self.assertEqual(paths.jgraph_get_list('profilesList', self.DATA),
+                         {0: self.DATA['profiles']['GUID0'], 1: self.DATA['profiles']['GUID1']})
+
+    def test_cyclic_references(self):
+        data = {
+            'a': {'$type': 'ref', 'value': ['b']},
+            'b': {'$type': 'ref', 'value': ['c', 'value']},
+            'c': {'value': {'$type': 'ref', 'value': ['a']}},
+            'self': {'$type': 'ref', 'value': ['self']},
+            'ok': {'x': {'$type': 'ref', 'value': ['d']}, 'y': {'$type': 'ref', 'value': ['d']}},
+            'd': 1
+        }
+        for key in ('a', 'self'):
+            with self.assertRaises(InvalidReferenceError):
+                paths.jgraph_get(key, data)
+        # The same reference in different branches is not a cycle
+        self.assertEqual([paths.jgraph_get_path(['ok', key], data) for key in ('x', 'y')], [1, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+    Copyright (C) 2017 Sebastian Golasch (plugin.video.netflix)
+    Tests for the thread pool of the IPC TCP servers
+
+    SPDX-License-Identifier: MIT
+    See LICENSES/MIT.md for more information.
+"""
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, division, unicode_literals
+
+import threading
+import time
+import unittest
+
+try:  # Python 3
+    from http.client import HTTPConnection
+    from http.server import BaseHTTPRequestHandler
+    from socketserver import TCPServer
+except ImportError:  # Python 2
+    from httplib import HTTPConnection
+    from BaseHTTPServer import BaseHTTPRequestHandler
+    from SocketServer import TCPServer
+
+import resources.lib.services.tcp_server as tcp_server
+
+SLOW_CALL_SECS = 1
+WAIT_TIMEOUT = 10
+
+
+class StandInRequestHandler(BaseHTTPRequestHandler):
+    """Stand-in of the service request handlers, '/slow' simulates a long NS call"""
+    # pylint: disable=invalid-name
+    def do_GET(self):
+        if self.path == '/slow':
+            self.server.slow_call_started.set()
+            self.server.release_slow_call.wait(self.server.slow_call_secs)
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class StandInTCPServer(tcp_server.ThreadPoolMixIn, TCPServer):
+    def __init__(self):
+        TCPServer.__init__(self, ('127.0.0.1', 0), StandInRequestHandler)
+        self.slow_call_secs = SLOW_CALL_SECS
+        self.slow_call_started = threading.Event()
+        self.release_slow_call = threading.Event()
+
+
+def _http_get(port, path):
+    conn = HTTPConnection('127.0.0.1', port, timeout=WAIT_TIMEOUT)
+    try:
+        conn.request('GET', path)
+        return conn.getresponse().status
+    finally:
+        conn.close()
+
+
+class ThreadPoolMixInTests(unittest.TestCase):
+
+    def setUp(self):
+        self.server = StandInTCPServer()
+        self.port = self.server.server_address[1]
+        self.server_thread = threading.Thread(target=self.server.serve_forever, args=(0.05,))
+        self.server_thread.start()
+
+    def tearDown(self):
+        self.server.release_slow_call.set()
+        self.server.shutdown()
+        self.server.server_close()
+        self.server_thread.join()
+
+    def test_requests_served_during_long_call(self):
+        # The long call ends only when released by the test
+        self.server.slow_call_secs = WAIT_TIMEOUT
+        slow_thread = threading.Thread(target=_http_get, args=(self.port, '/slow'))
+        slow_thread.start()
+        self.assertTrue(self.server.slow_call_started.wait(SLOW_CALL_SECS))
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(_http_get(self.port, '/fast')))
+                   for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # All the requests have been served while the long call is still in progress
+        self.assertFalse(self.server.release_slow_call.is_set())
+        self.assertTrue(slow_thread.is_alive())
+        self.assertEqual(results, [200] * 10)
+        self.server.release_slow_call.set()
+        slow_thread.join()
+
+    def test_stop_does_not_wait_busy_workers(self):
+        stop_timeout = tcp_server.WORKERS_STOP_TIMEOUT
+        tcp_server.WORKERS_STOP_TIMEOUT = 0.1
+        try:
+            slow_thread = threading.Thread(target=_http_get, args=(self.port, '/slow'))
+            slow_thread.daemon = True
+            slow_thread.start()
+            self.assertTrue(self.server.slow_call_started.wait(SLOW_CALL_SECS))
+            start_time = time.time()
+            self.server.shutdown()
+            self.server_thread.join()
+            self.assertLess(time.time() - start_time, SLOW_CALL_SECS / 2)
+        finally:
+            tcp_server.WORKERS_STOP_TIMEOUT = stop_timeout
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+    Copyright (C) 2017 Sebastian Golasch (plugin.video.netflix)
+    Tests for the extraction of the JSON data from the netflix pages
+
+    SPDX-License-Identifier: MIT
+    See LICENSES/MIT.md for more information.
+"""
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, division, unicode_literals
+
+import json
+import os
+import unittest
+from re import DOTALL, compile as recompile, sub
+
+from resources.lib.api.exceptions import WebsiteParsingError
+from resources.lib.api.website import PageJsonData, extract_json
+from helpers import init_test_globals
+
+# A page with the same structure of the netflix pages: JSON assignments with javascript escapes,
+# '</script>' inside the strings and other scripts in the middle, it is not a recorded page
+PAGE_FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'website_page.html')
+
+JSON_REGEX = r'netflix\.{}\s*=\s*(.*?);\s*</script>'
+
+
+def _previous_extract_json(content, name):
+    """The extraction with a regex for each JSON, as it was before PageJsonData"""
+    try:
+        json_array = recompile(JSON_REGEX.format(name), DOTALL).findall(content.decode('utf-8'))
+        json_str = json_array[0]
+        json_str_replace = json_str.replace('\\"', '\\\\"')
+        json_str_replace = json_str_replace.replace('\\s', '\\\\s')
+        json_str_replace = json_str_replace.replace('\\n', '\\\\n')
+        json_str_replace = json_str_replace.replace('\\t', '\\\\t')
+        json_str_replace = json_str_replace.encode().decode('unicode_escape')
+        json_str_replace = sub(r'\\(?!["])', r'\\\\', json_str_replace)
+        return json.loads(json_str_replace)
+    except Exception:
+        raise WebsiteParsingError('Unable to extract {}'.format(name))
+
+
+class PageJsonDataTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        init_test_globals()
+        with open(PAGE_FIXTURE, 'rb') as page_file:
+            cls.content = page_file.read()
+
+    def test_same_data_of_previous_extraction(self):
+        page_data = PageJsonData(self.content)
+        for name in ['reactContext', 'falcorCache']:
+            self.assertEqual(page_data.get(name), _previous_extract_json(self.content, name))
+            self.assertEqual(extract_json(self.content, name), _previous_extract_json(self.content, name))
+
+    def test_decoded_values(self):
+        react_context = PageJsonData(self.content).get('reactContext')
+        self.assertEqual(react_context['models']['userInfo']['data']['name'], 'Test User')
+        self.assertEqual(react_context['models']['userInfo']['data']['authURL'], '1600000000000.Ab/Cd=')
+        self.assertEqual(react_context['models']['serverDefs']['data']['API_ROOT'], 'https://www.netflix.com/api')
+        login_data = react_context['models']['loginContext']['data']
+        self.assertEqual(login_data['url'], 'https://www.netflix.com/login')
+        self.assertEqual(login_data['title'], 'Say "hello"')
+        self.assertEqual(login_data['markup'], '<span>a()</span><script>b()</script>')
+        self.assertEqual(login_data['accented'], 'Café crème')
+        self.assertEqual(login_data['whitespaces'], 'line1\\nline2\\ttab')
+        # The first assignment is kept
+        self.assertNotIn('duplicated', react_context)
+
+    def test_missing_or_invalid_json(self):
+        page_data = PageJsonData(self.content)
+        for name in ['missing', 'notJson']:
+            self.assertRaises(WebsiteParsingError, page_data.get, name)
+            self.assertRaises(WebsiteParsingError, _previous_extract_json, self.content, name)
+
+    def test_decoded_once(self):
+        page_data = PageJsonData(self.content)
+        self.assertIs(page_data.get('falcorCache'), page_data.get('falcorCache'))
+
+
+if __name__ == '__main__':
+    unittest.main()